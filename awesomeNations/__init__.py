@@ -1 +1,2 @@
-from .main import AwesomeNations
\ No newline at end of file
+from .main import AwesomeNations
+from .asyncMain import AsyncAwesomeNations
\ No newline at end of file
@@ -0,0 +1,277 @@
+from awesomeNations.dataDumps import DumpStore, DUMP_TAGS, normalize_name, shard_keys
+from awesomeNations.customMethods import format_key
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, unquote
+from xml.parsers import expat
+from collections import deque
+from typing import Optional
+from pathlib import Path
+import threading
+import logging
+import math
+import time
+import re
+
+logger = logging.getLogger("AwesomeLogger")
+
+SCALE_PATTERN: re.Pattern = re.compile(rb'<SCALE id="([0-9]+)">.*?</SCALE>', re.DOTALL)
+
+def record_children(record: bytes, encoding: str) -> list[tuple[str, int, int]]:
+    """
+    Finds the child elements of a raw dump record, returns `(TAG, start, end)` byte spans.
+    """
+    children: list[tuple[str, int, int]] = []
+    depth: int = 0
+    child_start: int = 0
+    child_is_empty: bool = True
+    parser = expat.ParserCreate(encoding)
+    parser.buffer_text = True
+
+    def start_element(name: str, attributes: dict) -> None:
+        nonlocal depth, child_start, child_is_empty
+        depth += 1
+        if depth == 2:
+            child_start = parser.CurrentByteIndex
+            child_is_empty = True
+        elif depth > 2:
+            child_is_empty = False
+
+    def end_element(name: str) -> None:
+        nonlocal depth
+        if depth == 2:
+            # Expat points at the end tag, or right after the whole tag if it was an empty element tag (<TAG/>).
+            position: int = parser.CurrentByteIndex
+            if child_is_empty and record[position - 2:position] == b"/>":
+                child_end: int = position
+            else:
+                child_end = record.index(b">", position) + 1
+            children.append((name, child_start, child_end))
+        depth -= 1
+
+    def character_data(data: str) -> None:
+        nonlocal child_is_empty
+        if depth > 1:
+            child_is_empty = False
+
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    parser.CharacterDataHandler = character_data
+    parser.Parse(record, True)
+    return children
+
+def filter_scales(census: bytes, scales: str) -> bytes:
+    "Keeps the <SCALE> elements of a raw <CENSUS> listed in a `scale` shard param (`all` keeps them all)."
+    if scales == "all":
+        return census
+    wanted: set[bytes] = {scale.encode() for scale in scales.split("+")}
+    kept: list[bytes] = [scale.group(0) for scale in SCALE_PATTERN.finditer(census) if scale.group(1) in wanted]
+    return b"<CENSUS>" + b"".join(kept) + b"</CENSUS>"
+
+class APIRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes: with Nagle, every response would wait for a delayed ACK (~40 ms).
+    disable_nagle_algorithm = True
+    server: "APIEmulator"
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("APIEmulator: " + format, *args)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path != self.server.api_path:
+            self.send_body(404, b"<h1>Not Found</h1>", "text/html")
+            return
+        query: dict[str, str] = {}
+        for parameter in url.query.split("&"):
+            key, _, value = parameter.partition("=")
+            query[key] = value
+
+        if not self.server.count_request():
+            self.send_body(429, b"<h1>Too Many Requests</h1>", "text/html", {"Retry-After": str(self.server.ratelimit_reset())})
+            return
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if query.get("a") == "version":
+            self.send_body(200, str(self.server.api_version).encode(), "text/plain")
+            return
+        for type in ("nation", "region"):
+            if type in query and "c" not in query:
+                self.send_record(type, unquote(query[type]), query.get("q"))
+                return
+        self.send_body(400, b"<h1>Bad Request</h1><p>The emulator only serves nation and region shards.</p>", "text/html")
+
+    def do_POST(self) -> None:
+        self.send_body(400, b"<h1>Bad Request</h1><p>Private commands aren't emulated.</p>", "text/html")
+
+    def send_record(self, type: str, name: str, q: Optional[str]) -> None:
+        store: Optional[DumpStore] = self.server.stores.get(type)
+        if store is None:
+            self.send_body(400, f"<h1>Bad Request</h1><p>No {type} data dump loaded.</p>".encode(), "text/html")
+            return
+        raw_record: Optional[bytes] = store.get_raw(name)
+        if raw_record is None:
+            self.send_body(404, f"<h1>Not Found</h1><p>Unknown {type}.</p>".encode(), "text/html")
+            return
+        last_modified: Optional[str] = store.last_modified
+        if last_modified and self.headers.get("If-Modified-Since") == last_modified:
+            self.send_body(304, b"", None, {"Last-Modified": last_modified})
+            return
+
+        encoding: str = store.encoding
+        tag: bytes = DUMP_TAGS[type][1].encode()
+        record_id: bytes = normalize_name(name).replace("%20", "_").encode(encoding)
+        if q:
+            shards, *shard_params = q.split(";")
+            params: dict[str, str] = dict(param.partition("=")[::2] for param in shard_params)
+            wanted: set[str] = shard_keys(shards)
+            parts: list[bytes] = []
+            for child_tag, start, end in record_children(raw_record, encoding):
+                if format_key(child_tag, replace_empty="_", delete_not_alpha=True) not in wanted:
+                    continue
+                child: bytes = raw_record[start:end]
+                if child_tag == "CENSUS" and params.get("scale"):
+                    child = filter_scales(child, params["scale"])
+                parts.append(child)
+            content: bytes = b"\n".join(parts)
+        else:
+            content = raw_record[raw_record.index(b">") + 1:raw_record.rindex(b"</")].strip()
+        body: bytes = (b'<?xml version="1.0" encoding="' + encoding.encode() + b'"?>\n<' + tag + b' id="' + record_id + b'">\n'
+                       + content + b"\n</" + tag + b">\n")
+        self.send_body(200, body, f"text/xml; charset={encoding}", {"Last-Modified": last_modified} if last_modified else None)
+
+    def send_body(self, status: int, body: bytes, content_type: Optional[str], headers: Optional[dict] = None) -> None:
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in self.server.ratelimit_headers().items():
+            self.send_header(key, value)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+class APIEmulator(ThreadingHTTPServer):
+    """
+    Local NationStates API emulator serving nations and regions from daily data dumps (runs in a background thread).
+
+    Speaks the `api.cgi?nation=...&q=...&v=12` protocol built by `URLManager`: the standard API and any
+    shard found in the dump (`census` honours the `scale` param), `a=version`, 404 for unknown names.
+    World, World Assembly and private requests aren't emulated (400). Give `api_url` to a client as its
+    `api_base_url` to develop offline or load test your pipelines.
+
+    ### nation_store / region_store:
+
+    > Indexed dumps (`DumpStore` or their directories, see `AwesomeNations.index_daily_data_dumps()`).
+
+    ### ratelimit / ratelimit_period:
+
+    > Requests allowed per sliding window, like NationStates (50 per 30 seconds): responses carry
+    > the same ratelimit headers and a 429 with `Retry-After` once the limit is hit. Give a large
+    > `ratelimit` (and the client a no-op `Ratelimiter()`) to run at full speed.
+
+    ### latency:
+
+    > Seconds added to every response, to look like a remote server.
+    """
+    daemon_threads = True
+
+    def __init__(self,
+                 nation_store: Optional[DumpStore | str | Path] = None,
+                 region_store: Optional[DumpStore | str | Path] = None,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 ratelimit: int = 50,
+                 ratelimit_period: float = 30,
+                 latency: float = 0.0,
+                 api_version: int = 12):
+        stores: dict[str, DumpStore] = {}
+        for type, store in (("nation", nation_store), ("region", region_store)):
+            if store is not None:
+                stores[type] = store if isinstance(store, DumpStore) else DumpStore(store, type)
+        if not stores:
+            raise ValueError("APIEmulator needs a nation or region store.")
+        super().__init__((host, port), APIRequestHandler)
+        self.stores: dict[str, DumpStore] = stores
+        self.api_path: str = "/cgi-bin/api.cgi"
+        self.ratelimit: int = ratelimit
+        self.ratelimit_period: float = ratelimit_period
+        self.latency: float = latency
+        self.api_version: int = api_version
+        self.requests: int = 0
+        self.rejected_requests: int = 0
+
+        self._request_times: deque[float] = deque()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def __repr__(self):
+        return f"APIEmulator(api_url={self.api_url}, stores={list(self.stores)}, ratelimit={self.ratelimit}/{self.ratelimit_period}s, requests={self.requests})"
+
+    def __enter__(self) -> "APIEmulator":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    @property
+    def api_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{self.api_path}"
+
+    def start(self) -> "APIEmulator":
+        self._thread = threading.Thread(target=self.serve_forever, name="AwesomeNations-emulator", daemon=True)
+        self._thread.start()
+        logger.debug("API emulator running at: %s", self.api_url)
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def count_request(self) -> bool:
+        "Counts a request in the ratelimit window, returns False (not counted) if the limit is reached."
+        with self._lock:
+            now: float = time.monotonic()
+            self._forget_old_requests(now)
+            if len(self._request_times) >= self.ratelimit:
+                self.rejected_requests += 1
+                return False
+            self._request_times.append(now)
+            self.requests += 1
+            return True
+
+    def ratelimit_reset(self) -> int:
+        "Seconds until the oldest request of the window leaves it."
+        with self._lock:
+            now: float = time.monotonic()
+            self._forget_old_requests(now)
+            if not self._request_times:
+                return 0
+            return math.ceil(self._request_times[0] + self.ratelimit_period - now)
+
+    def ratelimit_headers(self) -> dict[str, str]:
+        "The ratelimit headers read by `WrapperConnection.update_ratelimit_status()`."
+        with self._lock:
+            requests_seen: int = len(self._request_times)
+        return {
+            "RateLimit-Policy": f"{self.ratelimit};w={self.ratelimit_period:g}",
+            "RateLimit-Limit": str(self.ratelimit),
+            "RateLimit-Remaining": str(max(self.ratelimit - requests_seen, 0)),
+            "RateLimit-Reset": str(self.ratelimit_reset()),
+            "X-ratelimit-requests-seen": str(requests_seen),
+        }
+
+    def _forget_old_requests(self, now: float) -> None:
+        while self._request_times and self._request_times[0] <= now - self.ratelimit_period:
+            self._request_times.popleft()
+
+if __name__ == "__main__":
+    with APIEmulator("./datadump", ratelimit=10**9) as emulator:
+        print(f"NationStates API emulator running at {emulator.api_url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,248 @@
+from awesomeNations.connection import WrapperConnection, AsyncConnection, URLManager
+from awesomeNations.customMethods import join_keys, format_key
+from awesomeNations.internalTools import NationAuth, AwesomeParser
+from awesomeNations.ratelimit import Ratelimiter, TokenBucketRatelimiter
+from awesomeNations.cache import ResponseCache
+from awesomeNations.instrumentation import Instrumentation
+from awesomeNations.exceptions import HTTPError
+from pprint import pprint as pp
+from typing import Optional, Literal
+from urllib3 import Timeout
+from logging import WARNING
+import asyncio
+import logging
+
+logger = logging.getLogger("AwesomeLogger")
+
+# Used by Nation and Region when they're created without a client: the connection of the latest client.
+async_connection: AsyncConnection = AsyncConnection(WrapperConnection())
+url_manager = URLManager("https://www.nationstates.net/cgi-bin/api.cgi")
+
+class AsyncAwesomeNations():
+    """
+    # 🚩 AsyncAwesomeNations 🚩
+
+    The asyncio flavour of `AwesomeNations`: same settings, same methods, but every request
+    method is a coroutine. Concurrent requests share one connection pool and one ratelimit
+    budget, so you can `asyncio.gather()` lots of them and keep many requests in flight.
+
+    ### max_concurrent_requests:
+
+    > How many requests can be in flight at the same time (also the connection pool size).
+    > Keep it reasonable, the NationStates API ratelimit is shared by all of them!
+
+    With `coalesce_window`, shard requests for the same target gathered together are merged into one request.
+
+    See `AwesomeNations` for every other setting. Like `AwesomeNations`, every client has its own
+    connection (`self.connection`) and binds `api.Nation`/`api.Region` to it.
+    """
+
+    def __init__(self,
+                 user_agent: str,
+                 request_timeout: int | tuple = (15, 10),
+                 ratelimit_sleep: bool = True,
+                 ratelimit_reset_time: int = 30,
+                 api_version: int = 12,
+                 log_level: Optional[int] = WARNING,
+                 max_concurrent_requests: int = 10,
+                 ratelimiter: Optional[Ratelimiter] = None,
+                 cache: Optional[ResponseCache] = None,
+                 parser_engine: Literal["fast", "xmltodict"] = "fast",
+                 result_mode: Literal["dict", "lazy"] = "dict",
+                 coalesce_window: Optional[float] = None,
+                 instrumentation: Optional[Instrumentation] = None,
+                 api_base_url: Optional[str] = None):
+        self.user_agent: str = user_agent
+        self.request_timeout: int | tuple = request_timeout
+        self.ratelimit_sleep: bool = ratelimit_sleep
+        self.ratelimit_reset_time: int = ratelimit_reset_time
+        self.api_version: int = api_version
+        self.log_level: Optional[int] = log_level
+        self.ratelimiter: Ratelimiter = ratelimiter if ratelimiter else TokenBucketRatelimiter(period=self.ratelimit_reset_time)
+        self.cache: Optional[ResponseCache] = cache
+        self.parser_engine: str = parser_engine
+        self.result_mode: str = result_mode
+        self.max_concurrent_requests: int = max_concurrent_requests
+        self.url_manager: URLManager = URLManager(api_base_url) if api_base_url else url_manager
+
+        headers: dict = {
+        "User-Agent": self.user_agent,
+        "Cache-Control": "no-cache",
+        }
+
+        wrapper = WrapperConnection(headers,
+                                    self.ratelimit_sleep,
+                                    self.ratelimit_reset_time,
+                                    self.api_version,
+                                    ratelimiter=self.ratelimiter,
+                                    cache=self.cache,
+                                    parser=AwesomeParser(self.parser_engine),
+                                    result_mode=self.result_mode,
+                                    coalesce_window=coalesce_window,
+                                    instrumentation=instrumentation)
+        wrapper.request_timeout = Timeout(connect=self.request_timeout[0], read=self.request_timeout[1]) if type(self.request_timeout) is tuple else int(self.request_timeout)
+        self.connection = AsyncConnection(wrapper, self.max_concurrent_requests)
+
+        # api.Nation and api.Region are subclasses bound to this client connection (and API url).
+        client_attributes: dict = {"_client_connection": self.connection, "_client_url_manager": self.url_manager}
+        self.Nation = type("Nation", (AsyncAwesomeNations.Nation,), {**client_attributes, "__doc__": AsyncAwesomeNations.Nation.__doc__})
+        self.Region = type("Region", (AsyncAwesomeNations.Region,), {**client_attributes, "__doc__": AsyncAwesomeNations.Region.__doc__})
+        global async_connection
+        async_connection = self.connection
+
+        if self.log_level is None:
+            logger.disabled = True
+        elif type(self.log_level) is int:
+            logger.level = self.log_level
+        else:
+            raise ValueError(f"Invalid {type(self.log_level).__name__} '{self.log_level}', log_level must be an int (to change level) or None (to disable logging)")
+
+    def __repr__(self):
+        return f"AsyncAwesomeNations(user_agent={self.user_agent}, request_timeout={self.request_timeout}, ratelimit_sleep={self.ratelimit_sleep}, ratelimit_reset_time={self.ratelimit_reset_time}, api_version={self.api_version}, log_level={self.log_level}, max_concurrent_requests={self.max_concurrent_requests})"
+
+    async def __aenter__(self) -> "AsyncAwesomeNations":
+        return self
+
+    async def __aexit__(self, *exception) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        "Waits for running requests and releases the request threads."
+        await asyncio.to_thread(self.connection.close)
+
+    async def get_world_shards(self, shards: str | tuple[str] | list[str], **kwargs) -> dict:
+        """
+        Gets one or more shards from the World API.
+        """
+        for kwarg in kwargs:
+            kwargs[kwarg] = join_keys(kwargs[kwarg])
+        params: Optional[str] = join_keys([f"{kwarg}={kwargs[kwarg]}" for kwarg in kwargs], ";") if kwargs else None
+        url: str = self.url_manager.generate_shards_url("world", shards, params)
+        response: dict = await self.connection.fetch_api_data(url)
+        return response
+
+    async def get_world_assembly_shards(self, shards: str | tuple[str] | list[str], **kwargs) -> dict:
+        """
+        Gets one or more shards from the World Assembly API.
+        """
+        for kwarg in kwargs:
+            kwargs[kwarg] = join_keys(kwargs[kwarg])
+        params: Optional[str] = join_keys([f"{kwarg}={kwargs[kwarg]}" for kwarg in kwargs], ";") if kwargs else None
+        url: str = self.url_manager.generate_shards_url("wa",
+                                                   shards,
+                                                   params,
+                                                   council_id=kwargs["council_id"])
+        response: dict = await self.connection.fetch_api_data(url)
+        return response
+
+    async def get_api_latest_version(self) -> int:
+        """Gets NationStates API latest version"""
+        url = f"{self.url_manager.api_base_url}?a=version"
+        latest_version: int = int(await self.connection.fetch_raw_data(url))
+        return latest_version
+
+    class Nation:
+        """
+        Class dedicated to NationStates nation API (asyncio flavour).
+        """
+        _client_connection: Optional[AsyncConnection] = None
+        _client_url_manager: Optional[URLManager] = None
+
+        def __init__(self,
+                     nation_name: str,
+                     password: str = None,
+                     autologin: str = None) -> None:
+            self.nation_name: str = format_key(nation_name, False, '%20') # Name is automatically parsed.
+            self._connection: AsyncConnection = self._client_connection or async_connection
+            self._url_manager: URLManager = self._client_url_manager or url_manager
+            # Nations with the same credentials share one session (X-Pin).
+            self._auth: Optional[NationAuth] = self._connection.wrapper.sessions.get(self.nation_name, password, autologin)
+
+        def __repr__(self):
+            return f"Nation(nation_name={self.nation_name})"
+
+        async def exists(self) -> bool:
+            """
+            Checks if nation exists.
+            """
+            url = self._url_manager.generate_shards_url("nation",
+                                                  None,
+                                                  None,
+                                                  nation_name=self.nation_name)
+            status_code: int = await self._connection.connection_status_code(url)
+            match status_code:
+                case 200:
+                    return True
+                case 404:
+                    return False
+                case _:
+                    raise HTTPError(status_code)
+
+        async def get_shards(self, shards: Optional[str | tuple[str] | list[str]] = None, **kwargs) -> dict:
+            """
+            Gets one or more shards from the requested nation, returns the standard API if no shards provided.
+            """
+            for kwarg in kwargs:
+                kwargs[kwarg] = join_keys(kwargs[kwarg])
+            params: Optional[str] = join_keys([f"{kwarg}={kwargs[kwarg]}" for kwarg in kwargs], ";") if kwargs else None
+            url: str = self._url_manager.generate_shards_url("nation",
+                                                       shards,
+                                                       params,
+                                                       nation_name=self.nation_name)
+            response: dict = await self._connection.fetch_api_data(url, auth=self._auth)
+            return response
+
+    class Region:
+        """
+        Class dedicated to NationStates region API (asyncio flavour).
+        """
+        _client_connection: Optional[AsyncConnection] = None
+        _client_url_manager: Optional[URLManager] = None
+
+        def __init__(self, region_name: str) -> None:
+            self.region_name = format_key(region_name, False, '%20')
+            self._connection: AsyncConnection = self._client_connection or async_connection
+            self._url_manager: URLManager = self._client_url_manager or url_manager
+
+        def __repr__(self):
+            return f"Region(region_name={self.region_name})"
+
+        async def exists(self) -> bool:
+            """
+            Checks if region exists.
+            """
+            url = self._url_manager.generate_shards_url("region",
+                                                  None,
+                                                  None,
+                                                  region_name=self.region_name)
+            status_code: int = await self._connection.connection_status_code(url)
+            match status_code:
+                case 200:
+                    return True
+                case 404:
+                    return False
+                case _:
+                    raise HTTPError(status_code)
+
+        async def get_shards(self, shards: Optional[str | tuple[str] | list[str]] = None, **kwargs) -> dict:
+            """
+            Gets one or more shards from the requested region, returns the standard API if no shards provided.
+            """
+            for kwarg in kwargs:
+                kwargs[kwarg] = join_keys(kwargs[kwarg])
+            params: Optional[str] = join_keys([f"{kwarg}={kwargs[kwarg]}" for kwarg in kwargs], ";") if kwargs else None
+            url: str = self._url_manager.generate_shards_url("region",
+                                                       shards,
+                                                       params,
+                                                       region_name=self.region_name)
+            response: dict = await self._connection.fetch_api_data(url)
+            return response
+
+if __name__ == "__main__":
+    async def main():
+        async with AsyncAwesomeNations("AwesomeNations/Test", log_level=0) as api:
+            nations = ("testlandia", "orlys", "maxtopia")
+            responses = await asyncio.gather(*(api.Nation(nation).get_shards("name") for nation in nations))
+            pp(responses)
+
+    asyncio.run(main())
@@ -0,0 +1,274 @@
+from awesomeNations.internalTools import NationAuth
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from typing import Optional, Any
+from pathlib import Path
+import threading
+import sqlite3
+import pickle
+import time
+import zlib
+
+# Seconds each shard stays fresh, the lowest TTL among the requested shards wins.
+# Census names and descriptions practically never change, private shards are never cached.
+DEFAULT_SHARD_TTLS: dict[str, float] = {
+    "censusname": 86400,
+    "censusdesc": 86400,
+    "censusscale": 86400,
+    "censustitle": 86400,
+    "censusid": 86400,
+    "numnations": 300,
+    "numregions": 300,
+    "happenings": 0,
+    "lasthappening": 0,
+    "newnations": 0,
+    "regionsbytag": 300,
+    "dossier": 0,
+    "issues": 0,
+    "issuesummary": 0,
+    "nextissue": 0,
+    "nextissuetime": 0,
+    "notices": 0,
+    "packs": 0,
+    "ping": 0,
+    "rdossier": 0,
+    "unread": 0,
+}
+
+class ResponseCache():
+    """
+    In-memory cache for parsed API responses, with per-shard TTLs and LRU eviction.
+
+    Entries are keyed on the full API url (shards, parameters and api version included).
+    Authenticated requests are also keyed on their credentials, so private data is never
+    served to other nations or to unauthenticated requests.
+
+    ### default_ttl:
+
+    > Seconds a response stays fresh when none of its shards is in `shard_ttls`.
+
+    ### shard_ttls:
+
+    > Seconds each shard stays fresh, merged over `DEFAULT_SHARD_TTLS`. A TTL of 0 disables caching.
+
+    ### max_entries:
+
+    > How many responses are kept, the least recently used ones are evicted first.
+    """
+    def __init__(self,
+                 default_ttl: float = 60,
+                 shard_ttls: Optional[dict[str, float]] = None,
+                 max_entries: int = 1024):
+        if max_entries < 1:
+            raise ValueError(f"{max_entries}: max_entries must be at least 1.")
+        self.default_ttl: float = default_ttl
+        self.shard_ttls: dict[str, float] = {**DEFAULT_SHARD_TTLS, **(shard_ttls or {})}
+        self.max_entries: int = max_entries
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"ResponseCache(default_ttl={self.default_ttl}, max_entries={self.max_entries}, entries={len(self)})"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def make_key(self,
+                 url: str,
+                 query_parameters: Optional[dict] = None,
+                 auth: Optional[NationAuth] = None) -> str:
+        """
+        Builds the cache key of a request, `url` must already contain the api version.
+        """
+        key: str = url
+        if query_parameters:
+            key += "|" + "&".join(f"{parameter}={query_parameters[parameter]}" for parameter in sorted(query_parameters))
+        if auth:
+            key += "|auth=" + auth.fingerprint
+        return key
+
+    def ttl_for(self, url: str) -> float:
+        """
+        Gets how long a response stays fresh, based on the shards requested by `url`.
+        """
+        shards: list[str] = []
+        for parameter in urlsplit(url).query.split("&"):
+            key, _, value = parameter.partition("=")
+            if key == "q" and value:
+                shards = value.split(";")[0].split("+")
+        if not shards:
+            return self.default_ttl
+        return min(self.shard_ttls.get(shard.lower(), self.default_ttl) for shard in shards)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Gets a fresh copy of a cached response, returns None if missing or expired.
+        """
+        with self._lock:
+            entry: Optional[tuple[float, bytes]] = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # Copies are handed out, so callers can't modify cached responses.
+        return pickle.loads(entry[1])
+
+    def get_stale(self, key: str) -> Optional[tuple[Any, dict[str, str]]]:
+        """
+        Gets an expired response and its validators (`ETag`, `Last-Modified`) for a conditional request,
+        returns None if there's nothing to revalidate.
+        """
+        return None
+
+    def refresh(self, key: str, ttl: Optional[float] = None) -> None:
+        """
+        Marks a revalidated response (304 Not Modified) as fresh for another `ttl` seconds.
+        """
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, validators: Optional[dict[str, str]] = None) -> None:
+        """
+        Caches a response for `ttl` seconds (`default_ttl` if None), does nothing if the TTL is 0.
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        serialized_value: bytes = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, serialized_value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        "Returns hit/miss counters."
+        with self._lock:
+            requests: int = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / requests if requests else 0.0,
+            }
+
+class DiskCache(ResponseCache):
+    """
+    Persistent `ResponseCache` stored in a SQLite database, surviving restarts and shared by processes.
+
+    Responses are stored already parsed (pickled and compressed), so hits never run the XML parser again.
+    Expired responses are kept (until evicted) with their `ETag`/`Last-Modified` headers, when the server
+    provided them, and are revalidated with a conditional request instead of downloaded again.
+
+    Authenticated (private) responses are never written to disk.
+    Only open cache files you trust, they're unpickled!
+    """
+    def __init__(self,
+                 filepath: str | Path = "./awesomeNations.cache.sqlite",
+                 default_ttl: float = 60,
+                 shard_ttls: Optional[dict[str, float]] = None,
+                 max_entries: int = 100_000):
+        super().__init__(default_ttl, shard_ttls, max_entries)
+        self.filepath: Path = Path(filepath)
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    expires REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    value BLOB NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT
+                )""")
+            connection.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+
+    def __repr__(self):
+        return f"DiskCache(filepath={self.filepath}, default_ttl={self.default_ttl}, max_entries={self.max_entries}, entries={len(self)})"
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Any]:
+        now: float = time.time()
+        with self._connection() as connection:
+            row: Optional[tuple] = connection.execute("SELECT value FROM responses WHERE key = ? AND expires > ?", (key, now)).fetchone()
+            if row is not None:
+                connection.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return pickle.loads(zlib.decompress(row[0]))
+
+    def get_stale(self, key: str) -> Optional[tuple[Any, dict[str, str]]]:
+        row: Optional[tuple] = self._connection().execute("SELECT value, etag, last_modified FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or not any(row[1:]):
+            return None
+        validators: dict[str, str] = {}
+        if row[1]:
+            validators["ETag"] = row[1]
+        if row[2]:
+            validators["Last-Modified"] = row[2]
+        return pickle.loads(zlib.decompress(row[0])), validators
+
+    def refresh(self, key: str, ttl: Optional[float] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        now: float = time.time()
+        with self._connection() as connection:
+            connection.execute("UPDATE responses SET expires = ?, last_access = ? WHERE key = ?", (now + ttl, now, key))
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, validators: Optional[dict[str, str]] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0 or "|auth=" in key:
+            return
+        validators = validators or {}
+        serialized_value: bytes = zlib.compress(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        now: float = time.time()
+        with self._connection() as connection:
+            connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                               (key, now + ttl, now, serialized_value, validators.get("ETag"), validators.get("Last-Modified")))
+            excess: int = connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+            if excess > 0:
+                connection.execute("DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_access LIMIT ?)", (excess,))
+                with self._lock:
+                    self.evictions += excess
+
+    def clear(self) -> None:
+        with self._connection() as connection:
+            connection.execute("DELETE FROM responses")
+
+    def stats(self) -> dict[str, int | float]:
+        entries: int = len(self)
+        output: dict[str, int | float] = super().stats()
+        output["entries"] = entries
+        return output
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, SQLite handles locking between threads and processes.
+        connection: Optional[sqlite3.Connection] = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.filepath, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+if __name__ == "__main__":
+    cache = ResponseCache()
+    url = "https://www.nationstates.net/cgi-bin/api.cgi?q=censusname;scale=46&v=12"
+    cache.set(cache.make_key(url), {"world": {"census": {"id": 46}}}, cache.ttl_for(url))
+    print(cache.get(cache.make_key(url)), cache.stats())
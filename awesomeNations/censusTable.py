@@ -0,0 +1,139 @@
+from awesomeNations.customMethods import as_list
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Optional, Any
+from pathlib import Path
+from array import array
+import math
+import csv
+
+# (column name, array typecode): int32 scale ids, float64 for everything else (NaN when missing).
+CENSUS_COLUMNS: tuple[tuple[str, str]] = (
+    ("id", "i"),
+    ("score", "d"),
+    ("rank", "d"),
+    ("rrank", "d"),
+    ("prank", "d"),
+    ("prrank", "d"),
+)
+
+def as_float(value: Any) -> float:
+    return math.nan if value is None else float(value)
+
+class CensusTable():
+    """
+    Columnar census data: one row per (name, scale), every numeric column is a packed `array.array`.
+
+    Scale ids are int32, scores and ranks are float64 (NaN when the API didn't send them).
+    Columns can be handed to NumPy or Arrow without copying (`to_numpy()`, `to_arrow()`)
+    and written in bulk with `write_csv()` or `write_parquet()`.
+    """
+    columns: tuple[str] = ("name",) + tuple(column for column, typecode in CENSUS_COLUMNS)
+
+    def __init__(self):
+        self.name: list[str] = []
+        self._arrays: dict[str, array] = {column: array(typecode) for column, typecode in CENSUS_COLUMNS}
+
+    def __repr__(self):
+        return f"CensusTable(rows={len(self)}, names={len(set(self.name))})"
+
+    def __len__(self) -> int:
+        return len(self.name)
+
+    def __getitem__(self, column: str) -> list[str] | array:
+        if column == "name":
+            return self.name
+        return self._arrays[column]
+
+    def __iter__(self) -> Iterator[tuple]:
+        "Iterates over rows, as tuples ordered like `columns`."
+        return zip(self.name, *self._arrays.values())
+
+    def append(self, name: str, scale: Mapping) -> None:
+        "Appends one census scale (a parsed `<SCALE>`, like `{'id': 46, 'score': 7432.07, 'rank': 28725}`)."
+        self.name.append(name)
+        self._arrays["id"].append(int(scale["id"]))
+        for column, typecode in CENSUS_COLUMNS[1:]:
+            self._arrays[column].append(as_float(scale.get(column)))
+
+    def add_census(self, name: str, census: Optional[Mapping]) -> None:
+        "Appends every scale of a parsed census shard (`response['nation']['census']`)."
+        for scale in as_list(census["scale"] if census else None):
+            self.append(name, scale)
+
+    def add_census_ranks(self, census_ranks: Optional[Mapping]) -> None:
+        "Appends the nations of a parsed censusranks shard (`response['world']['censusranks']`)."
+        if not census_ranks:
+            return
+        scale_id: int = int(census_ranks["id"])
+        for nation in as_list(census_ranks["nations"]["nation"] if census_ranks.get("nations") else None):
+            self.append(str(nation["name"]), {"id": scale_id, "score": nation.get("score"), "rank": nation.get("rank")})
+
+    def extend(self, other: "CensusTable") -> None:
+        "Appends every row of another table."
+        self.name.extend(other.name)
+        for column in self._arrays:
+            self._arrays[column].extend(other._arrays[column])
+
+    def to_dict(self) -> dict[str, list[str] | array]:
+        "Columns by name (the arrays themselves, not copies)."
+        return {column: self[column] for column in self.columns}
+
+    def to_numpy(self) -> dict[str, Any]:
+        """
+        Columns as NumPy arrays (numeric ones share memory with the table). Requires numpy.
+        """
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("CensusTable.to_numpy() requires numpy: pip install numpy") from None
+        columns: dict[str, Any] = {"name": numpy.array(self.name, dtype=object)}
+        columns["id"] = numpy.frombuffer(self._arrays["id"], dtype=numpy.int32)
+        for column, typecode in CENSUS_COLUMNS[1:]:
+            columns[column] = numpy.frombuffer(self._arrays[column], dtype=numpy.float64)
+        return columns
+
+    def to_arrow(self) -> Any:
+        """
+        The table as a `pyarrow.Table` (NaN scores and ranks become nulls). Requires pyarrow.
+        """
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError("CensusTable.to_arrow() requires pyarrow: pip install pyarrow") from None
+        columns: dict[str, Any] = {"name": pyarrow.array(self.name, pyarrow.string()),
+                                   "id": pyarrow.array(self._arrays["id"], pyarrow.int32())}
+        for column, typecode in CENSUS_COLUMNS[1:]:
+            columns[column] = pyarrow.array(self._arrays[column], pyarrow.float64(), from_pandas=True)
+        return pyarrow.table(columns)
+
+    def write_csv(self, filepath: str | Path) -> None:
+        "Writes the table as CSV (missing values are left empty)."
+        with open(filepath, "w", newline="", encoding="utf-8") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(self.columns)
+            writer.writerows(tuple("" if value != value else value for value in row) for row in self)
+
+    def write_parquet(self, filepath: str | Path) -> None:
+        "Writes the table as Parquet. Requires pyarrow."
+        arrow_table = self.to_arrow()
+        import pyarrow.parquet
+        pyarrow.parquet.write_table(arrow_table, filepath)
+
+    @classmethod
+    def from_census(cls, name: str, census: Optional[Mapping]) -> "CensusTable":
+        table = cls()
+        table.add_census(name, census)
+        return table
+
+    @classmethod
+    def concat(cls, tables: Iterable["CensusTable"]) -> "CensusTable":
+        "Joins many tables into a new one."
+        output = cls()
+        for table in tables:
+            output.extend(table)
+        return output
+
+if __name__ == "__main__":
+    table = CensusTable.from_census("testlandia", {"scale": [{"id": 46, "score": 7432.07, "rank": 28725, "rrank": 10},
+                                                             {"id": 1, "score": 56.3}]})
+    print(table, list(table))
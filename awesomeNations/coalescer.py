@@ -0,0 +1,131 @@
+from collections.abc import Callable
+from typing import Optional, Any
+import threading
+import logging
+import time
+
+logger = logging.getLogger("AwesomeLogger")
+
+def split_shards_url(url: str) -> Optional[tuple[str, list[str], str]]:
+    """
+    Splits a shards url (as built by `URLManager.generate_shards_url()`) into
+    `(url without q, shards, shard params)`, returns None if it has no shards.
+    """
+    base_url, separator, query = url.partition("?")
+    if not separator:
+        return None
+    parameters: list[str] = query.split("&")
+    for position, parameter in enumerate(parameters):
+        if parameter.startswith("q=") and len(parameter) > 2:
+            shards, _, shard_params = parameter[2:].partition(";")
+            other_parameters: str = "&".join(parameters[:position] + parameters[position + 1:])
+            return f"{base_url}?{other_parameters}", shards.split("+"), shard_params
+    return None
+
+def join_shards_url(url: str, shards: list[str], shard_params: str) -> str:
+    "Inverse of `split_shards_url()`."
+    return f"{url}&q={'+'.join(shards)}" + (f";{shard_params}" if shard_params else "")
+
+def copy_response(response: Any) -> Any:
+    # Callers share the parsed response: each one gets its own outer dictionaries, so adding
+    # or removing keys doesn't leak to the others (nested values are still shared).
+    if isinstance(response, dict):
+        return {key: dict(value) if isinstance(value, dict) else value for key, value in response.items()}
+    return response
+
+class PendingRequest():
+    """
+    Shards requested for one target during a coalescing window, and the outcome of the merged request.
+    """
+    def __init__(self):
+        self.shards: dict[str, None] = {} # Insertion ordered set.
+        self.callers: int = 0
+        self.response: Any = None
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+
+class RequestCoalescer():
+    """
+    Merges shard requests for the same target sent within `window` seconds into one request.
+
+    The first request of a target waits `window` seconds, requests for the same nation (or region,
+    world, wa council) with the same shard params and authentication join it meanwhile, then one
+    request asks for all their shards (`q=name+region+census`) and every caller gets the response
+    (which may hold more shards than it asked for). Requests without shards are sent as they come.
+
+    ### fetch:
+
+    > What sends the merged requests, `fetch(url, query_parameters, auth)`.
+
+    ### max_shards:
+
+    > Shards per merged request, a full request stops taking new callers.
+    """
+    def __init__(self,
+                 fetch: Callable[[str, Optional[dict], Any], Any],
+                 window: float = 0.02,
+                 max_shards: int = 32):
+        self.fetch: Callable[[str, Optional[dict], Any], Any] = fetch
+        self.window: float = window
+        self.max_shards: int = max_shards
+        self.requests_received: int = 0
+        self.requests_sent: int = 0
+
+        self._pending: dict[tuple, PendingRequest] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"RequestCoalescer(window={self.window}, requests_received={self.requests_received}, requests_sent={self.requests_sent})"
+
+    def fetch_api_data(self, url: str, query_parameters: Optional[dict] = None, auth: Any = None) -> Any:
+        """
+        Same as `WrapperConnection.fetch_api_data()`, but merged with concurrent requests for the same target.
+        """
+        parts: Optional[tuple[str, list[str], str]] = split_shards_url(url) if query_parameters is None else None
+        if parts is None:
+            with self._lock:
+                self.requests_received += 1
+                self.requests_sent += 1
+            return self.fetch(url, query_parameters, auth)
+
+        base_url, shards, shard_params = parts
+        key: tuple = (base_url, shard_params, id(auth) if auth is not None else None)
+        with self._lock:
+            self.requests_received += 1
+            pending: Optional[PendingRequest] = self._pending.get(key)
+            leader: bool = pending is None or len(pending.shards.keys() | set(shards)) > self.max_shards
+            if leader:
+                pending = PendingRequest()
+                self._pending[key] = pending
+            pending.shards.update(dict.fromkeys(shards))
+            pending.callers += 1
+
+        if leader:
+            self._send(key, pending, base_url, shard_params, auth)
+        else:
+            pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return copy_response(pending.response) if pending.callers > 1 else pending.response
+
+    def _send(self, key: tuple, pending: PendingRequest, base_url: str, shard_params: str, auth: Any) -> None:
+        time.sleep(self.window)
+        with self._lock:
+            # Closed: later requests for this target start a new batch.
+            if self._pending.get(key) is pending:
+                del self._pending[key]
+            self.requests_sent += 1
+            shards: list[str] = list(pending.shards)
+        if pending.callers > 1:
+            logger.debug("Coalesced %s requests into one: %s", pending.callers, "+".join(shards))
+        try:
+            pending.response = self.fetch(join_shards_url(base_url, shards, shard_params), None, auth)
+        except BaseException as e:
+            pending.error = e
+        finally:
+            pending.done.set()
+
+if __name__ == "__main__":
+    url: str = "https://www.nationstates.net/cgi-bin/api.cgi?nation=testlandia&q=census+name;scale=all&v={v}"
+    print(split_shards_url(url))
+    print(join_shards_url(*split_shards_url(url)))
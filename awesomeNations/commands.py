@@ -0,0 +1,110 @@
+from awesomeNations.connection import WrapperConnection, URLManager
+from awesomeNations.internalTools import NationAuth
+from awesomeNations.exceptions import CommandError
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from collections.abc import Iterable, Iterator
+from typing import Optional, NamedTuple
+import logging
+import time
+import re
+
+logger = logging.getLogger("AwesomeLogger")
+
+# Commands that need a token: mode=prepare first, then mode=execute with the token.
+TWO_STEP_COMMANDS: frozenset[str] = frozenset({"dispatch", "rmbpost", "giftcard"})
+
+TOKEN_PATTERN: re.Pattern = re.compile(r"<SUCCESS>\s*([^<]*?)\s*</SUCCESS>")
+ERROR_PATTERN: re.Pattern = re.compile(r"<ERROR>\s*([^<]*?)\s*</ERROR>")
+
+class PrivateCommand(NamedTuple):
+    """
+    A private command ready to be sent, built with `Nation.make_command()`.
+    """
+    nation_name: str
+    command: str
+    parameters: dict
+    auth: NationAuth
+
+    @property
+    def two_step(self) -> bool:
+        return self.command in TWO_STEP_COMMANDS
+
+class CommandResult(NamedTuple):
+    """
+    One result of `run_commands()`: the parsed response, or the error raised while sending the command.
+    """
+    command: PrivateCommand
+    data: Optional[dict] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+class CommandPipeline():
+    """
+    Sends private commands, paced by the connection command ratelimiter.
+
+    Each command reserves its execute slot first. Two-step commands send their prepare request
+    `prepare_ahead` seconds before that slot, so prepares of a batch run in parallel and every
+    execute fires as soon as the ratelimit allows, with a fresh token. Commands of one nation run
+    one at a time, prepare and execute together, as the X-Pin requires.
+    """
+    def __init__(self,
+                 connection: WrapperConnection,
+                 url_manager: URLManager,
+                 max_workers: int = 4,
+                 prepare_ahead: float = 5):
+        self.connection: WrapperConnection = connection
+        self.url_manager: URLManager = url_manager
+        self.max_workers: int = max_workers
+        self.prepare_ahead: float = prepare_ahead
+
+    def execute(self, command: PrivateCommand) -> dict:
+        """
+        Sends one command (prepare and execute if needed), returns the parsed execute response.
+        """
+        url: str = self.url_manager.generate_command_url(command.nation_name, command.command)
+        fields: dict = {key: str(value) for key, value in command.parameters.items()}
+        # Held until the execute returns: another command of this nation would change the X-Pin between
+        # prepare and execute. The slot is reserved once it's held, so a waiting command can't miss it.
+        with command.auth.lock:
+            execute_at: float = time.monotonic() + self.connection.command_ratelimiter.reserve()
+            if command.two_step:
+                time.sleep(max(0.0, execute_at - self.prepare_ahead - time.monotonic()))
+                prepared: dict = self.connection.send_command(url, {**fields, "mode": "prepare"}, command.auth)
+                fields = {**fields, "mode": "execute", "token": self._token(command, prepared["data"])}
+            # Waits for the reserved slot.
+            response: dict = self.connection.send_command(url, fields, command.auth, execute_at)
+        error: Optional[re.Match] = ERROR_PATTERN.search(response["data"])
+        if error:
+            raise CommandError(command.command, error.group(1))
+        return self.connection.parser.parse_xml(response)
+
+    def run(self, commands: Iterable[PrivateCommand]) -> Iterator[CommandResult]:
+        """
+        Sends many commands with `max_workers` threads, yielding results as they finish.
+        Errors are reported per command instead of raised, stopping early cancels the commands not started yet.
+        """
+        executor = ThreadPoolExecutor(self.max_workers, "AwesomeNations-commands")
+        try:
+            futures: dict[Future, PrivateCommand] = {executor.submit(self.execute, command): command for command in commands}
+            for future in as_completed(futures):
+                error: Optional[BaseException] = future.exception()
+                if error:
+                    yield CommandResult(futures[future], error=error)
+                else:
+                    yield CommandResult(futures[future], future.result())
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _token(command: PrivateCommand, prepared_data: str) -> str:
+        # Read from the raw response: tokens must not go through number conversion.
+        error: Optional[re.Match] = ERROR_PATTERN.search(prepared_data)
+        if error:
+            raise CommandError(command.command, error.group(1))
+        token: Optional[re.Match] = TOKEN_PATTERN.search(prepared_data)
+        if not token:
+            raise CommandError(command.command, "No token in the prepare response.")
+        return token.group(1)
@@ -1,131 +1,575 @@
 from awesomeNations.customMethods import join_keys, string_is_number
 from awesomeNations.exceptions import HTTPError, DataError
-from awesomeNations.internalTools import AwesomeParser
-from awesomeNations.internalTools import NationAuth
+from awesomeNations.internalTools import AwesomeParser, XMLFeedParser, XMLItemStream
+from awesomeNations.internalTools import NationAuth, SessionPool
+from awesomeNations.ratelimit import Ratelimiter, TokenBucketRatelimiter
+from awesomeNations.cache import ResponseCache
+from awesomeNations.lazyResults import LazyResponse
+from awesomeNations.coalescer import RequestCoalescer
+from awesomeNations.instrumentation import Instrumentation, RequestMetrics, TIMED_POOL_CLASSES, reset_connect_time, last_connect_time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate, parsedate_to_datetime
+from collections.abc import Callable, Iterator
 from typing import Optional, Literal, Any
 from urllib3 import BaseHTTPResponse
 from pprint import pprint as pp
 from pathlib import Path
+import threading
 import urllib3
+import asyncio
 import logging
+import gzip
+import zlib
 import time
+import os
 
 logger = logging.getLogger("AwesomeLogger")
 
-parser = AwesomeParser()
-
 class WrapperConnection():
+    """
+    Sends requests to NationStates: one connection pool, one ratelimit status and one set of settings.
+
+    Every client owns its own `WrapperConnection`, so clients never share settings. A connection can be
+    used by many threads at once: authentication is given per request and shared state is lock-protected.
+
+    ### num_pools / pool_maxsize:
+
+    > How many hosts keep a connection pool, and how many connections each pool keeps open
+    > (one per concurrent request).
+
+    ### coalesce_window:
+
+    > If set, shard requests for the same target made within this many seconds are merged
+    > into one request (see `RequestCoalescer`).
+
+    ### instrumentation:
+
+    > An `Instrumentation` measuring every request (phase timings, bytes, ratelimit headroom).
+    """
     def __init__(self,
                  headers: dict = None,
                  ratelimit_sleep: bool = True,
                  ratelimit_reset_time: int = 30,
                  api_version: int = 12,
+                 pool_maxsize: int = 1,
+                 num_pools: int = 4,
+                 ratelimiter: Optional[Ratelimiter] = None,
+                 cache: Optional[ResponseCache] = None,
+                 parser: Optional[AwesomeParser] = None,
+                 result_mode: Literal["dict", "lazy"] = "dict",
+                 command_ratelimiter: Optional[Ratelimiter] = None,
+                 coalesce_window: Optional[float] = None,
+                 instrumentation: Optional[Instrumentation] = None,
                  ):
-        self.headers: dict = headers
+        self.headers: dict = dict(headers) if headers else {}
         self.request_timeout: int | tuple = 10
         self.ratelimit_sleep: bool = ratelimit_sleep
         self.ratelimit_reset_time: int = ratelimit_reset_time
         self.ratelimit_remaining: int = None
         self.ratelimit_requests_seen: int = None
+        self.ratelimiter: Ratelimiter = ratelimiter if ratelimiter else TokenBucketRatelimiter(period=ratelimit_reset_time)
+        self.max_ratelimit_retries: int = 3
+        # Private commands (issues, dispatches, RMB posts...) have a stricter ratelimit of their own.
+        self.command_ratelimiter: Ratelimiter = command_ratelimiter if command_ratelimiter else TokenBucketRatelimiter(limit=10, period=60)
+        self.cache: Optional[ResponseCache] = cache
+        self.parser: AwesomeParser = parser if parser else AwesomeParser()
+        self.result_mode: str = result_mode
         self.api_version: int = api_version
+        self.pool_maxsize: int = pool_maxsize
+        self.num_pools: int = num_pools
+        self.instrumentation: Optional[Instrumentation] = instrumentation
         
-        self._pool_manager = urllib3.PoolManager(4,
-                                                self.headers,
-                                                retries=False)
+        self._pool_manager = self._new_pool_manager()
         self.last_request_headers: dict = {}
-        self._auth: Optional[NationAuth] = None
+        # One session (X-Pin) per nation, shared by every Nation object of this connection.
+        self.sessions: SessionPool = SessionPool()
+        # Guards the ratelimit status, last_request_headers and the pool manager swap.
+        self._lock = threading.Lock()
+        # Merges concurrent shard requests for the same target (opt-in).
+        self.coalescer: Optional[RequestCoalescer] = RequestCoalescer(self._fetch_api_data, coalesce_window) if coalesce_window else None
+
+    def set_pool_maxsize(self, pool_maxsize: int) -> None:
+        """
+        Changes how many connections are kept open per host (one per concurrent request).
+        """
+        with self._lock:
+            if pool_maxsize == self.pool_maxsize:
+                return
+            self.pool_maxsize = pool_maxsize
+            old_pool_manager = self._pool_manager
+            self._pool_manager = self._new_pool_manager()
+        old_pool_manager.clear()
+
+    def _new_pool_manager(self) -> urllib3.PoolManager:
+        pool_manager = urllib3.PoolManager(self.num_pools,
+                                           retries=False,
+                                           maxsize=self.pool_maxsize)
+        if self.instrumentation is not None:
+            # Connections time their connect() for the metrics.
+            pool_manager.pool_classes_by_scheme = TIMED_POOL_CLASSES
+        return pool_manager
 
     def fetch_api_data(self,
                        url: str = 'https://www.nationstates.net/',
-                       query_parameters: Optional[dict] = None) -> dict:
+                       query_parameters: Optional[dict] = None,
+                       auth: Optional[NationAuth] = None) -> dict | LazyResponse:
         """
         This fetches API data and automatically parses it: (xml response -> python dictionary)
+        
+        In the "lazy" result mode, a `LazyResponse` is returned instead, parsed only when read.
+        `auth` authenticates this request only (private shards): requests of the same nation session
+        are sent one at a time, reusing its X-Pin and logging in again if the server rejects it.
         """
+        if self.coalescer is not None:
+            return self.coalescer.fetch_api_data(url, query_parameters, auth)
+        return self._fetch_api_data(url, query_parameters, auth)
+
+    def _fetch_api_data(self,
+                        url: str,
+                        query_parameters: Optional[dict] = None,
+                        auth: Optional[NationAuth] = None) -> dict | LazyResponse:
         url = url.format(v=self.api_version)
-        logger.debug(f"Fetching API data: {url}")
+        if self.instrumentation is not None:
+            with self.instrumentation.request(url):
+                return self._fetch_and_parse(url, query_parameters, auth)
+        return self._fetch_and_parse(url, query_parameters, auth)
+
+    def _fetch_and_parse(self,
+                         url: str,
+                         query_parameters: Optional[dict] = None,
+                         auth: Optional[NationAuth] = None) -> dict | LazyResponse:
+        logger.debug("Fetching API data: %s", url)
+        metrics: Optional[RequestMetrics] = self.instrumentation.current() if self.instrumentation is not None else None
         
-        # Updates headers X-Password, X-Autologin and X-Pin in the next request
-        # for actions that need authentication (Like private shards).
-        if self._auth:
-            self.headers.update(self._auth.get())
+        cache_key: Optional[str] = None
+        stale_response: Optional[tuple[dict, dict[str, str]]] = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(url, query_parameters, auth)
+            cached_response: Optional[dict] = self.cache.get(cache_key)
+            if cached_response is not None:
+                logger.debug("Cache hit: %s", url)
+                if metrics is not None:
+                    metrics.cache = "hit"
+                return cached_response
+            stale_response = self.cache.get_stale(cache_key)
+        
+        extra_headers: dict = self.conditional_headers(stale_response[1]) if stale_response else {}
+        # Parsed while downloading, except when measured (download and parse are timed apart) or lazy.
+        stream: bool = metrics is None and self.result_mode != "lazy"
+        if auth:
+            # Each response may change the session X-Pin, so a session sends one request at a time.
+            with auth.lock:
+                response = self._authenticated_request(url, auth, extra_headers, query_parameters, preload_content=not stream)
+        else:
+            response = self._request(url, headers={**self.headers, **extra_headers}, fields=query_parameters, timeout=self.request_timeout, preload_content=not stream)
+
+        if response.status != 200:
+            response.drain_conn()
+            response.release_conn()
 
-        response = self._pool_manager.request("GET", url, headers=self.headers, fields=query_parameters, timeout=self.request_timeout)
+        if response.status == 304 and stale_response:
+            logger.debug("Cache revalidated: %s", url)
+            if metrics is not None:
+                metrics.cache = "revalidated"
+            self.cache.refresh(cache_key, self.cache.ttl_for(url))
+            return stale_response[0]
 
         if response.status != 200:
             raise HTTPError(response.status)
         
-        self.last_request_headers.update(response.headers)
-        x_pin_header: int | None = response.headers.get("X-Pin")
+        with self._lock:
+            self.last_request_headers.update(response.headers)
+
+        if self.result_mode == "lazy":
+            parsed_response = LazyResponse(response.data)
+        elif stream:
+            parsed_response = self.parse_response_stream(response)
+        else:
+            start: float = time.perf_counter()
+            parsed_response = self.parser.parse_bytes(response.data, self.response_charset(response.headers))
+            metrics.parse += time.perf_counter() - start
+        if cache_key is not None:
+            self.cache.set(cache_key, parsed_response, self.cache.ttl_for(url), self.response_validators(response.headers))
+        return parsed_response
+
+    def stream_api_data(self,
+                        url: str,
+                        depth: int = 2,
+                        auth: Optional[NationAuth] = None,
+                        chunk_size: int = 2**16) -> Iterator[tuple[tuple[str, ...], Any]]:
+        """
+        Like `fetch_api_data()`, but yields the response elements as `(path, value)` while it downloads
+        (see `XMLItemStream` for `depth`), so the whole dictionary is never built.
         
-        # Updates self._auth X-Pin if necessary (for quick sucessive requests):
-        if self._auth and x_pin_header:
-            if self._auth.xpin != x_pin_header:
-                self._auth.xpin = x_pin_header
+        Streamed responses are never cached nor coalesced. The request is sent on the first `next()`,
+        closing the generator early drops the connection.
+        """
+        url = url.format(v=self.api_version)
+        logger.debug("Streaming API data: %s", url)
+        if auth:
+            with auth.lock:
+                response = self._authenticated_request(url, auth, {}, preload_content=False)
+        else:
+            response = self._request(url, headers=self.headers, timeout=self.request_timeout, preload_content=False)
+
+        if response.status != 200:
+            response.drain_conn()
+            response.release_conn()
+            raise HTTPError(response.status)
 
-        self.update_ratelimit_status(response.headers)
+        with self._lock:
+            self.last_request_headers.update(response.headers)
 
-        parsed_response = parser.parse_xml(self.decode_response_data(response))
-        return parsed_response
+        item_stream: XMLItemStream = self.parser.item_stream(depth, self.response_charset(response.headers))
+        # Measured requests are downloaded before parsing (see _timed_request).
+        chunks: Iterator[bytes] = iter((response.data,)) if self.instrumentation is not None else response.stream(chunk_size)
+        try:
+            yield from item_stream.iter_items(chunks)
+        except BaseException:
+            # Failed or abandoned: a half-read connection can't go back to the pool.
+            response.close()
+            raise
+        finally:
+            response.release_conn()
+
+    def _authenticated_request(self,
+                               url: str,
+                               auth: NationAuth,
+                               extra_headers: dict,
+                               query_parameters: Optional[dict] = None,
+                               method: Literal["GET", "POST"] = "GET",
+                               **kwargs) -> BaseHTTPResponse:
+        # Headers X-Pin (logged in) or X-Password/X-Autologin for actions that need authentication
+        # (Like private shards), only for this request.
+        auth_headers: dict = auth.request_headers()
+        response = self._request(url, method, headers={**self.headers, **auth_headers, **extra_headers}, fields=query_parameters, timeout=self.request_timeout, **kwargs)
+        if response.status in (403, 409) and "X-Pin" in auth_headers:
+            logger.debug("Session X-Pin rejected (%s), logging in again.", response.status)
+            response.drain_conn()
+            auth.reset_pin()
+            response = self._request(url, method, headers={**self.headers, **auth.request_headers(), **extra_headers}, fields=query_parameters, timeout=self.request_timeout, **kwargs)
+        if response.status == 200:
+            # Keeps the X-Pin and X-Autologin for the next requests.
+            auth.update(response.headers)
+        return response
+
+    def send_command(self,
+                     url: str,
+                     fields: dict,
+                     auth: NationAuth,
+                     execute_at: Optional[float] = None) -> dict[str]:
+        """
+        Sends a private command (POST), returns the decoded response (`{'data': ..., 'encoding': ...}`).
+        
+        Commands are never cached, and wait for the command ratelimiter on top of the API one: for a new
+        slot, or for the slot reserved beforehand at `execute_at` (a `time.monotonic()` time, see
+        `CommandPipeline`). Prepare requests (`mode=prepare`) don't take a command slot.
+        """
+        if fields.get("mode") != "prepare":
+            if execute_at is None:
+                execute_at = time.monotonic() + self.command_ratelimiter.reserve()
+            waiting_time: float = execute_at - time.monotonic()
+            if waiting_time > 0:
+                logger.debug("Command ratelimiter waiting: %.3f seconds", waiting_time)
+                time.sleep(waiting_time)
+        url = url.format(v=self.api_version)
+        logger.debug("Sending command: %s (%s)", url, fields.get("mode", "execute"))
+        with auth.lock:
+            response = self._authenticated_request(url, auth, {}, fields, "POST")
+        if response.status != 200:
+            raise HTTPError(response.status)
+        return self.decode_response_data(response)
 
     def fetch_raw_data(self,
                        url: str) -> str:
-        logger.debug(f"Fetching raw data: {url}")
+        logger.debug("Fetching raw data: %s", url)
+        
+        cache_key: Optional[str] = None
+        stale_response: Optional[tuple[str, dict[str, str]]] = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(url)
+            cached_data: Optional[str] = self.cache.get(cache_key)
+            if cached_data is not None:
+                return cached_data
+            stale_response = self.cache.get_stale(cache_key)
         
-        response = self._pool_manager.request("GET", url)
+        response = self._request(url, headers={**self.headers, **self.conditional_headers(stale_response[1])} if stale_response else self.headers)
+        
+        if response.status == 304 and stale_response:
+            self.cache.refresh(cache_key, self.cache.ttl_for(url))
+            return stale_response[0]
         
         if response.status != 200:
             raise HTTPError(response.status)
         
-        self.update_ratelimit_status(response.headers)
-        
-        return self.decode_response_data(response)["data"].strip()
+        data: str = self.decode_response_data(response)["data"].strip()
+        if cache_key is not None:
+            self.cache.set(cache_key, data, self.cache.ttl_for(url), self.response_validators(response.headers))
+        return data
+
+    @staticmethod
+    def conditional_headers(validators: dict[str, str]) -> dict[str, str]:
+        "Turns cached response validators into conditional request headers."
+        headers: dict[str, str] = {}
+        if validators.get("ETag"):
+            headers["If-None-Match"] = validators["ETag"]
+        if validators.get("Last-Modified"):
+            headers["If-Modified-Since"] = validators["Last-Modified"]
+        return headers
+
+    @staticmethod
+    def response_validators(response_headers: dict) -> dict[str, str]:
+        "Gets the headers needed to revalidate a response later (ETag and Last-Modified)."
+        return {key: response_headers[key] for key in ("ETag", "Last-Modified") if response_headers.get(key)}
 
     def fetch_file(self,
                    url: str,
-                   filepath: str | Path) -> None:
-        "Dowloads a file"
-        
-        logger.debug(f"Dowloading Daily Data Dump: {url}")
+                   filepath: str | Path,
+                   chunk_size: int = 2**20,
+                   resume: bool = True,
+                   skip_if_current: bool = True,
+                   progress: Optional[Callable[[int, Optional[int]], Any]] = None,
+                   max_retries: int = 5) -> bool:
+        """
+        Downloads a file as is (a `.gz` stays compressed), returns False if the local copy was already current.
         
-        if not Path(filepath).suffix:
+        The download goes to `<filepath>.part` first: an interrupted download resumes from there
+        (HTTP Range), both within this call (up to `max_retries` times) and in later calls.
+        Gzip files are checked (CRC) before replacing `filepath`. `progress(downloaded, total)` is called
+        after every chunk (total is None if unknown).
+        """
+        filepath = Path(filepath)
+        if not filepath.suffix:
             raise ValueError(f"{filepath}: This path needs a suffix dude!")
-        with self._pool_manager.request("GET", url, preload_content=False) as file_response, open(filepath, "wb") as file_out:
-            for chunk in file_response.stream(10**4, True):
+        partial_filepath: Path = filepath.with_name(filepath.name + ".part")
+        validator_filepath: Path = filepath.with_name(filepath.name + ".part.validator")
+        if not resume:
+            partial_filepath.unlink(missing_ok=True)
+        
+        modified_since: Optional[str] = None
+        if skip_if_current and filepath.exists() and not partial_filepath.exists():
+            modified_since = formatdate(filepath.stat().st_mtime, usegmt=True)
+        validator: Optional[str] = validator_filepath.read_text() if partial_filepath.exists() and validator_filepath.exists() else None
+        
+        logger.debug("Dowloading Daily Data Dump: %s", url)
+        
+        response_headers: dict = {}
+        with open(partial_filepath, "ab") as file_out:
+            chunks = self.iter_file(url, chunk_size, file_out.tell(), validator, modified_since, max_retries, response_headers)
+            for chunk in chunks:
+                if response_headers.pop("restarted", False):
+                    # The server sent the whole file (changed, or no Range support): start over.
+                    file_out.seek(0)
+                    file_out.truncate()
+                if response_headers.get("validator") != validator:
+                    # Saved for If-Range, so a later call only resumes the same version of the file.
+                    validator = response_headers.get("validator")
+                    validator_filepath.write_text(validator or "")
                 file_out.write(chunk)
+                if progress:
+                    progress(file_out.tell(), response_headers.get("total"))
+        
+        if response_headers.get("not_modified"):
+            partial_filepath.unlink(missing_ok=True)
+            logger.debug("Daily Data Dump is up to date: %s", filepath)
+            return False
+        
+        self.verify_file(partial_filepath)
+        os.replace(partial_filepath, filepath)
+        validator_filepath.unlink(missing_ok=True)
+        if response_headers.get("last_modified"):
+            # The file gets the server date, so the next If-Modified-Since check is exact.
+            last_modified: float = parsedate_to_datetime(response_headers["last_modified"]).timestamp()
+            os.utime(filepath, (last_modified, last_modified))
         
-        logger.debug(f"Daily Data Dump located in: {filepath}")
+        logger.debug("Daily Data Dump located in: %s", filepath)
+        return True
+
+    def iter_file(self,
+                  url: str,
+                  chunk_size: int = 2**20,
+                  start: int = 0,
+                  validator: Optional[str] = None,
+                  modified_since: Optional[str] = None,
+                  max_retries: int = 5,
+                  response_headers: Optional[dict] = None) -> Iterator[bytes]:
+        """
+        Yields the raw bytes of a file from byte `start`, never decompressing them (decode_content=False).
+        
+        Dropped connections are resumed with HTTP Range (up to `max_retries` times in a row).
+        `response_headers` (if given) is filled with "total", "last_modified", "validator",
+        "not_modified" (304) and "restarted" (the server ignored the Range, bytes start from 0 again).
+        """
+        status: dict = response_headers if response_headers is not None else {}
+        retries: int = 0
+        position: int = start
+        while True:
+            headers: dict = dict(self.headers)
+            if modified_since and position == 0:
+                headers["If-Modified-Since"] = modified_since
+            if position:
+                headers["Range"] = f"bytes={position}-"
+                if validator:
+                    # Only resume if the file didn't change since the partial download started.
+                    headers["If-Range"] = validator
+            try:
+                response = self._pool_manager.request("GET", url, headers=headers, preload_content=False, decode_content=False, timeout=self.request_timeout)
+                try:
+                    if response.status == 304:
+                        status["not_modified"] = True
+                        return
+                    if response.status == 416:
+                        # The partial file is bigger than the file (it changed): start over.
+                        position = 0
+                        status["restarted"] = True
+                        continue
+                    if response.status not in (200, 206):
+                        raise HTTPError(response.status)
+                    if response.status == 200 and position:
+                        position = 0
+                        status["restarted"] = True
+                    status["last_modified"] = response.headers.get("Last-Modified")
+                    validator = response.headers.get("ETag") or status["last_modified"]
+                    status["validator"] = validator
+                    content_length: Optional[int] = self.get_header(response.headers, "Content-Length")
+                    status["total"] = position + content_length if type(content_length) is int else None
+                    for chunk in response.stream(chunk_size, decode_content=False):
+                        position += len(chunk)
+                        retries = 0
+                        yield chunk
+                    if status["total"] is None or position >= status["total"]:
+                        return
+                    raise urllib3.exceptions.ProtocolError(f"Connection closed after {position} of {status['total']} bytes.")
+                finally:
+                    response.release_conn()
+            except (urllib3.exceptions.ProtocolError, urllib3.exceptions.TimeoutError, urllib3.exceptions.NewConnectionError) as e:
+                retries += 1
+                if retries > max_retries:
+                    raise
+                waiting_time: float = min(30, 2 ** retries)
+                logger.warning("Download interrupted at %s bytes (%s), resuming in %s seconds.", position, e, waiting_time)
+                time.sleep(waiting_time)
+
+    @staticmethod
+    def verify_file(filepath: str | Path) -> None:
+        """
+        Checks a downloaded gzip file (CRC and length), raises DataError if it's corrupted.
+        """
+        with open(filepath, "rb") as file:
+            if file.read(2) != b"\x1f\x8b":
+                return
+        try:
+            with gzip.open(filepath, "rb") as file:
+                while file.read(2**20):
+                    pass
+        except (OSError, EOFError, zlib.error) as e:
+            Path(filepath).unlink(missing_ok=True)
+            raise DataError(str(filepath), f"Corrupted download ({e}), it was deleted.")
 
     def connection_status_code(self, url: str = 'https://www.nationstates.net/') -> int:
         url = url.format(v=self.api_version)
         
-        logger.debug(f"Testing connection status code of: {url}")
+        logger.debug("Testing connection status code of: %s", url)
         
-        response = self._pool_manager.request("GET", url, headers=self.headers, timeout=20)
+        response = self._request(url, headers=self.headers, timeout=20)
         
-        self.last_request_headers.update(response.headers)
-        self.update_ratelimit_status(response.headers)
+        with self._lock:
+            self.last_request_headers.update(response.headers)
         
-        logger.debug(f"{url} status code is: {response.status}")
+        logger.debug("%s status code is: %s", url, response.status)
 
         return response.status
    
     def check_api_ratelimit(self) -> None:
         """
-        Checks the NationStates API ratelimit and hibernates if the request limit was reached.
+        Checks the NationStates API ratelimit and waits until the next request can be sent.
         """
         if self.ratelimit_sleep:
-            if self.ratelimit_remaining != None and self.ratelimit_remaining < 1:
-                    logger.warning(f"API ratelimit reached, your code will be paused for: {self.ratelimit_reset_time} seconds.")
-                    time.sleep(self.ratelimit_reset_time + 1)
-                    logger.info("Hibernation finished")
+            self.ratelimiter.acquire()
 
     def update_ratelimit_status(self, response_headers: dict) -> None:
-        self.ratelimit_remaining = self.get_header(response_headers, "Ratelimit-remaining")
-        self.ratelimit_requests_seen = self.get_header(response_headers, "X-ratelimit-requests-seen")
+        ratelimit_remaining: Optional[int] = self.get_header(response_headers, "Ratelimit-remaining")
+        ratelimit_requests_seen: Optional[int] = self.get_header(response_headers, "X-ratelimit-requests-seen")
+        ratelimit_reset: Optional[int] = self.get_header(response_headers, "Ratelimit-reset")
+        if ratelimit_reset is None:
+            ratelimit_reset = self.get_header(response_headers, "Retry-After")
+        with self._lock:
+            self.ratelimit_remaining = ratelimit_remaining
+            self.ratelimit_requests_seen = ratelimit_requests_seen
         
-        logger.info(f"Ratelimit remaining: {self.ratelimit_remaining}")
+        logger.info("Ratelimit remaining: %s", ratelimit_remaining)
         
+        self.ratelimiter.update(ratelimit_remaining,
+                                ratelimit_reset if type(ratelimit_reset) is int else None,
+                                ratelimit_requests_seen if type(ratelimit_requests_seen) is int else None)
+
+    def _request(self, url: str, method: Literal["GET", "POST"] = "GET", **kwargs) -> BaseHTTPResponse:
+        """
+        Sends a request paced by the ratelimiter, retries (if ratelimit_sleep) after 429 Too Many Requests.
+        """
+        if method == "POST":
+            # Form-encoded, like the NationStates site.
+            kwargs.setdefault("encode_multipart", False)
+        if self.instrumentation is not None:
+            with self.instrumentation.request(url, method) as metrics:
+                return self._send_request(url, method, metrics, **kwargs)
+        return self._send_request(url, method, None, **kwargs)
+
+    def _send_request(self, url: str, method: str, metrics: Optional[RequestMetrics], **kwargs) -> BaseHTTPResponse:
+        attempts: int = 0
+        while True:
+            if metrics is None:
+                self.check_api_ratelimit()
+                response = self._pool_manager.request(method, url, **kwargs)
+            else:
+                response = self._timed_request(url, method, metrics, **kwargs)
+            self.update_ratelimit_status(response.headers)
+            if metrics is not None:
+                metrics.ratelimit_remaining = self.ratelimit_remaining
+            if response.status != 429 or not self.ratelimit_sleep or attempts >= self.max_ratelimit_retries:
+                return response
+            attempts += 1
+            response.drain_conn()
+            retry_after: Optional[int] = self.get_header(response.headers, "Retry-After")
+            self.ratelimiter.backoff(retry_after if type(retry_after) is int else None)
+
+    def _timed_request(self, url: str, method: str, metrics: RequestMetrics, **kwargs) -> BaseHTTPResponse:
+        kwargs.pop("preload_content", None)
+        start: float = time.perf_counter()
         self.check_api_ratelimit()
+        reset_connect_time()
+        sent: float = time.perf_counter()
+        # Body read separately, so time to first byte and download can be told apart.
+        response = self._pool_manager.request(method, url, preload_content=False, **kwargs)
+        headers_received: float = time.perf_counter()
+        data: bytes = response.read(cache_content=True)
+        response.release_conn()
+        connect: float = last_connect_time()
+        metrics.attempts += 1
+        metrics.status = response.status
+        metrics.bytes_received += len(data)
+        metrics.wait += sent - start
+        metrics.connect += connect
+        metrics.ttfb += headers_received - sent - connect
+        metrics.download += time.perf_counter() - headers_received
+        return response
+
+    def parse_response_stream(self, response: BaseHTTPResponse, chunk_size: int = 2**16) -> dict:
+        """
+        Parses a response (requested with `preload_content=False`) while it downloads, straight from
+        its bytes: the body is never decoded to `str` nor joined in memory (unless its encoding is unknown, see `XMLFeedParser`).
+        """
+        feed_parser: XMLFeedParser = self.parser.feed_parser(self.response_charset(response.headers))
+        try:
+            for chunk in response.stream(chunk_size):
+                feed_parser.feed(chunk)
+        except BaseException:
+            # A half-read connection can't go back to the pool.
+            response.close()
+            raise
+        finally:
+            response.release_conn()
+        return feed_parser.close()
 
     def decode_response_data(self, response: BaseHTTPResponse) -> dict[str] | None:
         encodings: tuple[str] = ("UTF-8", "LATIN-1")
@@ -138,11 +582,20 @@ class WrapperConnection():
                 }
                 return data
             except Exception as decoding_error:
-                logger.warning(F"Failed to decode response using {enc}")
+                logger.warning("Failed to decode response using %s", enc)
                 tries += 1
                 if tries >= len(encodings):
                     raise DataError("API Response", "Decoding error.")
 
+    @staticmethod
+    def response_charset(response_headers: dict) -> Optional[str]:
+        "The charset of the Content-Type header, if any."
+        for parameter in response_headers.get("Content-Type", "").split(";")[1:]:
+            key, _, value = parameter.strip().partition("=")
+            if key.lower() == "charset" and value:
+                return value.strip('"')
+        return None
+
     def get_header(self, headers: dict, key: str, default = None) -> int | None:
         output_value: Any | None = default
         key_value: str | None = headers.get(key)
@@ -152,6 +605,55 @@ class WrapperConnection():
                 output_value = int(key_value)
         return output_value
 
+class AsyncConnection():
+    """
+    Runs `WrapperConnection` requests from coroutines.
+
+    Blocking requests run on a bounded thread pool sharing the wrapper's connection pool and
+    ratelimit status, so many requests can be in flight at once without blocking the event loop.
+    """
+    def __init__(self,
+                 wrapper: WrapperConnection,
+                 max_concurrent_requests: int = 10):
+        self.wrapper: WrapperConnection = wrapper
+        self.max_concurrent_requests: int = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.set_max_concurrent_requests(max_concurrent_requests)
+
+    def set_max_concurrent_requests(self, max_concurrent_requests: int) -> None:
+        if max_concurrent_requests < 1:
+            raise ValueError(f"{max_concurrent_requests}: max_concurrent_requests must be at least 1.")
+        if max_concurrent_requests == self.max_concurrent_requests:
+            return
+        self.max_concurrent_requests = max_concurrent_requests
+        self.wrapper.set_pool_maxsize(max_concurrent_requests)
+        self.close()
+        self._executor = ThreadPoolExecutor(max_concurrent_requests, "AwesomeNations")
+
+    async def fetch_api_data(self,
+                             url: str = 'https://www.nationstates.net/',
+                             query_parameters: Optional[dict] = None,
+                             auth: Optional[NationAuth] = None) -> dict:
+        return await self._run(self.wrapper.fetch_api_data, url, query_parameters, auth)
+
+    async def fetch_raw_data(self, url: str) -> str:
+        return await self._run(self.wrapper.fetch_raw_data, url)
+
+    async def connection_status_code(self, url: str = 'https://www.nationstates.net/') -> int:
+        return await self._run(self.wrapper.connection_status_code, url)
+
+    def close(self) -> None:
+        "Shuts down the thread pool, waiting for running requests."
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def _run(self, function, *args) -> Any:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_concurrent_requests, "AwesomeNations")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, function, *args)
+
 class URLManager():
     def __init__(self, api_base_url: str):
         self.api_base_url = api_base_url
@@ -198,6 +700,12 @@ class URLManager():
         full_url: str = self.api_base_url + "?" + querystring + "&v={v}"
         return full_url
 
+    def generate_command_url(self, nation_name: str, command: str) -> str:
+        """
+        Generates urls for private commands, command parameters are sent as form fields.
+        """
+        return f"{self.api_base_url}?nation={nation_name}&c={command}&v={{v}}"
+
 if __name__ == "__main__":
     headers = {"User-Agent": "AwesomeNations urllib3 test (by: Orlys; usdBy: Orlys)"}
     wrapper = WrapperConnection(headers)
@@ -46,6 +46,14 @@ def join_keys(keys: list[str] | tuple[str] = ['hello', 'world'], separator: str
         result = separator.join(string_keys)
     return str(result)
 
+def as_list(value: Any) -> list:
+    """
+    Single XML elements are parsed as a dictionary, repeated ones as a list: this always gives a list.
+    """
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
 def generate_epoch_timestamp() -> int:
     timestamp: int = int(time.time())
     return timestamp
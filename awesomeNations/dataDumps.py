@@ -0,0 +1,439 @@
+from awesomeNations.customMethods import format_key
+from awesomeNations.internalTools import AwesomeParser
+from awesomeNations.exceptions import DataError, HTTPError
+from xml.etree.ElementTree import iterparse, fromstring, ParseError, XMLParser
+from collections.abc import Iterable, Iterator, Callable
+from typing import Optional, Literal, BinaryIO, Any
+from urllib.parse import urlsplit, unquote
+from xml.parsers import expat
+from pprint import pprint as pp
+from pathlib import Path
+import logging
+import json
+import gzip
+import zlib
+import re
+import os
+
+logger = logging.getLogger("AwesomeLogger")
+
+parser = AwesomeParser()
+
+GZIP_MAGIC_NUMBER: bytes = b"\x1f\x8b"
+
+ENCODING_PATTERN: re.Pattern = re.compile(rb"""<\?xml[^>]*encoding=["']([A-Za-z0-9._-]+)["']""")
+
+# Shard params a DumpStore can apply (to the census shard), the others can't be answered from a dump.
+STORE_SHARD_PARAMS: tuple[str] = ("scale", "mode")
+
+# API shards whose dump element has another name (formatted keys): the API answers `wa` with <UNSTATUS>...
+DUMP_SHARD_KEYS: dict[str, str] = {
+    "wa": "unstatus",
+    "answered": "issuesanswered",
+}
+
+DUMP_TAGS: dict[str, tuple[str, str]] = {
+    "nation": ("NATIONS", "NATION"),
+    "region": ("REGIONS", "REGION"),
+}
+
+def open_data_dump(filepath: str | Path) -> BinaryIO:
+    """
+    Opens a daily data dump for binary reading, decompressing it on the fly if it's gzipped.
+    """
+    with open(filepath, "rb") as file:
+        magic_number: bytes = file.read(2)
+    if magic_number == GZIP_MAGIC_NUMBER:
+        return gzip.open(filepath, "rb")
+    return open(filepath, "rb")
+
+def gunzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Decompresses gzip chunks as they arrive (a download, for example), checking every member CRC.
+    """
+    decompressor = zlib.decompressobj(wbits=31)
+    for chunk in chunks:
+        while chunk:
+            data: bytes = decompressor.decompress(chunk)
+            if data:
+                yield data
+            # Concatenated gzip members: the next one starts in the unused data.
+            chunk = decompressor.unused_data
+            if chunk:
+                decompressor = zlib.decompressobj(wbits=31)
+    if not decompressor.eof:
+        raise DataError("data dump", "Truncated gzip stream.")
+
+def declared_encoding(data: bytes) -> str:
+    "The encoding declared by the XML declaration at the start of `data` (UTF-8 if none)."
+    declaration: Optional[re.Match] = ENCODING_PATTERN.match(data.lstrip()[:200])
+    return declaration.group(1).decode() if declaration else "UTF-8"
+
+def normalize_name(name: str) -> str:
+    """
+    Normalizes a nation or region name the same way `Nation` and `Region` do (underscores count as spaces).
+    """
+    return format_key(str(name).replace("_", " ").strip(), False, "%20")
+
+def shard_keys(shards: str | tuple[str] | list[str]) -> set[str]:
+    "The record keys holding API shards (`wa` is `unstatus` in a dump, see `DUMP_SHARD_KEYS`)."
+    if type(shards) is str:
+        shards = shards.split("+")
+    keys: set[str] = set()
+    for shard in shards:
+        key: str = format_key(shard, replace_empty="_", delete_not_alpha=True)
+        keys.add(DUMP_SHARD_KEYS.get(key, key))
+    return keys
+
+def select_shards(record: dict, shards: Optional[str | tuple[str] | list[str]] = None) -> dict:
+    """
+    Keeps only the requested shards of a parsed record (`{"nation": {...}}`), keeps everything if no shards provided.
+    """
+    if not shards:
+        return record
+    wanted: set[str] = shard_keys(shards)
+    output: dict = {}
+    for record_type, record_data in record.items():
+        output[record_type] = {key: value for key, value in record_data.items() if key in wanted}
+    return output
+
+def apply_census_params(record: dict, params: dict[str, str]) -> dict:
+    """
+    Applies `scale` and `mode` shard params to the census of a parsed record, like the API does:
+    only the listed scales (`all` keeps them all) and, per scale, only the listed modes.
+    """
+    for record_data in record.values():
+        census: Optional[dict] = record_data.get("census")
+        if not isinstance(census, dict) or "scale" not in census:
+            continue
+        scales: list[dict] = census["scale"] if isinstance(census["scale"], list) else [census["scale"]]
+        if params.get("scale") and params["scale"] != "all":
+            wanted_scales: set[int] = {int(scale) for scale in params["scale"].split("+")}
+            scales = [scale for scale in scales if scale.get("id") in wanted_scales]
+        if params.get("mode"):
+            wanted_keys: set[str] = {"id", *params["mode"].split("+")}
+            scales = [{key: value for key, value in scale.items() if key in wanted_keys} for scale in scales]
+        if not scales:
+            record_data["census"] = None
+        else:
+            record_data["census"] = {**census, "scale": scales if len(scales) > 1 else scales[0]}
+    return record
+
+class DataDumpReader():
+    """
+    Streams NationStates daily data dumps (the files saved by `get_daily_data_dumps()`), one record at a time.
+
+    Records are parsed like API responses, so a nation looks like `Nation.get_shards()` output:
+    `{"nation": {"name": ..., "region": ...}}`. Elements are freed as soon as they're yielded,
+    so memory stays flat no matter how big the dump is.
+    """
+    def __init__(self,
+                 filepath: str | Path,
+                 type: Optional[Literal["nation", "region"]] = None):
+        if type is not None and type not in DUMP_TAGS:
+            raise ValueError(f"{type} is invalid. Data dump type must be nation or region.")
+        self.filepath: Path = Path(filepath)
+        self.type: Optional[str] = type
+
+    def __repr__(self):
+        return f"DataDumpReader(filepath={self.filepath}, type={self.type})"
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.records()
+
+    def records(self,
+                shards: Optional[str | tuple[str] | list[str]] = None,
+                filter: Optional[Callable[[dict], bool]] = None) -> Iterator[dict]:
+        """
+        Yields every record of the data dump.
+
+        ### shards:
+
+        > Only keeps these keys of each record (like `get_shards()` shards), keeps everything if None.
+
+        ### filter:
+
+        > A function receiving the parsed record, only records it returns True for are yielded.
+        """
+        with open_data_dump(self.filepath) as dump_file:
+            context = iterparse(dump_file, events=("start", "end"))
+            try:
+                _, root = next(context)
+                self._check_root(root.tag)
+                depth: int = 1
+                for event, element in context:
+                    if event == "start":
+                        depth += 1
+                        continue
+                    depth -= 1
+                    if depth != 1:
+                        continue
+                    record: dict = parser.parse_element(element)
+                    root.clear() # Frees the record we just parsed.
+                    if filter and not filter(record):
+                        continue
+                    yield select_shards(record, shards)
+            except (ParseError, EOFError, OSError) as e:
+                raise DataError(str(self.filepath), e)
+
+    def find(self, name: str, shards: Optional[str | tuple[str] | list[str]] = None) -> dict | None:
+        """
+        Scans the data dump for a nation or region by name, returns None if not found.
+        """
+        wanted_name: str = normalize_name(name)
+        for record in self.records():
+            record_data: dict = next(iter(record.values()))
+            if normalize_name(record_data.get("name", "")) == wanted_name:
+                return select_shards(record, shards)
+        return None
+
+    def _check_root(self, root_tag: str) -> None:
+        expected_roots: list[str] = [DUMP_TAGS[self.type][0]] if self.type else [tags[0] for tags in DUMP_TAGS.values()]
+        if root_tag not in expected_roots:
+            raise DataError(str(self.filepath), f"Unexpected root element <{root_tag}>, is this a {self.type or 'nation or region'} data dump?")
+
+class DumpStore():
+    """
+    Indexed on-disk copy of a daily data dump, for quick nation or region lookups without the API.
+
+    `DumpStore.build()` decompresses the dump once and writes an index mapping each normalized name
+    (same rules as `Nation` and `Region`) to the byte offset of its record, so lookups seek straight
+    to the record instead of rescanning the dump.
+
+    It can be given to `Nation` or `Region` as their `backend`, serving `get_shards()` and `exists()` locally.
+    """
+    def __init__(self,
+                 directory: str | Path,
+                 type: Literal["nation", "region"] = "nation"):
+        if type not in DUMP_TAGS:
+            raise ValueError(f"{type} is invalid. Data dump type must be nation or region.")
+        self.directory: Path = Path(directory)
+        self.type: str = type
+        self.data_filepath, self.index_filepath = self.store_paths(self.directory, self.type)
+        
+        if not self.index_filepath.exists():
+            raise FileNotFoundError(f"{self.index_filepath}: No {type} index found, build one with DumpStore.build() first.")
+        with open(self.index_filepath, "r", encoding="utf-8") as index_file:
+            index: dict = json.load(index_file)
+        self.source: Optional[str] = index.get("source")
+        # Last-Modified of the downloaded dump, if the store was built while downloading it.
+        self.last_modified: Optional[str] = index.get("last_modified")
+        # Record slices have no XML declaration, they're parsed with the encoding of the dump.
+        self.encoding: str = index.get("encoding") or self._read_encoding()
+        self._records: dict[str, list[int]] = index["records"]
+
+    def __repr__(self):
+        return f"DumpStore(directory={self.directory}, type={self.type}, records={len(self)})"
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, name: str) -> bool:
+        return normalize_name(name) in self._records
+
+    def _read_encoding(self) -> str:
+        # Indexes built before the encoding was saved.
+        with open(self.data_filepath, "rb") as data_file:
+            return declared_encoding(data_file.read(200))
+
+    @staticmethod
+    def store_paths(directory: Path, type: str) -> tuple[Path, Path]:
+        "Returns the decompressed data dump and index filepaths of a store."
+        return directory / f"{type}s.xml", directory / f"{type}s.index.json"
+
+    @classmethod
+    def build(cls,
+              dump_filepath: str | Path,
+              directory: str | Path,
+              type: Literal["nation", "region"] = "nation",
+              chunk_size: int = 2**20) -> "DumpStore":
+        """
+        Indexes a data dump downloaded by `get_daily_data_dumps()` (one-time pass) and returns its store.
+        """
+        logger.debug("Indexing %s data dump: %s", type, dump_filepath)
+        with open_data_dump(dump_filepath) as dump_file:
+            return cls.build_from_chunks(iter(lambda: dump_file.read(chunk_size), b""), directory, type, str(dump_filepath))
+
+    @classmethod
+    def build_from_chunks(cls,
+                          chunks: Iterable[bytes],
+                          directory: str | Path,
+                          type: Literal["nation", "region"] = "nation",
+                          source: str = "data dump",
+                          last_modified: Optional[str] = None) -> "DumpStore":
+        """
+        Builds a store from decompressed data dump chunks (a download being decompressed on the fly, for example).
+        """
+        if type not in DUMP_TAGS:
+            raise ValueError(f"{type} is invalid. Data dump type must be nation or region.")
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        data_filepath, index_filepath = cls.store_paths(directory, type)
+        
+        with open(data_filepath, "wb") as data_out:
+            indexer = DumpIndexer(type, source)
+            for chunk in chunks:
+                data_out.write(chunk)
+                indexer.feed(chunk)
+            records: dict[str, list[int]] = indexer.close()
+        
+        temporary_index: Path = index_filepath.with_suffix(".tmp")
+        with open(temporary_index, "w", encoding="utf-8") as index_out:
+            json.dump({"type": type, "source": source, "last_modified": last_modified, "encoding": indexer.encoding, "records": records}, index_out)
+        os.replace(temporary_index, index_filepath)
+        
+        logger.debug("Indexed %s records in: %s", len(records), index_filepath)
+        return cls(directory, type)
+
+    def names(self) -> Iterator[str]:
+        "Yields every normalized name in the store."
+        return iter(self._records)
+
+    def get_raw(self, name: str) -> Optional[bytes]:
+        """
+        Gets the raw XML of a record, returns None if not found.
+        """
+        location: Optional[list[int]] = self._records.get(normalize_name(name))
+        if location is None:
+            return None
+        offset, length = location
+        with open(self.data_filepath, "rb") as data_file:
+            data_file.seek(offset)
+            return data_file.read(length)
+
+    def iter_raw(self, names: Optional[Iterable[str]] = None) -> Iterator[tuple[str, Optional[bytes]]]:
+        """
+        Yields `(name, raw XML)` for many records through one open file (every record, in dump order, if `names` is None).
+        """
+        with open(self.data_filepath, "rb") as data_file:
+            for name in (self._records if names is None else names):
+                location: Optional[list[int]] = self._records.get(normalize_name(name))
+                if location is None:
+                    yield name, None
+                    continue
+                offset, length = location
+                data_file.seek(offset)
+                yield name, data_file.read(length)
+
+    def get(self, name: str, shards: Optional[str | tuple[str] | list[str]] = None) -> Optional[dict]:
+        """
+        Gets a record parsed like `get_shards()` output, returns None if not found.
+        """
+        raw_record: Optional[bytes] = self.get_raw(name)
+        if raw_record is None:
+            return None
+        try:
+            record: dict = parser.parse_element(fromstring(raw_record, XMLParser(encoding=self.encoding)))
+        except ParseError as e:
+            raise DataError(str(self.data_filepath), e)
+        record_data: dict = record[self.type]
+        record_data = {"id": normalize_name(name).replace("%20", "_"), **record_data}
+        return select_shards({self.type: record_data}, ["id", *shards] if shards else None)
+
+    def fetch_api_data(self, url: str, query_parameters: Optional[dict] = None, auth: Any = None) -> dict:
+        """
+        Serves an API url (as built by `URLManager.generate_shards_url()`) from the store.
+        
+        The census `scale` and `mode` shard params are applied, other shard params raise ValueError
+        (a dump can't answer them). Shards missing from the record (not in dumps, like `policies`) are logged.
+        """
+        name, shards, shard_params = self._parse_url(url)
+        unsupported_params: list[str] = [param for param in shard_params if param not in STORE_SHARD_PARAMS]
+        if unsupported_params:
+            raise ValueError(f"{url}: A {self.type} store can't apply these shard params: {', '.join(unsupported_params)}.")
+        record: Optional[dict] = self.get(name, shards)
+        if record is None:
+            raise HTTPError(404)
+        if shards:
+            missing_shards: list[str] = sorted(shard_keys(shards) - record[self.type].keys())
+            if missing_shards:
+                logger.warning("%s: Shards not found in the %s data dump: %s", url, self.type, ", ".join(missing_shards))
+        return apply_census_params(record, shard_params) if shard_params else record
+
+    def connection_status_code(self, url: str) -> int:
+        name, _, _ = self._parse_url(url)
+        return 200 if name in self else 404
+
+    def _parse_url(self, url: str) -> tuple[str, Optional[list[str]], dict[str, str]]:
+        query: dict[str, str] = {}
+        for parameter in urlsplit(url).query.split("&"):
+            key, _, value = parameter.partition("=")
+            query[key] = value
+        if self.type not in query:
+            raise ValueError(f"{url}: This {self.type} store can only serve {self.type} API urls.")
+        shards: Optional[list[str]] = None
+        shard_params: dict[str, str] = {}
+        if query.get("q"):
+            shards_query, *params = query["q"].split(";")
+            shards = shards_query.split("+")
+            for param in params:
+                key, _, value = param.partition("=")
+                shard_params[key] = unquote(value)
+        return unquote(query[self.type]), shards, shard_params
+
+class DumpIndexer():
+    """
+    Finds the byte offset and length of each record while a data dump is fed to it, chunk by chunk.
+    """
+    def __init__(self, type: str, dump_name: str = "data dump"):
+        self.root_tag, self.record_tag = DUMP_TAGS[type]
+        self.dump_name: str = dump_name
+        self.records: dict[str, list[int]] = {}
+        
+        self._depth: int = 0
+        self._record_start: int = 0
+        self._name_parts: Optional[list[str]] = None
+        self._name: str = ""
+        self.encoding: str = "UTF-8"
+        self._parser = expat.ParserCreate()
+        self._parser.buffer_text = True
+        self._parser.XmlDeclHandler = self._xml_declaration
+        self._parser.StartElementHandler = self._start_element
+        self._parser.EndElementHandler = self._end_element
+        self._parser.CharacterDataHandler = self._character_data
+
+    def feed(self, chunk: bytes) -> None:
+        try:
+            self._parser.Parse(chunk, False)
+        except expat.ExpatError as e:
+            raise DataError(self.dump_name, e)
+
+    def close(self) -> dict[str, list[int]]:
+        try:
+            self._parser.Parse(b"", True)
+        except expat.ExpatError as e:
+            raise DataError(self.dump_name, e)
+        return self.records
+
+    def _xml_declaration(self, version: str, encoding: Optional[str], standalone: int) -> None:
+        if encoding:
+            self.encoding = encoding
+
+    def _start_element(self, tag: str, attributes: dict) -> None:
+        self._depth += 1
+        if self._depth == 1 and tag != self.root_tag:
+            raise DataError(self.dump_name, f"Unexpected root element <{tag}>, expected <{self.root_tag}>.")
+        if self._depth == 2:
+            self._record_start = self._parser.CurrentByteIndex
+            self._name = ""
+        elif self._depth == 3 and tag == "NAME":
+            self._name_parts = []
+
+    def _end_element(self, tag: str) -> None:
+        if self._depth == 3 and self._name_parts is not None:
+            self._name = "".join(self._name_parts)
+            self._name_parts = None
+        elif self._depth == 2 and tag == self.record_tag:
+            record_end: int = self._parser.CurrentByteIndex + len(f"</{tag}>")
+            self.records[normalize_name(self._name)] = [self._record_start, record_end - self._record_start]
+        self._depth -= 1
+
+    def _character_data(self, data: str) -> None:
+        if self._name_parts is not None:
+            self._name_parts.append(data)
+
+if __name__ == "__main__":
+    reader = DataDumpReader("./datadump.gz", "nation")
+    for record in reader.records(("name", "region")):
+        pp(record)
+        break
@@ -0,0 +1,151 @@
+from awesomeNations.dataDumps import DumpStore
+from awesomeNations.internalTools import AwesomeParser
+from collections.abc import Iterable, Iterator
+from typing import Optional, NamedTuple, Any
+from xml.sax.saxutils import unescape
+import logging
+import re
+
+logger = logging.getLogger("AwesomeLogger")
+
+parser = AwesomeParser()
+
+# Fields compared by default, per data dump type.
+DIFF_FIELDS: dict[str, tuple[str]] = {
+    "nation": ("region", "unstatus", "endorsements", "census"),
+    "region": ("numnations", "delegate", "delegatevotes", "founder", "power"),
+}
+
+SCALE_PATTERN: re.Pattern = re.compile(rb'<SCALE id="(\d+)">\s*<SCORE>([^<]*)</SCORE>')
+
+class DumpChange(NamedTuple):
+    """
+    One difference between two data dumps.
+
+    `field` is "added" or "removed" for whole records, otherwise the changed field
+    (census changes are one per scale, with its id in `scale`). Endorsements are frozensets of names.
+    """
+    name: str
+    field: str
+    old: Any = None
+    new: Any = None
+    scale: Optional[int] = None
+
+def field_pattern(field: str) -> re.Pattern:
+    tag: bytes = field.upper().encode()
+    return re.compile(rb"<" + tag + rb">([^<]*)</" + tag + rb">")
+
+def field_value(field: str, text: Optional[str]) -> Any:
+    if field == "endorsements":
+        return frozenset(text.split(",")) if text else frozenset()
+    return text
+
+def score_value(score: Optional[bytes]) -> Any:
+    "A raw census score converted like API responses (int or float, None if empty)."
+    if score is None:
+        return None
+    return parser.convert_value(score.decode("ascii").strip() or None)
+
+def diff_records(name: str,
+                 old_record: bytes,
+                 new_record: bytes,
+                 fields: Iterable[str],
+                 census_scales: Optional[frozenset[int]] = None,
+                 patterns: Optional[dict[str, re.Pattern]] = None,
+                 old_encoding: str = "UTF-8",
+                 new_encoding: str = "UTF-8") -> Iterator[DumpChange]:
+    """
+    Compares two raw records of the same nation or region, reading only the compared fields (no full XML parsing).
+    
+    Records are decoded with the encoding of their dump (`DumpStore.encoding`).
+    """
+    if old_record == new_record:
+        return
+    patterns = patterns if patterns is not None else {}
+    for field in fields:
+        if field == "census":
+            yield from diff_census(name, old_record, new_record, census_scales)
+            continue
+        pattern: re.Pattern = patterns.get(field) or patterns.setdefault(field, field_pattern(field))
+        old_match: Optional[re.Match] = pattern.search(old_record)
+        new_match: Optional[re.Match] = pattern.search(new_record)
+        old_text: Optional[bytes] = old_match.group(1) if old_match else None
+        new_text: Optional[bytes] = new_match.group(1) if new_match else None
+        if old_text != new_text:
+            yield DumpChange(name, field,
+                             field_value(field, unescape(old_text.decode(old_encoding)) if old_text is not None else None),
+                             field_value(field, unescape(new_text.decode(new_encoding)) if new_text is not None else None))
+
+def census_section(record: bytes) -> bytes:
+    # bytes.find is much faster than a lazy regex over the whole census.
+    start: int = record.find(b"<CENSUS>")
+    return record[start:record.find(b"</CENSUS>", start)] if start >= 0 else b""
+
+def diff_census(name: str, old_record: bytes, new_record: bytes, census_scales: Optional[frozenset[int]] = None) -> Iterator[DumpChange]:
+    old_section: bytes = census_section(old_record)
+    new_section: bytes = census_section(new_record)
+    if old_section == new_section:
+        return
+    old_scores: dict[bytes, bytes] = dict(SCALE_PATTERN.findall(old_section))
+    for scale_id, new_score in SCALE_PATTERN.findall(new_section):
+        old_score: Optional[bytes] = old_scores.pop(scale_id, None)
+        if old_score == new_score or (census_scales is not None and int(scale_id) not in census_scales):
+            continue
+        yield DumpChange(name, "census", score_value(old_score), score_value(new_score), int(scale_id))
+    for scale_id, old_score in old_scores.items():
+        if census_scales is None or int(scale_id) in census_scales:
+            yield DumpChange(name, "census", score_value(old_score), None, int(scale_id))
+
+def diff_dumps(old_store: DumpStore,
+               new_store: DumpStore,
+               fields: Optional[Iterable[str]] = None,
+               census_scales: Optional[Iterable[int]] = None) -> Iterator[DumpChange]:
+    """
+    Streams the differences between two indexed data dumps (older first), in name order.
+
+    Both stores are walked side by side through their indexes, so only one record of each dump is
+    in memory at a time and neither dump is parsed again. Unchanged records are skipped with a byte
+    comparison, changed ones only have the compared fields read.
+
+    ### fields:
+
+    > Fields to compare (default: `DIFF_FIELDS` of the dump type). Nation dumps: "region", "unstatus",
+    > "endorsements", "census"...
+
+    ### census_scales:
+
+    > Census scale ids to compare (default: all of them).
+    """
+    if old_store.type != new_store.type:
+        raise ValueError(f"Can't diff a {old_store.type} data dump with a {new_store.type} data dump.")
+    fields = tuple(fields) if fields is not None else DIFF_FIELDS[new_store.type]
+    scales: Optional[frozenset[int]] = frozenset(census_scales) if census_scales is not None else None
+    patterns: dict[str, re.Pattern] = {}
+
+    old_records: Iterator[tuple[str, Optional[bytes]]] = old_store.iter_raw(sorted(old_store.names()))
+    new_records: Iterator[tuple[str, Optional[bytes]]] = new_store.iter_raw(sorted(new_store.names()))
+    old_name, old_record = next(old_records, (None, None))
+    new_name, new_record = next(new_records, (None, None))
+    changes: int = 0
+    # Store names are normalized like Nation/Region urls (spaces as %20), changes use API ids.
+    while old_name is not None or new_name is not None:
+        if new_name is None or (old_name is not None and old_name < new_name):
+            yield DumpChange(old_name.replace("%20", "_"), "removed")
+            old_name, old_record = next(old_records, (None, None))
+        elif old_name is None or new_name < old_name:
+            yield DumpChange(new_name.replace("%20", "_"), "added")
+            new_name, new_record = next(new_records, (None, None))
+        else:
+            for change in diff_records(new_name.replace("%20", "_"), old_record, new_record, fields, scales, patterns,
+                                       old_store.encoding, new_store.encoding):
+                changes += 1
+                yield change
+            old_name, old_record = next(old_records, (None, None))
+            new_name, new_record = next(new_records, (None, None))
+    logger.debug("Data dump diff: %s field changes", changes)
+
+if __name__ == "__main__":
+    old: bytes = b'<NATION><NAME>Testlandia</NAME><UNSTATUS>WA Member</UNSTATUS><ENDORSEMENTS>a,b</ENDORSEMENTS><REGION>Testregionia</REGION><CENSUS><SCALE id="0"><SCORE>1.5</SCORE></SCALE></CENSUS></NATION>'
+    new: bytes = b'<NATION><NAME>Testlandia</NAME><UNSTATUS>Non-member</UNSTATUS><ENDORSEMENTS></ENDORSEMENTS><REGION>The Pacific</REGION><CENSUS><SCALE id="0"><SCORE>2</SCORE></SCALE></CENSUS></NATION>'
+    for change in diff_records("testlandia", old, new, DIFF_FIELDS["nation"]):
+        print(change)
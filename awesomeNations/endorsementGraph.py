@@ -0,0 +1,196 @@
+from awesomeNations.dataDumps import DumpStore, normalize_name
+from awesomeNations.dumpDiff import field_pattern
+from collections.abc import Iterable, Iterator
+from typing import Optional
+from xml.sax.saxutils import unescape
+from bisect import bisect_left
+from array import array
+import logging
+import re
+
+logger = logging.getLogger("AwesomeLogger")
+
+NAME_PATTERN: re.Pattern = field_pattern("name")
+REGION_PATTERN: re.Pattern = field_pattern("region")
+UNSTATUS_PATTERN: re.Pattern = field_pattern("unstatus")
+ENDORSEMENTS_PATTERN: re.Pattern = field_pattern("endorsements")
+
+def record_id(name: str) -> str:
+    "Nation or region id as the API and endorsement lists write it (`testlandia`, `the_pacific`)."
+    return normalize_name(name).replace("%20", "_")
+
+def tag_text(pattern: re.Pattern, record: bytes, encoding: str = "UTF-8") -> str:
+    "Text of a field of a raw dump record, decoded with the dump encoding (`DumpStore.encoding`)."
+    match: Optional[re.Match] = pattern.search(record)
+    return unescape(match.group(1).decode(encoding)) if match else ""
+
+def csr(groups: array, size: int) -> tuple[array, array]:
+    """
+    Groups item indexes by `groups[item]` (counting sort): returns `(offsets, items)`,
+    the items of group `g` being `items[offsets[g]:offsets[g + 1]]`, in ascending order.
+    """
+    offsets: array = array("i", bytes(4 * (size + 1)))
+    for group in groups:
+        offsets[group + 1] += 1
+    for group in range(size):
+        offsets[group + 1] += offsets[group]
+    positions: array = offsets[:-1]
+    items: array = array("i", bytes(4 * len(groups)))
+    for item, group in enumerate(groups):
+        items[positions[group]] = item
+        positions[group] += 1
+    return offsets, items
+
+class EndorsementGraph():
+    """
+    Region membership and World Assembly endorsements of every nation, built from data dumps.
+
+    Nations and regions get integer ids (their position in `nations`/`regions`), edges are kept in
+    CSR form: for nation `i`, `endorsers[endorser_offsets[i]:endorser_offsets[i + 1]]` are the nations
+    endorsing it (sorted), same layout for endorsements given and region members (most endorsed first). Queries are slices
+    and binary searches over these `array.array`s, no API requests.
+
+    Names can be given in any form (`"Testlandia"`, `"testlandia"`), results are ids like `"testlandia"`.
+    """
+    def __init__(self,
+                 nations: list[str],
+                 regions: list[str],
+                 nation_region: array,
+                 wa_members: bytearray,
+                 endorsements: list[Iterable[int]]):
+        self.nations: list[str] = nations
+        self.regions: list[str] = regions
+        self.nation_region: array = nation_region
+        self.wa_members: bytearray = wa_members
+        self._nation_ids: dict[str, int] = {name: index for index, name in enumerate(nations)}
+        self._region_ids: dict[str, int] = {name: index for index, name in enumerate(regions)}
+
+        # Incoming edges: endorsement lists, as the dumps store them.
+        self.endorser_offsets: array = array("i", [0])
+        self.endorsers: array = array("i")
+        for endorser_ids in endorsements:
+            self.endorsers.extend(sorted(set(endorser_ids)))
+            self.endorser_offsets.append(len(self.endorsers))
+        # Outgoing edges: the same edges grouped by endorser.
+        endorsed: array = array("i", bytes(4 * len(self.endorsers)))
+        for nation in range(len(nations)):
+            for position in range(self.endorser_offsets[nation], self.endorser_offsets[nation + 1]):
+                endorsed[position] = nation
+        self.endorsed_offsets, edge_order = csr(self.endorsers, len(nations))
+        self.endorsed: array = array("i", (endorsed[edge] for edge in edge_order))
+
+        # Members are kept most endorsed first, so top_endorsed() is a slice even for the biggest regions.
+        self.member_offsets, _ = csr(nation_region, len(regions))
+        offsets: array = self.endorser_offsets
+        self.members: array = array("i", sorted(range(len(nations)), key=lambda nation: (nation_region[nation], offsets[nation] - offsets[nation + 1], nation)))
+
+    def __repr__(self):
+        return f"EndorsementGraph(nations={len(self.nations)}, regions={len(self.regions)}, endorsements={len(self.endorsers)})"
+
+    def __len__(self) -> int:
+        return len(self.nations)
+
+    def __contains__(self, nation_name: str) -> bool:
+        return record_id(nation_name) in self._nation_ids
+
+    def nation_id(self, nation_name: str) -> int:
+        "Integer id of a nation, raises KeyError if it isn't in the graph."
+        return self._nation_ids[record_id(nation_name)]
+
+    def region_id(self, region_name: str) -> int:
+        "Integer id of a region, raises KeyError if it isn't in the graph."
+        return self._region_ids[record_id(region_name)]
+
+    def region_of(self, nation_name: str) -> str:
+        return self.regions[self.nation_region[self.nation_id(nation_name)]]
+
+    def is_wa_member(self, nation_name: str) -> bool:
+        return bool(self.wa_members[self.nation_id(nation_name)])
+
+    def endorsement_count(self, nation_name: str) -> int:
+        "Endorsements received by a nation."
+        nation: int = self.nation_id(nation_name)
+        return self.endorser_offsets[nation + 1] - self.endorser_offsets[nation]
+
+    def endorsements_given(self, nation_name: str) -> int:
+        "Endorsements given by a nation."
+        nation: int = self.nation_id(nation_name)
+        return self.endorsed_offsets[nation + 1] - self.endorsed_offsets[nation]
+
+    def get_endorsers(self, nation_name: str) -> list[str]:
+        "Nations endorsing a nation."
+        nation: int = self.nation_id(nation_name)
+        return [self.nations[endorser] for endorser in self.endorsers[self.endorser_offsets[nation]:self.endorser_offsets[nation + 1]]]
+
+    def get_endorsed(self, nation_name: str) -> list[str]:
+        "Nations endorsed by a nation."
+        nation: int = self.nation_id(nation_name)
+        return [self.nations[endorsed] for endorsed in self.endorsed[self.endorsed_offsets[nation]:self.endorsed_offsets[nation + 1]]]
+
+    def endorses(self, endorser_name: str, nation_name: str) -> bool:
+        "Checks if `endorser_name` endorses `nation_name` (binary search)."
+        endorser: int = self.nation_id(endorser_name)
+        nation: int = self.nation_id(nation_name)
+        start, end = self.endorser_offsets[nation], self.endorser_offsets[nation + 1]
+        position: int = bisect_left(self.endorsers, endorser, start, end)
+        return position < end and self.endorsers[position] == endorser
+
+    def mutual_endorsements(self, nation_name: str) -> list[str]:
+        "Nations that endorse a nation and are endorsed back by it."
+        nation: int = self.nation_id(nation_name)
+        endorsers: array = self.endorsers[self.endorser_offsets[nation]:self.endorser_offsets[nation + 1]]
+        endorsed: array = self.endorsed[self.endorsed_offsets[nation]:self.endorsed_offsets[nation + 1]]
+        smaller, larger = sorted((endorsers, endorsed), key=len)
+        larger_set: set[int] = set(larger)
+        return [self.nations[other] for other in smaller if other in larger_set]
+
+    def get_members(self, region_name: str) -> list[str]:
+        "Nations of a region, most endorsed first."
+        region: int = self.region_id(region_name)
+        return [self.nations[member] for member in self.members[self.member_offsets[region]:self.member_offsets[region + 1]]]
+
+    def top_endorsed(self, region_name: str, limit: int = 10) -> list[tuple[str, int]]:
+        "Most endorsed nations of a region, as `(nation, endorsement count)` tuples."
+        region: int = self.region_id(region_name)
+        start: int = self.member_offsets[region]
+        offsets: array = self.endorser_offsets
+        return [(self.nations[member], offsets[member + 1] - offsets[member])
+                for member in self.members[start:min(start + limit, self.member_offsets[region + 1])]]
+
+    @classmethod
+    def from_stores(cls, nation_store: DumpStore, region_store: Optional[DumpStore] = None) -> "EndorsementGraph":
+        """
+        Builds the graph from a nation `DumpStore` (and a region one, so regions without nations are included too).
+        """
+        if nation_store.type != "nation" or (region_store is not None and region_store.type != "region"):
+            raise ValueError("from_stores() needs a nation store (and optionally a region store).")
+        region_ids: dict[str, int] = {}
+        if region_store is not None:
+            for _, record in region_store.iter_raw():
+                region_ids.setdefault(record_id(tag_text(NAME_PATTERN, record, region_store.encoding)), len(region_ids))
+
+        nations: list[str] = []
+        nation_region: array = array("i")
+        wa_members: bytearray = bytearray()
+        endorsement_lists: list[str] = []
+        encoding: str = nation_store.encoding
+        for _, record in nation_store.iter_raw():
+            nations.append(record_id(tag_text(NAME_PATTERN, record, encoding)))
+            nation_region.append(region_ids.setdefault(record_id(tag_text(REGION_PATTERN, record, encoding)), len(region_ids)))
+            wa_members.append(tag_text(UNSTATUS_PATTERN, record, encoding) not in ("", "Non-member"))
+            endorsement_lists.append(tag_text(ENDORSEMENTS_PATTERN, record, encoding))
+        regions: list[str] = list(region_ids)
+
+        nation_ids: dict[str, int] = {nation: index for index, nation in enumerate(nations)}
+        # Endorsements of nations missing from the dump (ceased since) are dropped.
+        endorsements: Iterator[list[int]] = ([nation_ids[endorser] for endorser in endorsement_list.split(",") if endorser in nation_ids]
+                                             for endorsement_list in endorsement_lists)
+        graph = cls(nations, regions, nation_region, wa_members, endorsements)
+        logger.debug("Built %r", graph)
+        return graph
+
+if __name__ == "__main__":
+    graph = EndorsementGraph(["testlandia", "a", "b", "c"], ["testregionia", "the_pacific"], array("i", [0, 0, 0, 1]),
+                             bytearray([1, 1, 1, 0]), [[1, 2], [0], [], []])
+    print(graph, graph.get_endorsers("Testlandia"), graph.get_endorsed("a"), graph.mutual_endorsements("testlandia"),
+          graph.endorses("b", "testlandia"), graph.top_endorsed("testregionia"), graph.get_members("the pacific"))
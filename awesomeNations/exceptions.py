@@ -77,5 +77,14 @@ class DataError(Exception):
         message = f"Could not process [{data_name}]: {reason}"
         super().__init__(message)
 
+class CommandError(Exception):
+    """
+    Exception raised when NationStates refuses a private command (the response has an `<ERROR>`).
+    """
+    def __init__(self, command: str, reason: str):
+        self.command: str = command
+        self.reason: str = reason
+        super().__init__(f"Command [{command}] failed: {reason}")
+
 if __name__ == "__main__":
     raise HTTPError(404)
\ No newline at end of file
@@ -0,0 +1,132 @@
+from awesomeNations.customMethods import as_list
+from collections.abc import Callable, Iterator
+from collections import OrderedDict
+from typing import Optional, Any
+import threading
+import logging
+import time
+
+logger = logging.getLogger("AwesomeLogger")
+
+class HappeningsPoller():
+    """
+    Watches world happenings, only requesting events newer than the last one seen (`sinceid`).
+
+    Events (`{'id': ..., 'timestamp': ..., 'text': ...}`) are yielded oldest first, each one once.
+    If more than `limit` events happened between two polls, older pages are fetched with `beforeid`
+    so nothing is skipped. The poll interval follows the event rate (busy feeds are polled more often,
+    quiet ones less) and slows down when the ratelimit is running low.
+
+    ### view / filter:
+
+    > Same as the happenings shard: `view="region.the_pacific"`, `filter=("law", "change")`...
+
+    ### min_interval / max_interval:
+
+    > Bounds (in seconds) of the adaptive poll interval.
+    """
+    def __init__(self,
+                 fetch_shards: Callable[..., dict],
+                 connection: Any = None,
+                 view: Optional[str] = None,
+                 filter: Optional[str | list[str]] = None,
+                 limit: int = 100,
+                 min_interval: float = 5,
+                 max_interval: float = 300,
+                 since_id: Optional[int] = None,
+                 max_seen_ids: int = 4096):
+        if not 0 < min_interval <= max_interval:
+            raise ValueError(f"min_interval ({min_interval}) must be above 0 and not above max_interval ({max_interval}).")
+        self.fetch_shards: Callable[..., dict] = fetch_shards
+        self.connection: Any = connection
+        self.view: Optional[str] = view
+        self.filter: Optional[str | list[str]] = filter
+        self.limit: int = limit
+        self.min_interval: float = min_interval
+        self.max_interval: float = max_interval
+        self.since_id: Optional[int] = since_id
+        self.interval: float = min_interval
+        self.max_seen_ids: int = max_seen_ids
+
+        self._seen_ids: OrderedDict[int, None] = OrderedDict()
+        self._last_poll: Optional[float] = None
+        self._stop = threading.Event()
+
+    def __repr__(self):
+        return f"HappeningsPoller(view={self.view}, filter={self.filter}, since_id={self.since_id}, interval={self.interval:.1f})"
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.events()
+
+    def poll(self) -> list[dict]:
+        """
+        Requests new events once (catching up with `beforeid` if needed), returns them oldest first.
+        """
+        now: float = time.monotonic()
+        events: list = self._fetch_events(self.since_id)
+        # A full page means there may be more new events older than the ones received.
+        page: list = events
+        while self.since_id is not None and len(page) >= self.limit:
+            page = self._fetch_events(self.since_id, before_id=min(int(event["id"]) for event in page))
+            events += page
+
+        new_events: list = []
+        for event in sorted(events, key=lambda event: int(event["id"])):
+            event_id: int = int(event["id"])
+            if event_id in self._seen_ids or (self.since_id is not None and event_id <= self.since_id):
+                continue
+            self._seen_ids[event_id] = None
+            new_events.append(event)
+        while len(self._seen_ids) > self.max_seen_ids:
+            self._seen_ids.popitem(last=False)
+
+        if new_events:
+            self.since_id = int(new_events[-1]["id"])
+        self._update_interval(len(new_events), now)
+        logger.debug("Happenings poll: %s new events, next poll in %.1f seconds", len(new_events), self.interval)
+        return new_events
+
+    def events(self) -> Iterator[dict]:
+        """
+        Polls forever (until `stop()`), yielding new events as they happen.
+        """
+        self._stop.clear()
+        while not self._stop.is_set():
+            yield from self.poll()
+            self._stop.wait(self.interval)
+
+    def run(self, callback: Callable[[dict], Any]) -> None:
+        """
+        Polls until `stop()`, calling `callback(event)` for every new event (blocking, run it in a thread if needed).
+        """
+        for event in self.events():
+            callback(event)
+
+    def stop(self) -> None:
+        "Stops `events()`/`run()`, even while waiting for the next poll."
+        self._stop.set()
+
+    def _fetch_events(self, since_id: Optional[int], before_id: Optional[int] = None) -> list:
+        shard_kwargs: dict = {"limit": self.limit}
+        for key, value in (("view", self.view), ("filter", self.filter), ("sinceid", since_id), ("beforeid", before_id)):
+            if value is not None:
+                shard_kwargs[key] = value
+        happenings = self.fetch_shards("happenings", **shard_kwargs)["world"]["happenings"]
+        return list(as_list(happenings["event"] if happenings else None))
+
+    def _update_interval(self, new_events: int, now: float) -> None:
+        elapsed: Optional[float] = now - self._last_poll if self._last_poll is not None else None
+        self._last_poll = now
+        if new_events and elapsed:
+            # Aim for about half a page of events per poll.
+            events_per_second: float = new_events / elapsed
+            interval: float = (self.limit / 2) / events_per_second
+        elif new_events:
+            interval = self.interval
+        else:
+            interval = self.interval * 1.5
+        remaining: Optional[int] = getattr(self.connection, "ratelimit_remaining", None)
+        if remaining is not None and remaining < 10:
+            # Leaves the ratelimit headroom to other requests.
+            interval = max(interval, getattr(self.connection, "ratelimit_reset_time", 30) / max(remaining, 1))
+        self.interval = min(self.max_interval, max(self.min_interval, interval))
@@ -0,0 +1,231 @@
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from collections import Counter
+from typing import Optional
+import threading
+import logging
+import time
+
+logger = logging.getLogger("AwesomeLogger")
+
+# Request phases, in order: ratelimiter wait, TCP/TLS connect (new connections only), time to first byte,
+# body download and XML parsing (`AwesomeParser.parse_bytes`, straight from the bytes: there's no decoding step).
+PHASES: tuple[str] = ("wait", "connect", "ttfb", "download", "parse")
+
+DEFAULT_BUCKETS: tuple[float] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_connect_times = threading.local()
+
+def last_connect_time() -> float:
+    "Seconds the latest connection opened by this thread took to connect (0 if none since the last reset)."
+    return getattr(_connect_times, "seconds", 0.0)
+
+def reset_connect_time() -> None:
+    _connect_times.seconds = 0.0
+
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self) -> None:
+        start: float = time.perf_counter()
+        super().connect()
+        _connect_times.seconds = time.perf_counter() - start
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self) -> None:
+        start: float = time.perf_counter()
+        super().connect()
+        _connect_times.seconds = time.perf_counter() - start
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+# For `PoolManager.pool_classes_by_scheme`: connections record how long they took to connect.
+TIMED_POOL_CLASSES: dict[str, type] = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
+
+class RequestMetrics():
+    """
+    Measurements of one request (seconds per phase, see `PHASES`), given to every instrumentation hook.
+
+    Retries (429, expired X-Pin) are included: `attempts` counts them, and their phases add up.
+    `cache` is "hit" (no request sent), "revalidated" (304) or None.
+    """
+    __slots__ = ("url", "method", "status", "attempts", "cache", "error", "bytes_received",
+                 "ratelimit_remaining", "start", "total", *PHASES)
+
+    def __init__(self, url: str, method: str = "GET"):
+        self.url: str = url
+        self.method: str = method
+        self.status: Optional[int] = None
+        self.attempts: int = 0
+        self.cache: Optional[str] = None
+        self.error: Optional[str] = None
+        self.bytes_received: int = 0
+        self.ratelimit_remaining: Optional[int] = None
+        self.start: float = time.perf_counter()
+        self.total: float = 0.0
+        for phase in PHASES:
+            setattr(self, phase, 0.0)
+
+    def __repr__(self):
+        timings: str = ", ".join(f"{phase}={getattr(self, phase) * 1000:.2f}ms" for phase in PHASES)
+        return f"RequestMetrics(url={self.url}, status={self.status}, bytes={self.bytes_received}, total={self.total * 1000:.2f}ms, {timings})"
+
+    @property
+    def timings(self) -> dict[str, float]:
+        return {phase: getattr(self, phase) for phase in PHASES}
+
+class Instrumentation():
+    """
+    Measures every request of a connection and gives a `RequestMetrics` to each hook when it ends.
+
+    Give it to `AwesomeNations` (or `AsyncAwesomeNations`) as `instrumentation`. Hooks are called
+    in the requesting thread, so keep them quick; their errors are logged, never raised.
+    `MetricsCollector` is a ready-made hook aggregating counters and histograms for Prometheus.
+    Without instrumentation, requests skip all of this (one attribute check per phase).
+    """
+    def __init__(self, *hooks: Callable[[RequestMetrics], object]):
+        self.hooks: list[Callable[[RequestMetrics], object]] = list(hooks)
+        self._local = threading.local()
+
+    def add_hook(self, hook: Callable[[RequestMetrics], object]) -> None:
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[RequestMetrics], object]) -> None:
+        self.hooks.remove(hook)
+
+    def current(self) -> Optional[RequestMetrics]:
+        "The request being measured by this thread, if any."
+        return getattr(self._local, "metrics", None)
+
+    @contextmanager
+    def request(self, url: str, method: str = "GET") -> Iterator[RequestMetrics]:
+        """
+        Measures a request. Nested calls (in the same thread) share the outer measurement,
+        only the outer one calls the hooks.
+        """
+        metrics: Optional[RequestMetrics] = self.current()
+        if metrics is not None:
+            yield metrics
+            return
+        metrics = RequestMetrics(url, method)
+        self._local.metrics = metrics
+        try:
+            yield metrics
+        except BaseException as e:
+            metrics.error = type(e).__name__
+            raise
+        finally:
+            self._local.metrics = None
+            metrics.total = time.perf_counter() - metrics.start
+            self.emit(metrics)
+
+    def emit(self, metrics: RequestMetrics) -> None:
+        for hook in self.hooks:
+            try:
+                hook(metrics)
+            except Exception:
+                logger.exception("Instrumentation hook %r failed", hook)
+
+class MetricsCollector():
+    """
+    Instrumentation hook that aggregates request metrics: counters by status, bytes received,
+    a latency histogram per phase and the latest ratelimit headroom.
+
+    `render()` exports them in the Prometheus text format (or OpenMetrics), `serve()` exposes
+    them over HTTP for scraping.
+    """
+    def __init__(self, prefix: str = "awesomenations", buckets: tuple[float] = DEFAULT_BUCKETS):
+        self.prefix: str = prefix
+        self.buckets: tuple[float] = tuple(sorted(buckets))
+        self.requests: Counter = Counter() # (method, status, cache) -> count
+        self.bytes_received: int = 0
+        self.ratelimit_remaining: Optional[int] = None
+        self._histograms: dict[str, list[int]] = {phase: [0] * (len(self.buckets) + 1) for phase in (*PHASES, "total")}
+        self._sums: dict[str, float] = dict.fromkeys(self._histograms, 0.0)
+        self._lock = threading.Lock()
+
+    def __call__(self, metrics: RequestMetrics) -> None:
+        status: str = str(metrics.status) if metrics.status is not None else (metrics.error or "none")
+        with self._lock:
+            self.requests[(metrics.method, status, metrics.cache or "miss")] += 1
+            self.bytes_received += metrics.bytes_received
+            if metrics.ratelimit_remaining is not None:
+                self.ratelimit_remaining = metrics.ratelimit_remaining
+            for phase in self._histograms:
+                seconds: float = getattr(metrics, phase)
+                self._sums[phase] += seconds
+                self._histograms[phase][self._bucket(seconds)] += 1
+
+    def _bucket(self, seconds: float) -> int:
+        for position, upper_bound in enumerate(self.buckets):
+            if seconds <= upper_bound:
+                return position
+        return len(self.buckets)
+
+    def render(self, openmetrics: bool = False) -> str:
+        "Metrics in the Prometheus text exposition format (OpenMetrics if `openmetrics`)."
+        prefix: str = self.prefix
+        requests_name: str = f"{prefix}_requests" if openmetrics else f"{prefix}_requests_total"
+        lines: list[str] = [f"# HELP {requests_name} Requests sent to NationStates (or served by the cache).",
+                            f"# TYPE {requests_name} counter"]
+        with self._lock:
+            for (method, status, cache), count in sorted(self.requests.items()):
+                lines.append(f'{prefix}_requests_total{{method="{method}",status="{status}",cache="{cache}"}} {count}')
+            bytes_name: str = f"{prefix}_received_bytes" if openmetrics else f"{prefix}_received_bytes_total"
+            lines += [f"# HELP {bytes_name} Response body bytes received.",
+                      f"# TYPE {bytes_name} counter",
+                      f"{prefix}_received_bytes_total {self.bytes_received}"]
+            if self.ratelimit_remaining is not None:
+                lines += [f"# HELP {prefix}_ratelimit_remaining Requests left in the current ratelimit window.",
+                          f"# TYPE {prefix}_ratelimit_remaining gauge",
+                          f"{prefix}_ratelimit_remaining {self.ratelimit_remaining}"]
+            lines += [f"# HELP {prefix}_request_phase_seconds Request time by phase ({', '.join(PHASES)} or total).",
+                      f"# TYPE {prefix}_request_phase_seconds histogram"]
+            for phase, counts in self._histograms.items():
+                cumulative: int = 0
+                for upper_bound, count in zip((*self.buckets, "+Inf"), counts):
+                    cumulative += count
+                    lines.append(f'{prefix}_request_phase_seconds_bucket{{phase="{phase}",le="{upper_bound}"}} {cumulative}')
+                lines.append(f'{prefix}_request_phase_seconds_sum{{phase="{phase}"}} {self._sums[phase]}')
+                lines.append(f'{prefix}_request_phase_seconds_count{{phase="{phase}"}} {cumulative}')
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = 9464, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serves `render()` at `http://host:port/metrics` from a background thread, returns the server (`shutdown()` stops it).
+        """
+        collector: MetricsCollector = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                openmetrics: bool = "application/openmetrics-text" in self.headers.get("Accept", "")
+                body: bytes = collector.render(openmetrics).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/openmetrics-text; version=1.0.0; charset=utf-8" if openmetrics else "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="AwesomeNations-metrics", daemon=True).start()
+        return server
+
+if __name__ == "__main__":
+    collector = MetricsCollector()
+    instrumentation = Instrumentation(collector, print)
+    with instrumentation.request("https://www.nationstates.net/cgi-bin/api.cgi?nation=testlandia") as metrics:
+        metrics.status, metrics.ttfb, metrics.bytes_received = 200, 0.12, 5120
+    print(collector.render())
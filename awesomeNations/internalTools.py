@@ -1,13 +1,30 @@
 from awesomeNations.customMethods import format_key, string_is_number
 from awesomeNations.exceptions import DataError
+from xml.etree.ElementTree import Element
+from typing import Optional, Any, NamedTuple, Literal
+from collections.abc import Iterator
+from xml.parsers import expat
 from pprint import pprint as pp
-from typing import Optional
 import xmltodict
+import threading
+import hashlib
 import string
 import random
+import re
+
+# Plain numbers take the fast path, anything fancier ("nan", " 1 ", "1_000", "1j"...) goes through complex().
+INTEGER_PATTERN: re.Pattern = re.compile(r"[+-]?[0-9]{1,15}")
+DECIMAL_PATTERN: re.Pattern = re.compile(r"[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?")
+
+# The encoding of an XML declaration: <?xml version="1.0" encoding="iso-8859-1"?>
+DECLARATION_PATTERN: re.Pattern = re.compile(rb"""<\?xml[^>]*?encoding=["']([A-Za-z0-9._-]+)["'][^>]*\?>""")
 
 class NationAuth():
-    """Nation authentication"""
+    """
+    Nation authentication, also the nation session: once logged in, requests only send the X-Pin
+    (and the X-Autologin given by the server replaces the password). Requests of the same session
+    are serialized with `lock`, as the X-Pin requires.
+    """
     def __init__(self,
                  password: Optional[str] = None,
                  autologin: Optional[str] = None):
@@ -21,6 +38,9 @@ class NationAuth():
         self.password = self.__secret__(password)
         self.autologin = self.__secret__(autologin)
         self.xpin: Optional[int] = None
+        # Identifies the given credentials (cache keys, session reuse), never changes.
+        self.fingerprint: str = hashlib.sha256(f"{password or ''}\0{autologin or ''}".encode()).hexdigest()
+        self.lock = threading.RLock()
     
     def __secret__(self, x: str):
         hidden_x = self.crip.encrypt(x) if x else ""
@@ -38,32 +58,458 @@ class NationAuth():
         }
         return auth_headers
 
-class AwesomeParser():
+    def request_headers(self) -> dict[str, str]:
+        "Headers for the next request: only the X-Pin if logged in, the credentials otherwise."
+        if self.xpin:
+            return {"X-Pin": str(self.xpin)}
+        auth_headers: dict[str, str] = {}
+        if self.password:
+            auth_headers["X-Password"] = self.__show__(self.password)
+        if self.autologin:
+            auth_headers["X-Autologin"] = self.__show__(self.autologin)
+        return auth_headers
+
+    def update(self, response_headers: dict) -> None:
+        "Keeps the X-Pin and X-Autologin sent by the server."
+        x_pin_header: Optional[str] = response_headers.get("X-Pin")
+        if x_pin_header and self.xpin != x_pin_header:
+            self.xpin = x_pin_header
+        x_autologin_header: Optional[str] = response_headers.get("X-Autologin")
+        if x_autologin_header:
+            self.autologin = self.__secret__(x_autologin_header)
+
+    def reset_pin(self) -> None:
+        "Forgets the X-Pin (expired or rejected), the next request logs in again."
+        self.xpin = None
+
+class SessionPool():
+    """
+    One `NationAuth` session per nation, so every `Nation` object of a nation shares its X-Pin.
+    """
     def __init__(self):
-        pass
+        self._sessions: dict[str, NationAuth] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, nation_name: str) -> bool:
+        return nation_name in self._sessions
+
+    def get(self,
+            nation_name: str,
+            password: Optional[str] = None,
+            autologin: Optional[str] = None) -> Optional[NationAuth]:
+        """
+        Gets the session of a nation, a new one if there's none yet or if the credentials changed.
+        Returns None without credentials.
+        """
+        if not any((password, autologin)):
+            return None
+        fingerprint: str = hashlib.sha256(f"{password or ''}\0{autologin or ''}".encode()).hexdigest()
+        with self._lock:
+            session: Optional[NationAuth] = self._sessions.get(nation_name)
+            if session is None or session.fingerprint != fingerprint:
+                session = NationAuth(password, autologin)
+                self._sessions[nation_name] = session
+            return session
+
+    def discard(self, nation_name: str) -> None:
+        "Forgets the session of a nation (logging out is up to the server)."
+        with self._lock:
+            self._sessions.pop(nation_name, None)
+
+class BatchResult(NamedTuple):
+    """
+    One result of a batch request: the response data, or the error raised while fetching it.
+    """
+    modifier: str
+    name: str
+    data: Optional[dict] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+class AwesomeParser():
+    """
+    Parses API XML responses into dictionaries.
+
+    ### engine:
+
+    - "fast": Builds dictionaries straight from expat events, same output as "xmltodict".
+    - "xmltodict": Parses with xmltodict.
+    """
+    def __init__(self, engine: Literal["fast", "xmltodict"] = "fast"):
+        if engine not in ("fast", "xmltodict"):
+            raise ValueError(f"{engine} is invalid. Parser engine must be fast or xmltodict.")
+        self.engine: str = engine
+        # Tag names repeat a lot (thousands of <SCALE>, <EVENT>...), so each is formatted only once.
+        self._formatted_keys: dict[str, str] = {}
     
     def parse_xml(self, data: dict[str]):
         """
         Parses XML data into a dictionary.
         """
         try:
+            if self.engine == "fast":
+                return self._parse_with_expat(data["data"], data["encoding"])
             parsed_xml: dict = xmltodict.parse(data["data"], data["encoding"], postprocessor=self.xml_postprocessor)
             return parsed_xml
         except Exception as e:
             raise DataError("XML Data", e)
 
+    def parse_bytes(self, data: bytes, encoding: Optional[str] = None) -> Optional[dict]:
+        """
+        Parses a raw (undecoded) XML response into a dictionary, same output as `parse_xml()`.
+        `encoding` is the response charset, if known (see `XMLFeedParser`).
+        """
+        feed_parser: XMLFeedParser = self.feed_parser(encoding)
+        feed_parser.feed(data)
+        return feed_parser.close()
+
+    def feed_parser(self, encoding: Optional[str] = None) -> "XMLFeedParser":
+        "An incremental parser: feed it response bytes while they download."
+        return XMLFeedParser(self, encoding)
+
+    def item_stream(self, depth: int = 2, encoding: Optional[str] = None) -> "XMLItemStream":
+        "An incremental parser handing over the elements of a response as soon as they close (see `XMLItemStream`)."
+        return XMLItemStream(self, depth, encoding)
+
+    def _parse_with_expat(self, xml_data: str | bytes, encoding: str) -> Optional[dict]:
+        parser, result = self._create_expat_parser(encoding)
+        parser.Parse(xml_data.encode(encoding) if isinstance(xml_data, str) else xml_data, True)
+        return result[0]
+
+    def _create_expat_parser(self, encoding: str) -> tuple[Any, list]:
+        # Returns the expat parser and the result holder (`result[0]` is the dictionary once parsed).
+        # Same rules as xmltodict.parse(): attributes become "@" keys, repeated children
+        # become lists, text next to children or attributes becomes "#text".
+        format_key = self.format_key
+        convert_value = self.convert_value
+        stack: list[tuple[Optional[dict], list[str]]] = []
+        current: list = [None, []] # [item, character data]
+
+        def push_data(item: Optional[dict], key: str, value: Any) -> dict:
+            key = format_key(key)
+            value = convert_value(value)
+            if item is None:
+                item = {}
+            if key in item:
+                if isinstance(item[key], list):
+                    item[key].append(value)
+                else:
+                    item[key] = [item[key], value]
+            else:
+                item[key] = value
+            return item
+
+        def start_element(name: str, attributes: list[str]) -> None:
+            stack.append((current[0], current[1]))
+            item: Optional[dict] = None
+            if attributes:
+                item = {}
+                for index in range(0, len(attributes), 2):
+                    item[format_key("@" + attributes[index])] = convert_value(attributes[index + 1])
+            current[0] = item
+            current[1] = []
+
+        def end_element(name: str) -> None:
+            data: Optional[str] = "".join(current[1]).strip() or None
+            item: Optional[dict] = current[0]
+            current[0], current[1] = stack.pop()
+            if item is not None:
+                if data:
+                    item = push_data(item, "#text", data)
+                current[0] = push_data(current[0], name, item)
+            else:
+                current[0] = push_data(current[0], name, data)
+
+        def character_data(data: str) -> None:
+            current[1].append(data)
+
+        parser = expat.ParserCreate(encoding)
+        parser.ordered_attributes = True
+        parser.buffer_text = True
+        # Like xmltodict, entities are never expanded.
+        parser.DefaultHandler = lambda data: None
+        parser.ExternalEntityRefHandler = lambda *args: 1
+        parser.StartElementHandler = start_element
+        parser.EndElementHandler = end_element
+        parser.CharacterDataHandler = character_data
+        return parser, current
+
+    def parse_element(self, element: Element) -> dict:
+        """
+        Parses an ElementTree element into a dictionary, following the same rules as `parse_xml()`.
+        """
+        key, value = self._element_to_item(element)
+        return {key: value}
+
+    def _element_to_item(self, element: Element) -> tuple[str, Any]:
+        # Mirrors xmltodict: attributes become "@" keys, repeated children become lists,
+        # text next to children or attributes becomes "#text", everything goes through xml_postprocessor.
+        item: Optional[dict] = None
+        for attribute, attribute_value in element.attrib.items():
+            key, value = self.xml_postprocessor(None, "@" + attribute, attribute_value)
+            if item is None:
+                item = {}
+            item[key] = value
+
+        text: str = element.text or ""
+        for child in element:
+            key, value = self._element_to_item(child)
+            if item is None:
+                item = {}
+            if key in item:
+                if isinstance(item[key], list):
+                    item[key].append(value)
+                else:
+                    item[key] = [item[key], value]
+            else:
+                item[key] = value
+            text += child.tail or ""
+
+        text = text.strip()
+        if item is None:
+            return self.xml_postprocessor(None, element.tag, text or None)
+        if text:
+            key, value = self.xml_postprocessor(None, "#text", text)
+            if key in item:
+                item[key] = item[key] + [value] if isinstance(item[key], list) else [item[key], value]
+            else:
+                item[key] = value
+        return self.xml_postprocessor(None, element.tag, item)
+
     def xml_postprocessor(self, path, key: str, value: str):
-        key = format_key(key, replace_empty="_", delete_not_alpha=True)
-        try:
-            formatted_key: str = key
-            formatted_value: str = value
+        return self.format_key(key), self.convert_value(value)
+
+    def format_key(self, key: str) -> str:
+        "Formats an XML tag or attribute name (memoized)."
+        formatted_key: Optional[str] = self._formatted_keys.get(key)
+        if formatted_key is None:
+            formatted_key = format_key(key, replace_empty="_", delete_not_alpha=True)
+            self._formatted_keys[key] = formatted_key
+        return formatted_key
 
-            if string_is_number(formatted_value):
-                formatted_value: complex = complex(formatted_value).real
-                formatted_value = int(formatted_value) if formatted_value.is_integer() else formatted_value
-            return formatted_key, formatted_value
+    def convert_value(self, value: Any) -> Any:
+        "Converts numeric strings to int (if integer) or float, everything else stays untouched."
+        if type(value) is not str:
+            return value
+        if INTEGER_PATTERN.fullmatch(value):
+            return int(value)
+        if DECIMAL_PATTERN.fullmatch(value):
+            float_value: float = float(value)
+            return int(float_value) if float_value.is_integer() else float_value
+        try:
+            if string_is_number(value):
+                complex_value: float = complex(value).real
+                return int(complex_value) if complex_value.is_integer() else complex_value
+            return value
         except (ValueError, TypeError):
-            return key, value
+            return value
+
+class XMLFeedParser():
+    """
+    Parses an XML response chunk by chunk, straight from the received bytes (no decoding to `str`).
+
+    The body is read with `encoding` (the response charset) or else the encoding of its XML declaration.
+    If neither is known, it's read as UTF-8 and as LATIN-1 if that fails, like `WrapperConnection.decode_response_data()`:
+    only then are the chunks kept (not copied) so the fallback can parse them again.
+    """
+    fallback_encodings: tuple[str] = ("UTF-8", "LATIN-1")
+
+    def __init__(self, awesome_parser: AwesomeParser, encoding: Optional[str] = None):
+        self.awesome_parser: AwesomeParser = awesome_parser
+        self.encoding: Optional[str] = None
+        self._head: Optional[bytes] = b"" # Start of the body, until its XML declaration is read.
+        self._chunks: Optional[list[bytes]] = None
+        self._retry_encodings: tuple[str] = ()
+        self._error: Optional[Exception] = None
+        self._expat: Any = None
+        self._result: list = []
+        if encoding:
+            self._start(encoding)
+
+    def _start(self, encoding: Optional[str]) -> None:
+        # Without a known encoding, the chunks are kept for the fallback (and always for xmltodict, which parses at close).
+        fast: bool = self.awesome_parser.engine == "fast"
+        self.encoding = encoding or self.fallback_encodings[0]
+        self._head = None
+        if encoding is None:
+            self._chunks = []
+            self._retry_encodings = self.fallback_encodings[1:] if fast else self.fallback_encodings
+        elif not fast:
+            self._chunks = []
+            self._retry_encodings = (encoding,)
+        if fast:
+            self._expat, self._result = self.awesome_parser._create_expat_parser(self.encoding)
+
+    def _read_declaration(self, final: bool) -> Optional[bytes]:
+        # Starts parsing once the XML declaration (or its absence) is known, returns the bytes held until then.
+        head: bytes = self._head.lstrip()[:1024]
+        if not final and (len(head) < 5 or (head.startswith(b"<?xml") and b"?>" not in head and len(head) < 1024)):
+            return None
+        declaration: Optional[re.Match] = DECLARATION_PATTERN.match(head)
+        data: bytes = self._head
+        self._start(declaration.group(1).decode() if declaration else None)
+        return data
+
+    def feed(self, chunk: bytes) -> None:
+        if self._head is not None:
+            self._head += chunk
+            chunk = self._read_declaration(False)
+            if chunk is None:
+                return
+        if self._chunks is not None:
+            self._chunks.append(chunk)
+        if self._expat is not None and self._error is None:
+            try:
+                self._expat.Parse(chunk, False)
+            except expat.ExpatError as e:
+                # Stops here, close() retries with the next encoding (if any).
+                self._error = e
+
+    def close(self) -> Optional[dict]:
+        "Parses what's left and returns the dictionary, raises DataError if no encoding works."
+        if self._head is not None:
+            self.feed(self._read_declaration(True))
+        error: Optional[Exception] = self._error
+        if self._expat is not None and error is None:
+            try:
+                self._expat.Parse(b"", True)
+                return self._result[0]
+            except expat.ExpatError as e:
+                error = e
+        if not self._retry_encodings:
+            raise DataError("XML Data", error)
+        data: bytes = b"".join(self._chunks)
+        for encoding in self._retry_encodings:
+            self.encoding = encoding
+            try:
+                if self.awesome_parser.engine == "fast":
+                    return self.awesome_parser._parse_with_expat(data, encoding)
+                return xmltodict.parse(data, encoding, postprocessor=self.awesome_parser.xml_postprocessor)
+            except Exception as e:
+                error = e
+        raise DataError("XML Data", error)
+
+class XMLItemStream():
+    """
+    Parses an XML response chunk by chunk and hands over its elements as soon as they close, instead
+    of building the whole dictionary: `feed()` returns the `(path, value)` items completed by each chunk.
+
+    Elements `depth` levels below the root are items (1: each shard, 2: each <EVENT>, <SCALE>, <CAUSE>...),
+    shallower elements are items too unless they hold items, then only what's left of them (attributes)
+    comes once they close. `path` holds the formatted tags from the shard down to the item, the root
+    attributes come first as `(("id",), "testlandia")`. Values follow the rules of `AwesomeParser.parse_xml()`.
+
+    Items can't be taken back, so there's no encoding fallback: `encoding` (the response charset)
+    or else the XML declaration is trusted.
+    """
+    def __init__(self, awesome_parser: AwesomeParser, depth: int = 2, encoding: Optional[str] = None):
+        if depth < 1:
+            raise ValueError(f"depth must be at least 1, not {depth}")
+        self.depth: int = depth
+        self._items: list[tuple[tuple[str, ...], Any]] = []
+        self._expat: Any = self._create_expat_parser(awesome_parser, encoding)
+
+    def _create_expat_parser(self, awesome_parser: AwesomeParser, encoding: Optional[str]) -> Any:
+        format_key = awesome_parser.format_key
+        convert_value = awesome_parser.convert_value
+        depth: int = self.depth
+        items: list[tuple[tuple[str, ...], Any]] = self._items
+        path: list[str] = []
+        stack: list[tuple[Optional[dict], list[str], bool]] = []
+        current: list = [None, [], False] # [item, character data, holds items]
+
+        def push_data(item: Optional[dict], key: str, value: Any) -> dict:
+            key = format_key(key)
+            value = convert_value(value)
+            if item is None:
+                item = {}
+            if key in item:
+                if isinstance(item[key], list):
+                    item[key].append(value)
+                else:
+                    item[key] = [item[key], value]
+            else:
+                item[key] = value
+            return item
+
+        def start_element(name: str, attributes: list[str]) -> None:
+            stack.append((current[0], current[1], current[2]))
+            item: Optional[dict] = None
+            if attributes:
+                item = {}
+                for index in range(0, len(attributes), 2):
+                    item[format_key("@" + attributes[index])] = convert_value(attributes[index + 1])
+            if len(stack) == 1:
+                # Root attributes (like the nation id) are items of their own.
+                items.extend(((key,), value) for key, value in (item or {}).items())
+                item = None
+            else:
+                path.append(format_key(name))
+            current[0], current[1], current[2] = item, [], False
+
+        def end_element(name: str) -> None:
+            data: Optional[str] = "".join(current[1]).strip() or None
+            item: Optional[dict] = current[0]
+            holds_items: bool = current[2]
+            current[0], current[1], current[2] = stack.pop()
+            level: int = len(stack) # 0 for the root, 1 for its children...
+            if level == 0:
+                return
+            if item is not None and data and not holds_items:
+                item = push_data(item, "#text", data)
+            if level <= depth:
+                if not holds_items:
+                    items.append((tuple(path), item if item is not None else convert_value(data)))
+                elif item is not None:
+                    items.append((tuple(path), item))
+                current[2] = True
+            elif item is not None:
+                current[0] = push_data(current[0], name, item)
+            else:
+                current[0] = push_data(current[0], name, data)
+            path.pop()
+
+        def character_data(data: str) -> None:
+            current[1].append(data)
+
+        parser = expat.ParserCreate(encoding)
+        parser.ordered_attributes = True
+        parser.buffer_text = True
+        parser.DefaultHandler = lambda data: None
+        parser.ExternalEntityRefHandler = lambda *args: 1
+        parser.StartElementHandler = start_element
+        parser.EndElementHandler = end_element
+        parser.CharacterDataHandler = character_data
+        return parser
+
+    def feed(self, chunk: bytes) -> list[tuple[tuple[str, ...], Any]]:
+        "Parses a chunk, returns the items it completed."
+        return self._parse(chunk, False)
+
+    def close(self) -> list[tuple[tuple[str, ...], Any]]:
+        "Ends the parsing, returns the last items (raises DataError if the XML is incomplete)."
+        return self._parse(b"", True)
+
+    def _parse(self, chunk: bytes, final: bool) -> list[tuple[tuple[str, ...], Any]]:
+        try:
+            self._expat.Parse(chunk, final)
+        except expat.ExpatError as e:
+            raise DataError("XML Data", e)
+        ready: list[tuple[tuple[str, ...], Any]] = self._items[:]
+        self._items.clear()
+        return ready
+
+    def iter_items(self, chunks: Iterator[bytes]) -> Iterator[tuple[tuple[str, ...], Any]]:
+        "Parses every chunk, yields the items along the way."
+        for chunk in chunks:
+            yield from self.feed(chunk)
+        yield from self.close()
 
 class Criptografy():
     "Basic substitution criptography!"
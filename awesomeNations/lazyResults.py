@@ -0,0 +1,320 @@
+from awesomeNations.internalTools import AwesomeParser
+from awesomeNations.exceptions import DataError
+from collections.abc import Iterator, Mapping
+from typing import Optional, Any, NamedTuple
+from xml.parsers import expat
+from pprint import pprint as pp
+import re
+
+parser = AwesomeParser()
+
+ENCODING_PATTERN: re.Pattern = re.compile(rb"""\s*<\?xml[^>]*encoding=["']([A-Za-z0-9._-]+)["']""")
+ROOT_TAG_PATTERN: re.Pattern = re.compile(rb"<([A-Za-z_][^\s/>?!]*)")
+
+class CensusScale():
+    """
+    Compact census scale entry (`<SCALE>`), reads like the dictionary it replaces: `scale["score"]` or `scale.score`.
+
+    Keys are the fields the scale holds, even empty ones (`<SCORE></SCORE>` is `"score": None`, like the dictionary).
+    """
+    __slots__ = ("id", "score", "rank", "prank", "rrank", "prrank", "_keys")
+    fields: tuple[str] = ("id", "score", "rank", "prank", "rrank", "prrank")
+
+    def __init__(self,
+                 id: Optional[int] = None,
+                 score: Optional[float] = None,
+                 rank: Optional[int] = None,
+                 prank: Optional[float] = None,
+                 rrank: Optional[int] = None,
+                 prrank: Optional[float] = None):
+        self.id = id
+        self.score = score
+        self.rank = rank
+        self.prank = prank
+        self.rrank = rrank
+        self.prrank = prrank
+        # Built directly, fields left to None aren't keys. from_dict() keeps the keys of the dictionary.
+        self._keys: tuple[str] = tuple(key for key in self.fields if getattr(self, key) is not None)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{key}={value}' for key, value in self.items())})"
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._keys:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CensusScale):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self._keys else default
+
+    def keys(self) -> list[str]:
+        return list(self._keys)
+
+    def items(self) -> list[tuple[str, Any]]:
+        return [(key, getattr(self, key)) for key in self._keys]
+
+    def to_dict(self) -> dict:
+        return dict(self.items())
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Optional["CensusScale"]:
+        "Builds a census scale from its parsed dictionary, returns None if it doesn't fit the usual shape."
+        if not isinstance(data, dict) or not set(data) <= set(cls.fields):
+            return None
+        if any(isinstance(value, (dict, list)) for value in data.values()):
+            return None
+        scale: CensusScale = cls(**data)
+        scale._keys = tuple(data)
+        return scale
+
+# Tags turned into compact records instead of lazy mappings.
+RECORD_TYPES: dict[str, type] = {
+    "SCALE": CensusScale,
+}
+
+class ElementScan(NamedTuple):
+    "What a single expat pass over an element finds, without converting its children."
+    tag: str
+    attributes: list[str]
+    children: list[tuple[str, int, int]] # (tag, start offset, end offset)
+    text: str
+
+def scan_element(raw_data: bytes, start: int, end: int) -> ElementScan:
+    """
+    Scans the element stored in `raw_data[start:end]` (UTF-8), finding where each child starts and ends.
+    """
+    depth: int = 0
+    root: list = [None, None] # [tag, attributes]
+    children: list[tuple[str, int, int]] = []
+    text_parts: list[str] = []
+    child_start: int = 0
+    child_is_empty: bool = True
+    fragment: bytes = raw_data[start:end]
+    parser = expat.ParserCreate("UTF-8")
+    parser.ordered_attributes = True
+    parser.buffer_text = True
+    parser.DefaultHandler = lambda data: None
+
+    def start_element(tag: str, attributes: list[str]) -> None:
+        nonlocal depth, child_start, child_is_empty
+        depth += 1
+        if depth == 1:
+            root[0], root[1] = tag, attributes
+        elif depth == 2:
+            child_start = parser.CurrentByteIndex
+            child_is_empty = True
+        else:
+            child_is_empty = False
+
+    def end_element(tag: str) -> None:
+        nonlocal depth
+        if depth == 2:
+            # Expat points at the end tag, or right after the whole tag if it was an empty element tag (<TAG/>).
+            position: int = parser.CurrentByteIndex
+            if child_is_empty and fragment[position - 2:position] == b"/>":
+                child_end: int = position
+            else:
+                child_end = fragment.index(b">", position) + 1
+            children.append((tag, start + child_start, start + child_end))
+        depth -= 1
+
+    def character_data(data: str) -> None:
+        nonlocal child_is_empty
+        if depth == 1:
+            text_parts.append(data)
+        else:
+            child_is_empty = False
+
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    parser.CharacterDataHandler = character_data
+    try:
+        parser.Parse(fragment, True)
+    except expat.ExpatError as e:
+        raise DataError("XML Data", e)
+    return ElementScan(root[0], root[1], children, "".join(text_parts).strip())
+
+def element_value(raw_data: bytes, start: int, end: int) -> Any:
+    """
+    Converts an element the way the parser would, but only one level deep: subtrees become `LazyElement`s.
+    """
+    scan: ElementScan = scan_element(raw_data, start, end)
+    if not scan.attributes and not scan.children:
+        return parser.convert_value(scan.text or None)
+    record_type: Optional[type] = RECORD_TYPES.get(scan.tag)
+    if record_type:
+        record = record_type.from_dict(parser.parse_xml({"data": raw_data[start:end], "encoding": "UTF-8"})[parser.format_key(scan.tag)])
+        if record is not None:
+            return record
+    return LazyElement(raw_data, start, end, scan)
+
+class LazyElement(Mapping):
+    """
+    Read-only mapping over an XML element, children are converted only when accessed.
+
+    Keys and values match the dictionaries `get_shards()` returns (`element["census"]` or `element.census`),
+    use `to_dict()` to convert the whole subtree at once.
+    """
+    __slots__ = ("_raw_data", "_start", "_end", "_tag", "_index", "_values")
+
+    def __init__(self, raw_data: bytes, start: int, end: int, scan: Optional[ElementScan] = None):
+        scan = scan if scan else scan_element(raw_data, start, end)
+        self._raw_data: bytes = raw_data
+        self._start: int = start
+        self._end: int = end
+        self._tag: str = scan.tag
+        self._index: dict[str, list] = self._build_index(scan)
+        # Converted values, each key is only converted (and its children scanned) once.
+        self._values: dict[str, Any] = {}
+
+    def __repr__(self):
+        return f"LazyElement({self._tag}, keys={list(self)})"
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._values:
+            return self._values[key]
+        values: list = [self._entry_value(entry) for entry in self._index[key]]
+        value: Any = values[0] if len(values) == 1 else values
+        self._values[key] = value
+        return value
+
+    def __getattr__(self, key: str) -> Any:
+        if key.startswith("_"):
+            raise AttributeError(key)
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def to_dict(self) -> dict:
+        "Converts the whole subtree into plain dictionaries (same as the default result mode)."
+        parsed: dict = parser.parse_xml({"data": self._raw_data[self._start:self._end], "encoding": "UTF-8"})
+        return parsed[parser.format_key(self._tag)]
+
+    def _entry_value(self, entry: tuple) -> Any:
+        if entry[0] == "element":
+            return element_value(self._raw_data, entry[1], entry[2])
+        return entry[1]
+
+    @staticmethod
+    def _build_index(scan: ElementScan) -> dict[str, list]:
+        # Maps each key to its sources (attributes, child byte ranges or text), in parser order.
+        index: dict[str, list] = {}
+        for position in range(0, len(scan.attributes), 2):
+            key: str = parser.format_key("@" + scan.attributes[position])
+            index.setdefault(key, []).append(("value", parser.convert_value(scan.attributes[position + 1])))
+        for tag, child_start, child_end in scan.children:
+            index.setdefault(parser.format_key(tag), []).append(("element", child_start, child_end))
+        if scan.text:
+            index.setdefault(parser.format_key("#text"), []).append(("value", parser.convert_value(scan.text)))
+        return index
+
+class LazyResponse(Mapping):
+    """
+    API response kept as raw bytes, parsed only where it's read.
+
+    Reads like the dictionary `get_shards()` returns (`response["nation"]["census"]["scale"]`), but
+    each level is only scanned for the byte ranges of its children, nothing else is converted until
+    accessed. Census scales become compact `CensusScale` records. Use `to_dict()` for plain dictionaries.
+    """
+    __slots__ = ("raw_data", "_utf8_data", "_root", "_root_keys")
+
+    def __init__(self, raw_data: bytes):
+        self.raw_data: bytes = raw_data
+        self._utf8_data: Optional[bytes] = None
+        # The root element and its key, found once.
+        self._root: Any = None
+        self._root_keys: Optional[tuple[str]] = None
+
+    def __repr__(self):
+        return f"LazyResponse({len(self.raw_data)} bytes)"
+
+    def __getstate__(self) -> bytes:
+        return self.raw_data
+
+    def __setstate__(self, raw_data: bytes) -> None:
+        self.raw_data = raw_data
+        self._utf8_data = None
+        self._root = None
+        self._root_keys = None
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self:
+            raise KeyError(key)
+        if self._root is None:
+            self._root = element_value(self.utf8_data, 0, len(self.utf8_data))
+        return self._root
+
+    def __contains__(self, key: object) -> bool:
+        return key in tuple(iter(self))
+
+    def __getattr__(self, key: str) -> Any:
+        if key.startswith("_"):
+            raise AttributeError(key)
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def __iter__(self) -> Iterator[str]:
+        if self._root_keys is None:
+            match: Optional[re.Match] = ROOT_TAG_PATTERN.search(self.utf8_data)
+            self._root_keys = (parser.format_key(match.group(1).decode()),) if match else ()
+        return iter(self._root_keys)
+
+    def __len__(self) -> int:
+        return len(list(iter(self)))
+
+    @property
+    def utf8_data(self) -> bytes:
+        "The response re-encoded as UTF-8 (only done once, if the response used another encoding)."
+        if self._utf8_data is None:
+            self._utf8_data = self._to_utf8(self.raw_data)
+        return self._utf8_data
+
+    def to_dict(self) -> dict:
+        "Converts the whole response into plain dictionaries (same as the default result mode)."
+        return parser.parse_xml({"data": self.utf8_data, "encoding": "UTF-8"})
+
+    @staticmethod
+    def _to_utf8(raw_data: bytes) -> bytes:
+        # Same fallback as WrapperConnection.decode_response_data(): declared encoding (or UTF-8), then LATIN-1.
+        declaration: Optional[re.Match] = ENCODING_PATTERN.match(raw_data)
+        declared_encoding: str = declaration.group(1).decode() if declaration else "UTF-8"
+        if declared_encoding.upper().replace("_", "-") in ("UTF-8", "UTF8"):
+            try:
+                raw_data.decode("UTF-8")
+                return raw_data
+            except UnicodeDecodeError:
+                declared_encoding = "LATIN-1"
+        try:
+            return raw_data.decode(declared_encoding).encode("UTF-8")
+        except (UnicodeDecodeError, LookupError):
+            return raw_data.decode("LATIN-1").encode("UTF-8")
+
+if __name__ == "__main__":
+    response = LazyResponse(b'<NATION id="testlandia"><CENSUS><SCALE id="46"><SCORE>7432.07</SCORE><RANK>28725</RANK></SCALE></CENSUS></NATION>')
+    pp(response["nation"]["census"]["scale"])
+    pp(response.to_dict())
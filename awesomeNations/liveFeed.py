@@ -0,0 +1,231 @@
+from awesomeNations.exceptions import HTTPError
+from collections.abc import Iterable, Iterator
+from typing import Optional, Any, NamedTuple
+from urllib3 import BaseHTTPResponse, Timeout
+import threading
+import urllib3
+import logging
+import random
+import queue
+import json
+
+logger = logging.getLogger("AwesomeLogger")
+
+class SSEEvent(NamedTuple):
+    """
+    A server-sent event, `data` is decoded from JSON when possible (NationStates sends `{"str": ..., "time": ...}`).
+    """
+    data: Any
+    event: str = "message"
+    id: Optional[str] = None
+
+class SSEParser():
+    """
+    Incremental `text/event-stream` parser: feed it bytes as they arrive, it returns the complete events.
+    """
+    def __init__(self):
+        self.last_event_id: Optional[str] = None
+        self.retry: Optional[int] = None # Reconnection time (milliseconds) requested by the server.
+        self._buffer: bytes = b""
+        self._data: list[str] = []
+        self._event: str = ""
+
+    def feed(self, chunk: bytes) -> list[SSEEvent]:
+        self._buffer += chunk
+        events: list[SSEEvent] = []
+        while True:
+            line_end: int = self._line_end()
+            if line_end < 0:
+                return events
+            line: bytes = self._buffer[:line_end]
+            # \r\n, \r and \n all end lines.
+            separator_size: int = 2 if self._buffer[line_end:line_end + 2] == b"\r\n" else 1
+            self._buffer = self._buffer[line_end + separator_size:]
+            event: Optional[SSEEvent] = self._process_line(line.decode("UTF-8", "replace"))
+            if event:
+                events.append(event)
+
+    def _line_end(self) -> int:
+        positions: list[int] = [position for position in (self._buffer.find(b"\n"), self._buffer.find(b"\r")) if position >= 0]
+        if not positions:
+            return -1
+        line_end: int = min(positions)
+        # A trailing \r may be the first half of \r\n, wait for more data.
+        if self._buffer[line_end:line_end + 1] == b"\r" and line_end + 1 == len(self._buffer):
+            return -1
+        return line_end
+
+    def _process_line(self, line: str) -> Optional[SSEEvent]:
+        if not line:
+            return self._dispatch()
+        if line.startswith(":"):
+            return None # Comment (keep-alive).
+        field, _, value = line.partition(":")
+        value = value[1:] if value.startswith(" ") else value
+        match field:
+            case "data":
+                self._data.append(value)
+            case "event":
+                self._event = value
+            case "id":
+                if "\0" not in value:
+                    self.last_event_id = value
+            case "retry":
+                if value.isdigit():
+                    self.retry = int(value)
+        return None
+
+    def _dispatch(self) -> Optional[SSEEvent]:
+        data, event = self._data, self._event
+        self._data, self._event = [], ""
+        if not data:
+            return None
+        raw_data: str = "\n".join(data)
+        try:
+            parsed_data: Any = json.loads(raw_data)
+        except ValueError:
+            parsed_data = raw_data
+        return SSEEvent(parsed_data, event or "message", self.last_event_id)
+
+class LiveFeed():
+    """
+    NationStates live happenings (server-sent events) over one long-lived connection.
+
+    Events are parsed as they arrive and put on `queue` (a `queue.Queue` of `SSEEvent`s), a background
+    thread reconnects after errors with exponential backoff, resuming with `Last-Event-ID`.
+
+    ### buckets:
+
+    > What to listen to, like `"region:the_pacific"`, `"nation:testlandia"` or `"admin"`.
+    """
+    def __init__(self,
+                 buckets: Iterable[str],
+                 headers: Optional[dict] = None,
+                 base_url: str = "https://www.nationstates.net/api",
+                 event_queue: Optional[queue.Queue] = None,
+                 min_backoff: float = 1,
+                 max_backoff: float = 60,
+                 read_timeout: float = 90):
+        buckets = [buckets] if isinstance(buckets, str) else list(buckets)
+        if not buckets:
+            raise ValueError("LiveFeed needs at least one bucket.")
+        self.url: str = f"{base_url.rstrip('/')}/{'+'.join(buckets)}"
+        self.headers: dict = dict(headers or {})
+        self.queue: queue.Queue = event_queue if event_queue is not None else queue.Queue()
+        self.min_backoff: float = min_backoff
+        self.max_backoff: float = max_backoff
+        # NationStates sends keep-alive comments, so a silent connection is a dead connection.
+        self.timeout = Timeout(connect=15, read=read_timeout)
+        self.reconnections: int = 0
+
+        self._parser = SSEParser()
+        self._pool_manager = urllib3.PoolManager(1, retries=False)
+        self._response: Optional[BaseHTTPResponse] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def __repr__(self):
+        return f"LiveFeed(url={self.url}, running={self.running})"
+
+    def __enter__(self) -> "LiveFeed":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def __iter__(self) -> Iterator[SSEEvent]:
+        return self.events()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def last_event_id(self) -> Optional[str]:
+        return self._parser.last_event_id
+
+    def start(self) -> "LiveFeed":
+        "Connects in a background thread (does nothing if already running)."
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._listen, name="AwesomeNations-LiveFeed", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 5) -> None:
+        "Closes the connection and stops the background thread."
+        self._stop.set()
+        response: Optional[BaseHTTPResponse] = self._response
+        if response is not None:
+            response.shutdown()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def events(self, timeout: Optional[float] = None) -> Iterator[SSEEvent]:
+        """
+        Yields events from the queue as they arrive (starting the feed if needed), until `stop()`
+        or until no event arrives for `timeout` seconds.
+        """
+        self.start()
+        while not self._stop.is_set():
+            try:
+                yield self.queue.get(timeout=timeout if timeout is not None else 1)
+            except queue.Empty:
+                if timeout is not None:
+                    return
+
+    def _listen(self) -> None:
+        backoff: float = self.min_backoff
+        while not self._stop.is_set():
+            try:
+                if self._stream():
+                    backoff = self.min_backoff
+            except (urllib3.exceptions.HTTPError, HTTPError, OSError) as e:
+                if self._stop.is_set():
+                    return
+                logger.warning("Live feed connection lost (%s), reconnecting in %.1f seconds.", e, backoff)
+            if self._stop.is_set():
+                return
+            server_retry: Optional[float] = self._parser.retry / 1000 if self._parser.retry is not None else None
+            # Jitter keeps many clients from reconnecting at the same time.
+            self._stop.wait(max(backoff, server_retry or 0) * random.uniform(0.8, 1.2))
+            backoff = min(self.max_backoff, backoff * 2)
+            self.reconnections += 1
+
+    def _stream(self) -> bool:
+        # Returns True if any event was received, so backoff can be reset.
+        headers: dict = {**self.headers, "Accept": "text/event-stream", "Cache-Control": "no-cache"}
+        if self._parser.last_event_id:
+            headers["Last-Event-ID"] = self._parser.last_event_id
+        logger.debug("Connecting to live feed: %s", self.url)
+        response: BaseHTTPResponse = self._pool_manager.request("GET", self.url, headers=headers, timeout=self.timeout, preload_content=False)
+        self._response = response
+        received_events: bool = False
+        try:
+            if response.status != 200:
+                raise HTTPError(response.status)
+            # Events from a dropped connection are incomplete, the parser starts clean.
+            self._parser = self._fresh_parser()
+            while not self._stop.is_set():
+                chunk: bytes = response.read1(2**14)
+                if not chunk:
+                    break
+                for event in self._parser.feed(chunk):
+                    self.queue.put(event)
+                    received_events = True
+        finally:
+            self._response = None
+            response.release_conn()
+        return received_events
+
+    def _fresh_parser(self) -> SSEParser:
+        parser = SSEParser()
+        parser.last_event_id = self._parser.last_event_id
+        parser.retry = self._parser.retry
+        return parser
+
+if __name__ == "__main__":
+    parser = SSEParser()
+    print(parser.feed(b'id: 1\ndata: {"str": "@@testlandia@@ did something."}\n\n: keep-alive\r\ndata: plain\r\n\r'))
+    print(parser.feed(b"\n"))
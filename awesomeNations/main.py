@@ -1,22 +1,40 @@
 from awesomeNations.connection import WrapperConnection, URLManager
-from awesomeNations.customMethods import join_keys, format_key
-from awesomeNations.internalTools import NationAuth
-from awesomeNations.exceptions import HTTPError
+from awesomeNations.dataDumps import DataDumpReader, DumpStore, gunzip_chunks
+from awesomeNations.dumpDiff import DumpChange, diff_dumps
+from awesomeNations.endorsementGraph import EndorsementGraph
+from awesomeNations.customMethods import join_keys, format_key, as_list
+from awesomeNations.internalTools import NationAuth, BatchResult, AwesomeParser
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from collections.abc import Iterable, Iterator, Mapping, Callable
+from awesomeNations.ratelimit import Ratelimiter, TokenBucketRatelimiter
+from awesomeNations.cache import ResponseCache
+from awesomeNations.instrumentation import Instrumentation
+from awesomeNations.censusTable import CensusTable
+from awesomeNations.happenings import HappeningsPoller
+from awesomeNations.liveFeed import LiveFeed
+from awesomeNations.commands import CommandPipeline, CommandResult, PrivateCommand
+from awesomeNations.exceptions import HTTPError, DataError
 from pprint import pprint as pp
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Any
 from urllib3 import Timeout
 from typing import Literal
 from pathlib import Path
 from logging import WARNING
+import itertools
 import logging
 
 logger = logging.getLogger("AwesomeLogger")
 logging.basicConfig(level=logging.WARNING, format="[%(asctime)s] %(levelname)s: %(message)s")
 
-wrapper = WrapperConnection()
+# Used by Nation and Region when they're created without a client (AwesomeNations.Nation(...)):
+# the connection of the latest AwesomeNations client.
+default_connection: WrapperConnection = WrapperConnection()
 url_manager = URLManager("https://www.nationstates.net/cgi-bin/api.cgi")
 
+# Nations per censusranks response.
+CENSUS_RANKS_PAGE_SIZE: int = 20
+
 class AwesomeNations():
     """
     # 🚩 AwesomeNations 🚩
@@ -54,12 +72,12 @@ class AwesomeNations():
     
     ### ratelimit_sleep:
     
-    > This allows to automatically "sleep" if the API ratelimit is reached, prevents temporary
+    > This allows to automatically "sleep" to respect the API ratelimit, prevents temporary
     > lockouts due to excessive requests in a short span of time.
 
     ### ratelimit_reset_time:
     
-    > Defines the reset time (in seconds) to wait when the API ratelimit is reached.
+    > Defines the ratelimit window (in seconds), also the time to wait when the API ratelimit is reached.
     
     ### api_version:
     
@@ -68,6 +86,57 @@ class AwesomeNations():
     ### log_level:
     
     > Sets logging log level, if None is given, disables logging.
+
+    ### ratelimiter:
+
+    > Decides how long to wait before each request. Defaults to a `TokenBucketRatelimiter`, which
+    > spreads requests evenly across the ratelimit window. Use `ReactiveRatelimiter` for the classic
+    > "go fast, then sleep" behaviour, or share one ratelimiter between clients to share the budget.
+
+    ### cache:
+
+    > Opt-in `ResponseCache`, repeated requests are answered from memory until their shards expire
+    > (census names for a day, happenings and private shards never cached...). Check `cache.stats()`!
+
+    ### parser_engine:
+
+    > "fast" (default) builds dictionaries straight from expat, "xmltodict" uses xmltodict. Same output.
+
+    ### result_mode:
+
+    > - "dict" (default): Responses are fully parsed into dictionaries.
+    > - "lazy": Responses are `LazyResponse`s, kept as raw bytes and converted only where you read them,
+    > census scales become compact `CensusScale` records. Great for big responses you barely read.
+
+    ### command_ratelimiter:
+
+    > Paces private commands (issues, dispatches, RMB posts...), which have a stricter ratelimit
+    > than shards. Defaults to a conservative `TokenBucketRatelimiter(limit=10, period=60)`.
+
+    ### coalesce_window:
+
+    > If set (in seconds, like `0.02`), shard requests for the same nation, region, world or wa council
+    > made within that window (from different threads) are merged into one request
+    > (`q=name+region+census`) and every caller gets the merged response. Off by default.
+
+    ### instrumentation:
+
+    > An `Instrumentation` whose hooks get the metrics of every request (time per phase: ratelimit wait,
+    > connect, time to first byte, download and parse; bytes; ratelimit headroom).
+    > `MetricsCollector` aggregates them and exports Prometheus/OpenMetrics text. Off by default.
+
+    ### api_base_url:
+
+    > Where API requests go, `https://www.nationstates.net/cgi-bin/api.cgi` by default. Point it at a
+    > local `APIEmulator` to develop offline or load test without the real ratelimit.
+
+    ### pool_maxsize:
+
+    > How many connections are kept open to NationStates (one per concurrent request), raised
+    > automatically by `fetch_many()`.
+
+    Every client has its own connection (`self.connection`): clients with different settings
+    can live in the same process, and `api.Nation(...)`/`api.Region(...)` always use their client.
     """
 
     def __init__(self,
@@ -76,24 +145,54 @@ class AwesomeNations():
                  ratelimit_sleep: bool = True,
                  ratelimit_reset_time: int = 30,
                  api_version: int = 12,
-                 log_level: Optional[int] = WARNING):
+                 log_level: Optional[int] = WARNING,
+                 ratelimiter: Optional[Ratelimiter] = None,
+                 cache: Optional[ResponseCache] = None,
+                 parser_engine: Literal["fast", "xmltodict"] = "fast",
+                 result_mode: Literal["dict", "lazy"] = "dict",
+                 pool_maxsize: int = 1,
+                 command_ratelimiter: Optional[Ratelimiter] = None,
+                 coalesce_window: Optional[float] = None,
+                 instrumentation: Optional[Instrumentation] = None,
+                 api_base_url: Optional[str] = None):
         self.user_agent: str = user_agent
         self.request_timeout: int | tuple = request_timeout
         self.ratelimit_sleep: bool = ratelimit_sleep
         self.ratelimit_reset_time: int = ratelimit_reset_time
         self.api_version: int = api_version
         self.log_level: Optional[int] = log_level
+        self.ratelimiter: Ratelimiter = ratelimiter if ratelimiter else TokenBucketRatelimiter(period=self.ratelimit_reset_time)
+        self.cache: Optional[ResponseCache] = cache
+        self.parser_engine: str = parser_engine
+        self.result_mode: str = result_mode
+        # Without api_base_url, the module url_manager (NationStates) is shared.
+        self.url_manager: URLManager = URLManager(api_base_url) if api_base_url else url_manager
 
         headers: dict = {
         "User-Agent": self.user_agent,
         "Cache-Control": "no-cache",
         }
         
-        wrapper.headers = headers
-        wrapper.request_timeout = Timeout(connect=self.request_timeout[0], read=self.request_timeout[1]) if type(self.request_timeout) is tuple else int(self.request_timeout)
-        wrapper.ratelimit_sleep = self.ratelimit_sleep
-        wrapper.ratelimit_reset_time = self.ratelimit_reset_time
-        wrapper.api_version = self.api_version
+        self.connection = WrapperConnection(headers,
+                                            self.ratelimit_sleep,
+                                            self.ratelimit_reset_time,
+                                            self.api_version,
+                                            pool_maxsize,
+                                            ratelimiter=self.ratelimiter,
+                                            cache=self.cache,
+                                            parser=AwesomeParser(self.parser_engine),
+                                            result_mode=self.result_mode,
+                                            command_ratelimiter=command_ratelimiter,
+                                            coalesce_window=coalesce_window,
+                                            instrumentation=instrumentation)
+        self.connection.request_timeout = Timeout(connect=self.request_timeout[0], read=self.request_timeout[1]) if type(self.request_timeout) is tuple else int(self.request_timeout)
+        
+        # api.Nation and api.Region are subclasses bound to this client connection (and API url).
+        client_attributes: dict = {"_client_connection": self.connection, "_client_url_manager": self.url_manager}
+        self.Nation = type("Nation", (AwesomeNations.Nation,), {**client_attributes, "__doc__": AwesomeNations.Nation.__doc__})
+        self.Region = type("Region", (AwesomeNations.Region,), {**client_attributes, "__doc__": AwesomeNations.Region.__doc__})
+        global default_connection
+        default_connection = self.connection
         
         if self.log_level is None:
             logger.disabled = True
@@ -121,26 +220,151 @@ class AwesomeNations():
         age = today - created
         return age
 
-    def get_daily_data_dumps(self, filepath: str | Path = "./datadump.gz", type: Literal["nation", "region"] = "nation") -> None:
+    def get_daily_data_dumps(self,
+                             filepath: str | Path = "./datadump.gz",
+                             type: Literal["nation", "region"] = "nation",
+                             progress: Optional[Callable[[int, Optional[int]], Any]] = None,
+                             index_directory: Optional[str | Path] = None,
+                             chunk_size: int = 2**20) -> bool | DumpStore:
         """
-        Dowloads NationStates daily data dumps.
+        Dowloads NationStates daily data dumps, returns False if `filepath` was already up to date.
+        
+        Interrupted downloads are resumed (HTTP Range), and the gzip checksum is verified before
+        `filepath` is replaced. `progress(downloaded_bytes, total_bytes)` is called after every chunk.
         
         ### type: str
         
         - "nation": Dowloads the nation data dump.
         - "region": Dowloads the region data dump.
+        
+        ### index_directory: str | Path
+        
+        > If given, the dump isn't saved to `filepath`: it's decompressed and indexed while downloading,
+        > and the `DumpStore` is returned (the existing one if the dump didn't change since it was built).
         """
         nation_url: str = "https://www.nationstates.net/pages/nations.xml.gz"
         region_url: str = "https://www.nationstates.net/pages/regions.xml.gz"
 
         match type:
             case "nation":
-                wrapper.fetch_file(nation_url, filepath)
+                url: str = nation_url
             case "region":
-                wrapper.fetch_file(region_url, filepath)
+                url: str = region_url
             case _:
                 raise ValueError(type)
 
+        if index_directory is None:
+            return self.connection.fetch_file(url, filepath, chunk_size, progress=progress)
+        return self._stream_daily_data_dump(url, index_directory, type, progress, chunk_size)
+
+    def _stream_daily_data_dump(self,
+                                url: str,
+                                directory: str | Path,
+                                type: Literal["nation", "region"],
+                                progress: Optional[Callable[[int, Optional[int]], Any]],
+                                chunk_size: int) -> DumpStore:
+        current_store: Optional[DumpStore] = None
+        try:
+            current_store = DumpStore(directory, type)
+        except FileNotFoundError:
+            pass
+        response_headers: dict = {}
+        chunks: Iterator[bytes] = self.connection.iter_file(url, chunk_size,
+                                                            modified_since=current_store.last_modified if current_store else None,
+                                                            response_headers=response_headers)
+
+        def downloaded_chunks(first_chunk: bytes) -> Iterator[bytes]:
+            downloaded: int = 0
+            for chunk in itertools.chain((first_chunk,), chunks):
+                if response_headers.get("restarted"):
+                    # Already decompressed bytes can't be taken back.
+                    raise DataError(url, "The data dump changed while downloading it, try again.")
+                downloaded += len(chunk)
+                if progress:
+                    progress(downloaded, response_headers.get("total"))
+                yield chunk
+
+        first_chunk: Optional[bytes] = next(chunks, None)
+        if first_chunk is None:
+            if response_headers.get("not_modified") and current_store:
+                logger.debug("Data dump store is up to date: %s", directory)
+                return current_store
+            raise DataError(url, "Empty data dump.")
+        return DumpStore.build_from_chunks(gunzip_chunks(downloaded_chunks(first_chunk)), directory, type, url, response_headers.get("last_modified"))
+
+    def read_daily_data_dumps(self, filepath: str | Path = "./datadump.gz", type: Optional[Literal["nation", "region"]] = None) -> DataDumpReader:
+        """
+        Reads a daily data dump downloaded by `get_daily_data_dumps()`, one record at a time.
+        
+        Records look like `get_shards()` output and are decompressed and parsed incrementally,
+        so even the nation data dump can be read without loading it into memory.
+        
+        ### type: str
+        
+        - "nation": Expects a nation data dump.
+        - "region": Expects a region data dump.
+        - None: Accepts both.
+        """
+        return DataDumpReader(filepath, type)
+
+    def index_daily_data_dumps(self,
+                               filepath: str | Path = "./datadump.gz",
+                               directory: str | Path = "./datadump",
+                               type: Literal["nation", "region"] = "nation") -> DumpStore:
+        """
+        Indexes a daily data dump downloaded by `get_daily_data_dumps()` into a local store (one-time pass).
+        
+        The returned `DumpStore` can be given to `Nation` or `Region` as their `backend`, so `get_shards()`
+        reads records straight from disk instead of requesting the API. Existing stores can be opened
+        again with `DumpStore(directory, type)`.
+        
+        ### type: str
+        
+        - "nation": Indexes a nation data dump.
+        - "region": Indexes a region data dump.
+        """
+        return DumpStore.build(filepath, directory, type)
+
+    def diff_daily_data_dumps(self,
+                              old_directory: str | Path,
+                              new_directory: str | Path,
+                              type: Literal["nation", "region"] = "nation",
+                              fields: Optional[Iterable[str]] = None,
+                              census_scales: Optional[Iterable[int]] = None) -> Iterator[DumpChange]:
+        """
+        Streams what changed between two data dump stores built by `index_daily_data_dumps()` (older first).
+        
+        Yields `DumpChange` records in name order: added and removed nations (or regions), and changed
+        fields (region, WA status, endorsements, one change per census scale...). Memory stays bounded,
+        the stored indexes are reused and only changed records have their fields read.
+        
+        ### fields:
+        
+        > Fields to compare, by default: "region", "unstatus", "endorsements" and "census" for nations,
+        > "numnations", "delegate", "delegatevotes", "founder" and "power" for regions.
+        
+        ### census_scales:
+        
+        > Census scale ids to compare (default: all of them).
+        """
+        return diff_dumps(DumpStore(old_directory, type), DumpStore(new_directory, type), fields, census_scales)
+
+    def build_endorsement_graph(self,
+                                nation_directory: str | Path = "./datadump",
+                                region_directory: Optional[str | Path] = None) -> EndorsementGraph:
+        """
+        Builds an in-memory `EndorsementGraph` (region membership and endorsements) from data dump stores built by `index_daily_data_dumps()`.
+        
+        Queries like `endorsement_count()`, `get_endorsers()`, `mutual_endorsements()` or `top_endorsed()`
+        are then answered locally in microseconds, instead of one API request per nation.
+        
+        ### region_directory:
+        
+        > Region store directory (can be the same as `nation_directory`), to include regions without nations.
+        """
+        region_store: Optional[DumpStore] = DumpStore(region_directory, "region") if region_directory is not None else None
+        return EndorsementGraph.from_stores(DumpStore(nation_directory, "nation"), region_store)
+
     def get_world_shards(self, shards: str | tuple[str] | list[str], **kwargs) -> dict:
         """
         Gets one or more shards from the World API.
@@ -148,10 +372,22 @@ class AwesomeNations():
         for kwarg in kwargs:
             kwargs[kwarg] = join_keys(kwargs[kwarg])
         params: Optional[str] = join_keys([f"{kwarg}={kwargs[kwarg]}" for kwarg in kwargs], ";") if kwargs else None
-        url: str = url_manager.generate_shards_url("world", shards, params)
-        response: dict = wrapper.fetch_api_data(url)
+        url: str = self.url_manager.generate_shards_url("world", shards, params)
+        response: dict = self.connection.fetch_api_data(url)
         return response
 
+    def stream_world_shards(self, shards: str | tuple[str] | list[str], depth: int = 2, **kwargs) -> Iterator[tuple[tuple[str, ...], Any]]:
+        """
+        Streaming `get_world_shards()`: yields `(path, value)` for each element as soon as it's downloaded,
+        like `(("happenings", "event"), {...})` for every event (`depth=1` yields whole shards).
+        Meant for big responses (happenings, nations, census...), the whole dictionary is never built.
+        """
+        for kwarg in kwargs:
+            kwargs[kwarg] = join_keys(kwargs[kwarg])
+        params: Optional[str] = join_keys([f"{kwarg}={kwargs[kwarg]}" for kwarg in kwargs], ";") if kwargs else None
+        url: str = self.url_manager.generate_shards_url("world", shards, params)
+        return self.connection.stream_api_data(url, depth)
+
     def get_world_assembly_shards(self, shards: str | tuple[str] | list[str], **kwargs) -> dict:
         """
         Gets one or more shards from the World Assembly API.
@@ -159,29 +395,217 @@ class AwesomeNations():
         for kwarg in kwargs:
             kwargs[kwarg] = join_keys(kwargs[kwarg])
         params: Optional[str] = join_keys([f"{kwarg}={kwargs[kwarg]}" for kwarg in kwargs], ";") if kwargs else None
-        url: str = url_manager.generate_shards_url("wa",
+        url: str = self.url_manager.generate_shards_url("wa",
                                                    shards,
                                                    params,
                                                    council_id=kwargs["council_id"])
-        response: dict = wrapper.fetch_api_data(url)
+        response: dict = self.connection.fetch_api_data(url)
         return response
 
+    def fetch_many(self,
+                   nations: Optional[Iterable[str]] = None,
+                   regions: Optional[Iterable[str]] = None,
+                   shards: Optional[str | tuple[str] | list[str]] = None,
+                   max_workers: int = 4,
+                   credentials: Optional[Mapping[str, str]] = None,
+                   **kwargs) -> Iterator[BatchResult]:
+        """
+        Gets the same shards from many nations and/or regions at once, using a pool of `max_workers` threads.
+        
+        Results are yielded as they finish (not in the given order) as `BatchResult(modifier, name, data, error)`,
+        errors are reported per item instead of raised. All workers share the client ratelimit, so the
+        batch goes as fast as the ratelimit allows.
+        
+        For private shards, give `credentials` (`{nation name: password}`): each nation keeps its own
+        session (X-Pin), requests of one nation run one at a time, different nations run in parallel.
+        """
+        for kwarg in kwargs:
+            kwargs[kwarg] = join_keys(kwargs[kwarg])
+        params: Optional[str] = join_keys([f"{kwarg}={kwargs[kwarg]}" for kwarg in kwargs], ";") if kwargs else None
+        
+        targets: list[tuple[str, str]] = [("nation", name) for name in nations or ()]
+        targets += [("region", name) for name in regions or ()]
+        if not targets:
+            return
+        
+        self.connection.set_pool_maxsize(max(self.connection.pool_maxsize, max_workers))
+        executor = ThreadPoolExecutor(max_workers, "AwesomeNations")
+        try:
+            futures: dict[Future, tuple[str, str]] = {}
+            for modifier, name in targets:
+                formatted_name: str = format_key(name, False, '%20')
+                url: str = self.url_manager.generate_shards_url(modifier,
+                                                           shards,
+                                                           params,
+                                                           **{f"{modifier}_name": formatted_name})
+                auth: Optional[NationAuth] = None
+                if modifier == "nation" and credentials and credentials.get(name):
+                    auth = self.connection.sessions.get(formatted_name, credentials[name])
+                futures[executor.submit(self.connection.fetch_api_data, url, None, auth)] = (modifier, name)
+            for future in as_completed(futures):
+                modifier, name = futures[future]
+                error: Optional[BaseException] = future.exception()
+                if error:
+                    yield BatchResult(modifier, name, error=error)
+                else:
+                    yield BatchResult(modifier, name, future.result())
+        finally:
+            # Stopping early (break) cancels the requests that didn't start yet.
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_census_table(self,
+                         nations: Iterable[str],
+                         scale: int | str | list[int] = "all",
+                         mode: Optional[str | list[str]] = ("score", "rank", "rrank", "prank", "prrank"),
+                         max_workers: int = 4) -> CensusTable:
+        """
+        Gets the census of many nations (with `fetch_many()`) into a single columnar `CensusTable`.
+        
+        Nations that couldn't be fetched are logged and left out.
+        """
+        census_kwargs: dict = {"scale": scale, "mode": mode} if mode else {"scale": scale}
+        table = CensusTable()
+        for result in self.fetch_many(nations, shards="census", max_workers=max_workers, **census_kwargs):
+            if not result.ok:
+                logger.warning("Census of %s left out: %s", result.name, result.error)
+                continue
+            table.add_census(format_key(result.name, False, '_'), result.data["nation"]["census"])
+        return table
+
+    def get_census_ranks_table(self, scale: Optional[int] = None, start: Optional[int] = None) -> CensusTable:
+        """
+        Gets world census ranks (a page of 20 nations from `start`) as a columnar `CensusTable`,
+        the default scale is today's World Census.
+        """
+        census_kwargs: dict = {key: value for key, value in (("scale", scale), ("start", start)) if value is not None}
+        response: dict = self.get_world_shards("censusranks", **census_kwargs)
+        table = CensusTable()
+        table.add_census_ranks(response["world"]["censusranks"])
+        return table
+
+    def iter_census_ranks(self,
+                          scale: Optional[int] = None,
+                          scope: str = "world",
+                          start: int = 1,
+                          prefetch: bool = True) -> Iterator[dict]:
+        """
+        Walks census ranks (`{'name': ..., 'rank': ..., 'score': ...}`) from `start`, page by page.
+        
+        The API sends 20 nations per request, with `prefetch` the next page is requested while you
+        consume the current one. Stopping early (break) is fine, and every page respects the ratelimit.
+        
+        ### scope: str
+        
+        - "world": World census ranks.
+        - Any other value is taken as a region name: ranks of the region nations.
+        """
+        def fetch_page(page_start: int) -> list:
+            census_kwargs: dict = {"scale": scale, "start": page_start} if scale is not None else {"start": page_start}
+            if scope == "world":
+                census_ranks = self.get_world_shards("censusranks", **census_kwargs)["world"]["censusranks"]
+            else:
+                census_ranks = self.Region(scope).get_shards("censusranks", **census_kwargs)["region"]["censusranks"]
+            nations = census_ranks.get("nations") if census_ranks else None
+            return as_list(nations["nation"] if nations else None)
+
+        executor = ThreadPoolExecutor(1, "AwesomeNations-censusranks") if prefetch else None
+        try:
+            page: list = fetch_page(start)
+            while page:
+                next_start: int = start + len(page)
+                next_page: Optional[Future] = None
+                if executor and len(page) >= CENSUS_RANKS_PAGE_SIZE:
+                    next_page = executor.submit(fetch_page, next_start)
+                yield from page
+                if len(page) < CENSUS_RANKS_PAGE_SIZE:
+                    return
+                start = next_start
+                page = next_page.result() if next_page else fetch_page(start)
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def watch_happenings(self,
+                         view: Optional[str] = None,
+                         filter: Optional[str | list[str]] = None,
+                         limit: int = 100,
+                         min_interval: float = 5,
+                         max_interval: float = 300,
+                         since_id: Optional[int] = None) -> HappeningsPoller:
+        """
+        Returns a `HappeningsPoller` for world happenings: iterate it (or give `run()` a callback)
+        to get new events as they happen, each one once.
+        
+        ```python
+        for event in api.watch_happenings(view="region.the_pacific"):
+            print(event["text"])
+        ```
+        """
+        return HappeningsPoller(self.get_world_shards,
+                                self.connection,
+                                view,
+                                filter,
+                                limit,
+                                min_interval,
+                                max_interval,
+                                since_id)
+
+    def live_feed(self, buckets: str | Iterable[str], **kwargs) -> LiveFeed:
+        """
+        Returns a `LiveFeed`: live happenings pushed by NationStates (server-sent events) instead of polling.
+        
+        ```python
+        with api.live_feed(["region:the_pacific", "nation:testlandia"]) as feed:
+            for event in feed:
+                print(event.data["str"])
+        ```
+        """
+        return LiveFeed(buckets, self.connection.headers, **kwargs)
+
+    def run_commands(self, commands: Iterable[PrivateCommand], max_workers: int = 4) -> Iterator[CommandResult]:
+        """
+        Sends many private commands (built with `Nation.make_command()`), yielding `CommandResult(command, data, error)`
+        as they finish.
+        
+        Prepare steps run in parallel ahead of time, execute steps follow the command ratelimit.
+        Commands of one nation run one at a time, different nations run in parallel.
+        
+        ```python
+        commands = [api.Nation(name, password).make_command("issue", issue=issue_id, option=0) for name, password, issue_id in puppets]
+        for result in api.run_commands(commands):
+            print(result.command.nation_name, result.ok)
+        ```
+        """
+        pipeline = CommandPipeline(self.connection, self.url_manager, max_workers)
+        self.connection.set_pool_maxsize(max(self.connection.pool_maxsize, max_workers))
+        return pipeline.run(commands)
+
     def get_api_latest_version(self) -> int:
         """Gets NationStates API latest version"""
-        url = "https://www.nationstates.net/cgi-bin/api.cgi?a=version"
-        latest_version: int = int(wrapper.fetch_raw_data(url))
+        url = f"{self.url_manager.api_base_url}?a=version"
+        latest_version: int = int(self.connection.fetch_raw_data(url))
         return latest_version
 
     class Nation:
         """
         Class dedicated to NationStates nation API.
         """
+        _client_connection: Optional[WrapperConnection] = None
+        _client_url_manager: Optional[URLManager] = None
+
         def __init__(self,
                      nation_name: str,
                      password: str = None,
-                     autologin: str = None) -> None:
+                     autologin: str = None,
+                     backend: Optional[DumpStore] = None) -> None:
             self.nation_name: str = format_key(nation_name, False, '%20') # Name is automatically parsed.
-            wrapper._auth = NationAuth(password, autologin) if any((password, autologin)) else None
+            client_connection: WrapperConnection = self._client_connection or default_connection
+            # Nations with the same credentials share one session (X-Pin).
+            self._auth: Optional[NationAuth] = client_connection.sessions.get(self.nation_name, password, autologin)
+            self._api_connection: WrapperConnection = client_connection
+            self._url_manager: URLManager = self._client_url_manager or url_manager
+            # A local DumpStore can serve shards instead of the API.
+            self._connection: WrapperConnection | DumpStore = backend if backend is not None else client_connection
 
         def __repr__(self):
             return f"Nation(nation_name={self.nation_name})"
@@ -190,11 +614,11 @@ class AwesomeNations():
             """
             Checks if nation exists.
             """
-            url = url_manager.generate_shards_url("nation",
+            url = self._url_manager.generate_shards_url("nation",
                                                   None,
                                                   None,
                                                   nation_name=self.nation_name)
-            status_code: int = wrapper.connection_status_code(url)
+            status_code: int = self._connection.connection_status_code(url)
             match status_code:
                 case 200:
                     return True
@@ -224,12 +648,12 @@ class AwesomeNations():
             for kwarg in kwargs:
                 kwargs[kwarg] = join_keys(kwargs[kwarg])
             params: Optional[str] = join_keys([f"{kwarg}={kwargs[kwarg]}" for kwarg in kwargs], ";") if kwargs else None
-            url: str = url_manager.generate_shards_url("nation",
+            url: str = self._url_manager.generate_shards_url("nation",
                                                        shards,
                                                        params,
                                                        nation_name=self.nation_name)
             logger.warning("get_public_shards() is deprecated.")
-            response: dict = wrapper.fetch_api_data(url)
+            response: dict = self._connection.fetch_api_data(url, auth=self._auth)
             return response
 
         # Replacing get_public_shards()
@@ -248,20 +672,86 @@ class AwesomeNations():
             for kwarg in kwargs:
                 kwargs[kwarg] = join_keys(kwargs[kwarg])
             params: Optional[str] = join_keys([f"{kwarg}={kwargs[kwarg]}" for kwarg in kwargs], ";") if kwargs else None
-            url: str = url_manager.generate_shards_url("nation",
+            url: str = self._url_manager.generate_shards_url("nation",
                                                        shards,
                                                        params,
                                                        nation_name=self.nation_name)
-            response: dict = wrapper.fetch_api_data(url)
+            response: dict = self._connection.fetch_api_data(url, auth=self._auth)
             return response
 
+        def stream_shards(self, shards: Optional[str | tuple[str] | list[str]] = None, depth: int = 2, **kwargs) -> Iterator[tuple[tuple[str, ...], Any]]:
+            """
+            Streaming `get_shards()`: yields `(path, value)` for each element as soon as it's downloaded,
+            like `(("census", "scale"), {...})` for every census scale (`depth=1` yields whole shards).
+            Always asks the API, even with a dump backend.
+            """
+            for kwarg in kwargs:
+                kwargs[kwarg] = join_keys(kwargs[kwarg])
+            params: Optional[str] = join_keys([f"{kwarg}={kwargs[kwarg]}" for kwarg in kwargs], ";") if kwargs else None
+            url: str = self._url_manager.generate_shards_url("nation",
+                                                       shards,
+                                                       params,
+                                                       nation_name=self.nation_name)
+            return self._api_connection.stream_api_data(url, depth, auth=self._auth)
+
+        def get_census_table(self,
+                             scale: int | str | list[int] = "all",
+                             mode: Optional[str | list[str]] = ("score", "rank", "rrank", "prank", "prrank")) -> CensusTable:
+            """
+            Gets the nation census as a columnar `CensusTable` (int32 ids, float64 scores and ranks),
+            ready for NumPy/Arrow or bulk CSV/Parquet export.
+            """
+            census_kwargs: dict = {"scale": scale, "mode": mode} if mode else {"scale": scale}
+            response: dict = self.get_shards("census", **census_kwargs)
+            return CensusTable.from_census(self.nation_name.replace("%20", "_"), response["nation"]["census"])
+
+        def make_command(self, command: str, **parameters) -> PrivateCommand:
+            """
+            Builds a private command for `AwesomeNations.run_commands()`, like
+            `make_command("issue", issue=123, option=1)`. Needs the nation password or autologin.
+            """
+            if not self._auth:
+                raise ValueError(f"{self.nation_name}: private commands need a password or autologin.")
+            return PrivateCommand(self.nation_name, command, parameters, self._auth)
+
+        def command(self, command: str, **parameters) -> dict:
+            """
+            Sends a private command right away (prepare and execute if needed), following the command ratelimit.
+            """
+            pipeline = CommandPipeline(self._api_connection, self._url_manager)
+            return pipeline.execute(self.make_command(command, **parameters))
+
+        def answer_issue(self, issue: int, option: int) -> dict:
+            """
+            Answers an issue (`option` as in the issues shard, -1 dismisses it).
+            """
+            return self.command("issue", issue=issue, option=option)
+
+        def post_rmb(self, region_name: str, text: str) -> dict:
+            """
+            Posts a message on a region Regional Message Board.
+            """
+            return self.command("rmbpost", region=format_key(region_name, False, "_"), text=text)
+
+        def post_dispatch(self, title: str, text: str, category: int, subcategory: int) -> dict:
+            """
+            Writes a new dispatch.
+            """
+            return self.command("dispatch", dispatch="add", title=title, text=text, category=category, subcategory=subcategory)
+
     class Region: 
         """
         Class dedicated to NationStates region API.
         """
-        def __init__(self, region_name: str) -> None:
+        _client_connection: Optional[WrapperConnection] = None
+        _client_url_manager: Optional[URLManager] = None
+
+        def __init__(self, region_name: str, backend: Optional[DumpStore] = None) -> None:
             # self.pretty_name: str = prettify_string(str(region_name))
             self.region_name = format_key(region_name, False, '%20')
+            self._api_connection: WrapperConnection = self._client_connection or default_connection
+            self._url_manager: URLManager = self._client_url_manager or url_manager
+            self._connection: WrapperConnection | DumpStore = backend if backend is not None else self._api_connection
         
         def __repr__(self):
             return f"Region(region_name={self.region_name})"
@@ -270,11 +760,11 @@ class AwesomeNations():
             """
             Checks if region exists.
             """
-            url = url_manager.generate_shards_url("region",
+            url = self._url_manager.generate_shards_url("region",
                                                   None,
                                                   None,
                                                   region_name=self.region_name)
-            status_code: int = wrapper.connection_status_code(url)
+            status_code: int = self._connection.connection_status_code(url)
             match status_code:
                 case 200:
                     return True
@@ -297,13 +787,45 @@ class AwesomeNations():
             for kwarg in kwargs:
                 kwargs[kwarg] = join_keys(kwargs[kwarg])
             params: Optional[str] = join_keys([f"{kwarg}={kwargs[kwarg]}" for kwarg in kwargs], ";") if kwargs else None
-            url: str = url_manager.generate_shards_url("region",
+            url: str = self._url_manager.generate_shards_url("region",
                                                        shards,
                                                        params,
                                                        region_name=self.region_name)
-            response: dict = wrapper.fetch_api_data(url)
+            response: dict = self._connection.fetch_api_data(url)
             return response
 
+        def stream_shards(self, shards: Optional[str | tuple[str] | list[str]] = None, depth: int = 2, **kwargs) -> Iterator[tuple[tuple[str, ...], Any]]:
+            """
+            Streaming `get_shards()`: yields `(path, value)` for each element as soon as it's downloaded,
+            like `(("messages", "post"), {...})` for every RMB post (`depth=1` yields whole shards).
+            Always asks the API, even with a dump backend.
+            """
+            for kwarg in kwargs:
+                kwargs[kwarg] = join_keys(kwargs[kwarg])
+            params: Optional[str] = join_keys([f"{kwarg}={kwargs[kwarg]}" for kwarg in kwargs], ";") if kwargs else None
+            url: str = self._url_manager.generate_shards_url("region",
+                                                       shards,
+                                                       params,
+                                                       region_name=self.region_name)
+            return self._api_connection.stream_api_data(url, depth)
+
+        def get_census_table(self, scale: int | str | list[int] = "all") -> CensusTable:
+            """
+            Gets the region census as a columnar `CensusTable` (int32 ids, float64 scores and ranks).
+            """
+            response: dict = self.get_shards("census", scale=scale)
+            return CensusTable.from_census(self.region_name.replace("%20", "_"), response["region"]["census"])
+
+        def get_census_ranks_table(self, scale: Optional[int] = None, start: Optional[int] = None) -> CensusTable:
+            """
+            Gets the census ranks of the region nations (from `start`) as a columnar `CensusTable`.
+            """
+            census_kwargs: dict = {key: value for key, value in (("scale", scale), ("start", start)) if value is not None}
+            response: dict = self.get_shards("censusranks", **census_kwargs)
+            table = CensusTable()
+            table.add_census_ranks(response["region"]["censusranks"])
+            return table
+
 if __name__ == "__main__":
     api = AwesomeNations("AwesomeNations/Test", log_level=0)
     print(api)
@@ -0,0 +1,154 @@
+from typing import Optional
+import threading
+import logging
+import time
+
+logger = logging.getLogger("AwesomeLogger")
+
+class Ratelimiter():
+    """
+    Base class for ratelimiters, they decide how long to wait before each request.
+
+    A `WrapperConnection` calls `acquire()` before every request and `update()` with the
+    ratelimit headers of every response, subclasses only need `reserve()` and `update()`.
+    One ratelimiter can be shared by many connections and threads.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Reserves the next request slot, returns how many seconds to wait before using it.
+        """
+        return 0.0
+
+    def acquire(self) -> None:
+        "Waits (blocking) until a request can be sent."
+        waiting_time: float = self.reserve()
+        if waiting_time > 0:
+            logger.debug("Ratelimiter waiting: %.3f seconds", waiting_time)
+            time.sleep(waiting_time)
+
+    def update(self,
+               remaining: Optional[int] = None,
+               reset: Optional[float] = None,
+               requests_seen: Optional[int] = None) -> None:
+        """
+        Updates the ratelimit status from response headers (`Ratelimit-remaining`, `Ratelimit-reset`
+        and `X-ratelimit-requests-seen`).
+        """
+
+    def backoff(self, retry_after: Optional[float] = None) -> None:
+        """
+        Called when the API answered 429 Too Many Requests, `retry_after` comes from the `Retry-After` header.
+        """
+
+class ReactiveRatelimiter(Ratelimiter):
+    """
+    The classic behaviour: sends requests as fast as possible, hibernates for the whole
+    reset time once `Ratelimit-remaining` reaches 0.
+    """
+    def __init__(self, reset_time: float = 30):
+        super().__init__()
+        self.reset_time: float = reset_time
+        self._remaining: Optional[int] = None
+        self._blocked_until: float = 0.0
+
+    def reserve(self) -> float:
+        with self._lock:
+            now: float = time.monotonic()
+            if self._remaining is not None and self._remaining < 1:
+                logger.warning("API ratelimit reached, your code will be paused for: %s seconds.", self.reset_time)
+                self._blocked_until = max(self._blocked_until, now + self.reset_time + 1)
+                self._remaining = None
+            return max(0.0, self._blocked_until - now)
+
+    def update(self, remaining=None, reset=None, requests_seen=None) -> None:
+        with self._lock:
+            self._remaining = remaining
+
+    def backoff(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            waiting_time: float = retry_after if retry_after is not None else self.reset_time + 1
+            self._blocked_until = max(self._blocked_until, time.monotonic() + waiting_time)
+
+class TokenBucketRatelimiter(Ratelimiter):
+    """
+    Paces requests evenly across the ratelimit window instead of bursting and then stalling.
+
+    Tokens refill continuously at `(limit - burst) / period` per second, so no `period` long
+    window ever sees more than `limit` requests (NationStates counts a sliding 30 seconds window).
+    Every caller reserves its own future slot, so threads sharing one limiter queue up fairly.
+    Response headers can only make it slower: if the API reports no remaining requests (other
+    scripts using the same IP, for example) requests are paused until the reported reset.
+
+    ### limit:
+
+    > Maximum requests per `period`, NationStates allows 50 requests per 30 seconds.
+
+    ### burst:
+
+    > How many requests can be sent back-to-back after being idle.
+    """
+    def __init__(self,
+                 limit: int = 50,
+                 period: float = 30,
+                 burst: int = 1):
+        super().__init__()
+        if not 0 < burst < limit:
+            raise ValueError(f"burst must be between 1 and {limit - 1} (limit - 1), not {burst}.")
+        self.limit: int = limit
+        self.period: float = period
+        self.burst: int = burst
+        self.rate: float = (limit - burst) / period
+
+        self._tokens: float = float(burst)
+        self._last_refill: float = time.monotonic()
+        self._blocked_until: float = 0.0
+
+    def __repr__(self):
+        return f"TokenBucketRatelimiter(limit={self.limit}, period={self.period}, burst={self.burst})"
+
+    def reserve(self) -> float:
+        with self._lock:
+            now: float = self._refill()
+            # Tokens may go negative: each negative token is a slot reserved in the future.
+            self._tokens -= 1
+            waiting_time: float = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(waiting_time, self._blocked_until - now)
+
+    def update(self, remaining=None, reset=None, requests_seen=None) -> None:
+        with self._lock:
+            now: float = self._refill()
+            server_remaining: Optional[int] = remaining
+            if requests_seen is not None:
+                seen_remaining: int = self.limit - requests_seen
+                server_remaining = seen_remaining if server_remaining is None else min(server_remaining, seen_remaining)
+            if server_remaining is None:
+                return
+            if server_remaining < 1:
+                waiting_time: float = reset if reset is not None else self.period
+                logger.warning("API ratelimit reached, pausing requests for: %s seconds.", waiting_time)
+                self._blocked_until = max(self._blocked_until, now + waiting_time)
+            self._tokens = min(self._tokens, max(server_remaining, 0))
+
+    def backoff(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            now: float = self._refill()
+            waiting_time: float = retry_after if retry_after is not None else self.period
+            logger.warning("Too Many Requests, pausing requests for: %s seconds.", waiting_time)
+            self._blocked_until = max(self._blocked_until, now + waiting_time)
+            self._tokens = min(self._tokens, 0.0)
+
+    def _refill(self) -> float:
+        now: float = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+        return now
+
+if __name__ == "__main__":
+    limiter = TokenBucketRatelimiter(limit=10, period=5)
+    start = time.monotonic()
+    for i in range(10):
+        limiter.acquire()
+        print(f"Request {i} at {time.monotonic() - start:.2f}s")
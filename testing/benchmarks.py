@@ -0,0 +1,153 @@
+from mockServer import MockNationStates, load_recording
+from awesomeNations import AwesomeNations
+from awesomeNations.ratelimit import Ratelimiter
+from awesomeNations.internalTools import AwesomeParser
+from awesomeNations.apiEmulator import APIEmulator
+from awesomeNations.dataDumps import DumpStore
+from collections.abc import Callable
+from typing import Optional, NamedTuple
+from pathlib import Path
+import importlib.metadata
+import itertools
+import statistics
+import tracemalloc
+import tempfile
+import argparse
+import platform
+import time
+import json
+import gzip
+import os
+
+# Reproducible benchmarks against a local mock NationStates server (no network, no ratelimit).
+# Results are saved as JSON in testing/benchmarkResults, give an older file to --compare.
+
+RESULTS_DIRECTORY: Path = Path(__file__).parent / "benchmarkResults"
+
+class BenchmarkResult(NamedTuple):
+    name: str
+    samples: int
+    p50_ms: float
+    p99_ms: float
+    peak_memory_mb: float
+    throughput: float # Items (or MB) per second, at p50.
+    unit: str
+
+def percentile(timings: list[float], percent: float) -> float:
+    if len(timings) == 1:
+        return timings[0]
+    return statistics.quantiles(timings, n=100, method="inclusive")[int(percent) - 1]
+
+def measure(name: str, function: Callable[[], object], repeat: int, items: float = 1, unit: str = "ops") -> BenchmarkResult:
+    """
+    Runs `function` `repeat` times for timings, then once more under tracemalloc for peak memory
+    (tracing slows everything down, so it never overlaps with the timed runs).
+    """
+    function() # Warm-up: connections, caches, imports.
+    timings: list[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    function()
+    peak_memory: int = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    p50: float = percentile(timings, 50)
+    return BenchmarkResult(name, repeat, p50 * 1000, percentile(timings, 99) * 1000, peak_memory / 1e6, items / p50, unit)
+
+def run_benchmarks(repeat: int = 30, dump_records: int = 2000, only: Optional[list[str]] = None) -> list[BenchmarkResult]:
+    results: list[BenchmarkResult] = []
+    with MockNationStates(dump_records=dump_records) as server, tempfile.TemporaryDirectory() as directory:
+        # A no-op ratelimiter: the mock server has no limit, and waiting would be measured too.
+        api = AwesomeNations("AwesomeNations benchmarks", ratelimiter=Ratelimiter(), log_level=None, api_base_url=server.api_url)
+        url_manager = api.url_manager
+        nation_xml: dict = {"data": load_recording("nation").decode("iso-8859-1"), "encoding": "iso-8859-1"}
+        dump_filepath: str = os.path.join(directory, "nations.xml.gz")
+        nation_names: list[str] = [f"testlandia puppet {number}" for number in range(50)]
+
+        benchmarks: dict[str, Callable[[], BenchmarkResult]] = {
+            "url_generation": lambda: measure("url_generation", lambda: [url_manager.generate_shards_url("nation", ("census", "happenings"), ("scale=all", "mode=score+rank"), nation_name="testlandia") for _ in range(1000)],
+                                              repeat, 1000, "urls/s"),
+            "xml_parse_fast": lambda: measure("xml_parse_fast", lambda: AwesomeParser("fast").parse_xml(nation_xml), repeat, 1, "responses/s"),
+            "xml_parse_xmltodict": lambda: measure("xml_parse_xmltodict", lambda: AwesomeParser("xmltodict").parse_xml(nation_xml), repeat, 1, "responses/s"),
+            "fetch_nation": lambda: measure("fetch_nation", lambda: api.Nation("testlandia").get_shards(("census", "happenings")), repeat, 1, "requests/s"),
+            "fetch_region": lambda: measure("fetch_region", lambda: api.Region("testregionia").get_shards("nations"), repeat, 1, "requests/s"),
+            "fetch_world": lambda: measure("fetch_world", lambda: api.get_world_shards("happenings"), repeat, 1, "requests/s"),
+            "stream_world": lambda: measure("stream_world", lambda: sum(1 for _ in api.stream_world_shards("happenings")), repeat, 1, "requests/s"),
+            "batch_fetch": lambda: measure("batch_fetch", lambda: list(api.fetch_many(nations=nation_names, shards="census", max_workers=8)),
+                                           max(3, repeat // 5), len(nation_names), "requests/s"),
+            "dump_download": lambda: measure("dump_download", lambda: api.connection.fetch_file(server.nation_dump_url, dump_filepath, resume=False, skip_if_current=False),
+                                             max(3, repeat // 10), len(server.dumps["/pages/nations.xml.gz"]) / 1e6, "MB/s"),
+            "dump_stream": lambda: measure("dump_stream", lambda: sum(1 for _ in api.read_daily_data_dumps(dump_filepath, "nation")),
+                                           max(3, repeat // 10), dump_records, "records/s"),
+            "emulated_fetch": lambda: benchmark_emulator(server, directory, repeat),
+        }
+        for name, benchmark in benchmarks.items():
+            if only and name not in only:
+                continue
+            if name == "dump_stream" and not os.path.exists(dump_filepath):
+                api.connection.fetch_file(server.nation_dump_url, dump_filepath)
+            results.append(benchmark())
+            print_result(results[-1])
+    return results
+
+def benchmark_emulator(server: MockNationStates, directory: str, repeat: int) -> BenchmarkResult:
+    "Fetches many nations from an `APIEmulator` serving the mock nation dump (dump-backed shards, real ratelimit headers)."
+    store: DumpStore = DumpStore.build_from_chunks([gzip.decompress(server.dumps["/pages/nations.xml.gz"])], os.path.join(directory, "store"), "nation")
+    nation_names: list[str] = list(itertools.islice(store.names(), 100))
+    with APIEmulator(store, ratelimit=10**9) as emulator:
+        api = AwesomeNations("AwesomeNations benchmarks", ratelimiter=Ratelimiter(), log_level=None, api_base_url=emulator.api_url)
+        return measure("emulated_fetch", lambda: [api.Nation(name).get_shards(("name", "region", "census"), scale=(0, 46)) for name in nation_names],
+                       max(3, repeat // 5), len(nation_names), "requests/s")
+
+def print_result(result: BenchmarkResult, previous: Optional[dict] = None) -> None:
+    line: str = f"{result.name:<22} p50 {result.p50_ms:9.3f} ms  p99 {result.p99_ms:9.3f} ms  peak {result.peak_memory_mb:8.2f} MB  {result.throughput:12.1f} {result.unit}"
+    if previous:
+        line += f"  ({(result.p50_ms / previous['p50_ms'] - 1) * 100:+.1f}% p50)"
+    print(line)
+
+def package_version() -> str:
+    try:
+        return importlib.metadata.version("AwesomeNations")
+    except importlib.metadata.PackageNotFoundError:
+        return "dev"
+
+def save_results(results: list[BenchmarkResult], label: str) -> Path:
+    RESULTS_DIRECTORY.mkdir(exist_ok=True)
+    filepath: Path = RESULTS_DIRECTORY / f"{label}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    report: dict = {
+        "label": label,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [result._asdict() for result in results],
+    }
+    filepath.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return filepath
+
+def compare_results(results: list[BenchmarkResult], filepath: str | Path) -> None:
+    previous_report: dict = json.loads(Path(filepath).read_text(encoding="utf-8"))
+    previous_results: dict[str, dict] = {result["name"]: result for result in previous_report["results"]}
+    print(f"\nCompared with {previous_report['label']} ({previous_report['date']}, Python {previous_report['python']}):")
+    for result in results:
+        print_result(result, previous_results.get(result.name))
+
+def main():
+    arguments = argparse.ArgumentParser(description="AwesomeNations benchmarks against a local mock server.")
+    arguments.add_argument("--repeat", type=int, default=30, help="Timed runs per benchmark (fewer for the slow ones).")
+    arguments.add_argument("--dump-records", type=int, default=2000, help="Nations in the mock nation data dump.")
+    arguments.add_argument("--only", nargs="+", help="Only run these benchmarks.")
+    arguments.add_argument("--label", default=package_version(), help="Name of the saved results (default: package version).")
+    arguments.add_argument("--compare", help="Results file (JSON) to compare with.")
+    arguments.add_argument("--no-save", action="store_true", help="Don't save the results.")
+    options = arguments.parse_args()
+
+    results: list[BenchmarkResult] = run_benchmarks(options.repeat, options.dump_records, options.only)
+    if not options.no_save:
+        print(f"\nResults saved in: {save_results(results, options.label)}")
+    if options.compare:
+        compare_results(results, options.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qsl
+from typing import Optional
+from pathlib import Path
+from email.utils import formatdate
+import threading
+import gzip
+import re
+
+# A local stand-in for NationStates: serves recorded XML (testing/mockData) for api.cgi and
+# synthetic data dumps, so benchmarks and experiments don't depend on the network or the ratelimit.
+
+MOCK_DATA_DIRECTORY: Path = Path(__file__).parent / "mockData"
+
+ID_PATTERN: re.Pattern = re.compile(rb'^(<(?:NATION|REGION) id=")[^"]*(")', re.MULTILINE)
+
+def load_recording(name: str) -> bytes:
+    return (MOCK_DATA_DIRECTORY / f"{name}.xml").read_bytes()
+
+def build_dump(record_xml: bytes, root_tag: str, records: int) -> bytes:
+    """
+    A gzipped data dump made of `records` copies of a recorded nation or region, each with its own name.
+    """
+    record_tag: bytes = root_tag[:-1].encode()
+    body: bytes = record_xml[record_xml.index(b"<" + record_tag):]
+    # Dumps have no id attribute, only the NAME.
+    body = body.replace(b' id="testlandia"', b"", 1).replace(b' id="testregionia"', b"", 1)
+    name: re.Match = re.search(rb"<NAME>([^<]*)</NAME>", body)
+    before, after = body[:name.start(1)], body[name.end(1):]
+    parts: list[bytes] = [b'<?xml version="1.0" encoding="iso-8859-1"?>\n<' + root_tag.encode() + b">\n"]
+    parts += [before + b"%s %d" % (name.group(1), number) + after for number in range(records)]
+    parts.append(b"</" + root_tag.encode() + b">\n")
+    return gzip.compress(b"".join(parts), compresslevel=6)
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes: with Nagle, every response would wait for a delayed ACK (~40 ms).
+    disable_nagle_algorithm = True
+    server: "MockNationStates"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        self.server.requests += 1
+        if url.path == "/cgi-bin/api.cgi":
+            self.send_api_response(dict(parse_qsl(url.query)))
+        elif url.path in self.server.dumps:
+            self.send_dump(self.server.dumps[url.path])
+        else:
+            self.send_body(404, b"<h1>Not Found</h1>", "text/html")
+
+    def send_api_response(self, query: dict[str, str]) -> None:
+        for modifier in ("nation", "region", "wa"):
+            if modifier in query:
+                body: bytes = self.server.recordings[modifier]
+                if modifier != "wa":
+                    # The same recording answers for every name, under the requested id.
+                    body = ID_PATTERN.sub(rb"\g<1>" + query[modifier].lower().replace(" ", "_").encode() + rb"\g<2>", body, 1)
+                break
+        else:
+            body = self.server.recordings["world"]
+        self.send_body(200, body, "text/xml; charset=ISO-8859-1", {
+            "Ratelimit-remaining": "49",
+            "Ratelimit-reset": "30",
+            "X-ratelimit-requests-seen": "1",
+        })
+
+    def send_dump(self, data: bytes) -> None:
+        start: int = 0
+        status: int = 200
+        range_header: Optional[str] = self.headers.get("Range")
+        if range_header and range_header.startswith("bytes="):
+            start = int(range_header[6:].split("-")[0])
+            status = 206
+        self.send_body(status, data[start:], "application/x-gzip", {"Last-Modified": self.server.last_modified, "Accept-Ranges": "bytes"})
+
+    def send_body(self, status: int, body: bytes, content_type: str, headers: Optional[dict] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+class MockNationStates(ThreadingHTTPServer):
+    """
+    Local NationStates mock server (runs in a background thread).
+
+    `api_url` answers like `https://www.nationstates.net/cgi-bin/api.cgi` (nation, region, world and wa
+    requests get the recorded responses, whatever the shards), `nation_dump_url` and `region_dump_url`
+    serve gzipped data dumps of `dump_records` records (HTTP Range supported).
+    """
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, dump_records: int = 2000):
+        super().__init__(("127.0.0.1", port), MockRequestHandler)
+        self.requests: int = 0
+        self.last_modified: str = formatdate(usegmt=True)
+        self.recordings: dict[str, bytes] = {name: load_recording(name) for name in ("nation", "region", "world", "wa")}
+        self.dumps: dict[str, bytes] = {
+            "/pages/nations.xml.gz": build_dump(self.recordings["nation"], "NATIONS", dump_records),
+            "/pages/regions.xml.gz": build_dump(self.recordings["region"], "REGIONS", max(1, dump_records // 10)),
+        }
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "MockNationStates":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    @property
+    def api_url(self) -> str:
+        return f"{self.base_url}/cgi-bin/api.cgi"
+
+    @property
+    def nation_dump_url(self) -> str:
+        return f"{self.base_url}/pages/nations.xml.gz"
+
+    @property
+    def region_dump_url(self) -> str:
+        return f"{self.base_url}/pages/regions.xml.gz"
+
+    def start(self) -> "MockNationStates":
+        self._thread = threading.Thread(target=self.serve_forever, name="MockNationStates", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+if __name__ == "__main__":
+    import time
+    with MockNationStates() as server:
+        print(f"Mock NationStates API running at {server.api_url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
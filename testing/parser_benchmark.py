@@ -0,0 +1,58 @@
+from awesomeNations.customMethods import format_key, string_is_number
+from awesomeNations.internalTools import AwesomeParser
+import xmltodict
+import random
+import time
+
+# Compares the XML parser engines on big synthetic responses (no API requests needed).
+
+def legacy_postprocessor(path, key: str, value: str):
+    "The original AwesomeParser.xml_postprocessor(), as a reference."
+    key = format_key(key, replace_empty="_", delete_not_alpha=True)
+    try:
+        formatted_value = value
+        if string_is_number(formatted_value):
+            formatted_value = complex(formatted_value).real
+            formatted_value = int(formatted_value) if formatted_value.is_integer() else formatted_value
+        return key, formatted_value
+    except (ValueError, TypeError):
+        return key, value
+
+def census_response(nations: int = 40) -> str:
+    "Something like a few `census scale=all` responses glued together."
+    scales = "".join(f'<SCALE id="{scale}"><SCORE>{random.uniform(-100, 100000):.2f}</SCORE><RANK>{random.randrange(1, 300000)}</RANK><RRANK>{random.randrange(1, 5000)}</RRANK><PRANK>{random.uniform(0, 100):.2f}</PRANK><PRRANK>{random.uniform(0, 100):.2f}</PRRANK></SCALE>'
+                     for scale in range(89))
+    return '<?xml version="1.0" encoding="UTF-8"?>\n<NATIONS>' + f'<NATION id="testlandia"><CENSUS>{scales}</CENSUS></NATION>' * nations + "</NATIONS>"
+
+def happenings_response(events: int = 5000) -> str:
+    happenings = "".join(f'<EVENT id="{event_id}"><TIMESTAMP>{1700000000 + event_id}</TIMESTAMP><TEXT>@@nation_{event_id}@@ was ranked in the Top 5% of the world for Largest Black Market.</TEXT></EVENT>'
+                         for event_id in range(events))
+    return f'<?xml version="1.0" encoding="UTF-8"?>\n<WORLD><HAPPENINGS>{happenings}</HAPPENINGS></WORLD>'
+
+def benchmark(name: str, function, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f"{name:<40} {best * 1000:8.1f} ms")
+    return best
+
+def main():
+    random.seed(0)
+    engines = {
+        "xmltodict + original postprocessor": lambda data: xmltodict.parse(data["data"], data["encoding"], postprocessor=legacy_postprocessor),
+        "xmltodict engine": AwesomeParser("xmltodict").parse_xml,
+        "fast engine": AwesomeParser("fast").parse_xml,
+    }
+    for response_name, xml_data in (("census scale=all", census_response()), ("happenings", happenings_response())):
+        data = {"data": xml_data, "encoding": "UTF-8"}
+        print(f"\n{response_name} ({len(xml_data) / 1e6:.2f} MB)")
+        outputs = [parse(data) for parse in engines.values()]
+        assert all(output == outputs[0] for output in outputs), "Parser engines disagree!"
+        timings = [benchmark(engine_name, lambda parse=parse: parse(data)) for engine_name, parse in engines.items()]
+        print(f"{'speedup (original / fast)':<40} {timings[0] / timings[-1]:8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+from awesomeNations import AwesomeNations
+from awesomeNations.apiEmulator import APIEmulator, record_children
+from awesomeNations.dataDumps import DumpStore
+from awesomeNations.ratelimit import Ratelimiter
+import tempfile
+import unittest
+
+# Run with: python -m unittest discover testing
+
+RECORD: bytes = b"<NATION><NAME>A</NAME><ENDORSEMENTS/><REGION>R</REGION><FLAG/></NATION>"
+
+DUMP: bytes = ('<?xml version="1.0" encoding="iso-8859-1"?>\n<NATIONS>\n'
+               "<NATION><NAME>Café Land</NAME><UNSTATUS>WA Member</UNSTATUS><ENDORSEMENTS/><REGION>Région Un</REGION>"
+               '<CENSUS><SCALE id="0"><SCORE>12.5</SCORE></SCALE><SCALE id="46"><SCORE>3</SCORE></SCALE></CENSUS><FLAG/></NATION>\n'
+               "</NATIONS>\n").encode("iso-8859-1")
+
+class RecordChildrenTest(unittest.TestCase):
+    def test_self_closing_children(self):
+        spans: list[bytes] = [RECORD[start:end] for _, start, end in record_children(RECORD, "UTF-8")]
+        self.assertEqual(spans, [b"<NAME>A</NAME>", b"<ENDORSEMENTS/>", b"<REGION>R</REGION>", b"<FLAG/>"])
+
+    def test_nested_children(self):
+        record: bytes = b'<NATION><CENSUS><SCALE id="0"/></CENSUS><E></E></NATION>'
+        spans: list[bytes] = [record[start:end] for _, start, end in record_children(record, "UTF-8")]
+        self.assertEqual(spans, [b'<CENSUS><SCALE id="0"/></CENSUS>', b"<E></E>"])
+
+class APIEmulatorTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store: DumpStore = DumpStore.build_from_chunks([DUMP], self.directory.name, "nation")
+        self.emulator: APIEmulator = APIEmulator(self.store, ratelimit=10**6).start()
+        self.api = AwesomeNations("AwesomeNations tests", ratelimiter=Ratelimiter(), log_level=None, api_base_url=self.emulator.api_url)
+
+    def tearDown(self):
+        self.emulator.stop()
+        self.directory.cleanup()
+
+    def test_shards_with_self_closing_fields(self):
+        response: dict = self.api.Nation("Café Land").get_shards(("endorsements", "region", "flag"))
+        self.assertEqual(response, {"nation": {"id": "café_land", "endorsements": None, "region": "Région Un", "flag": None}})
+
+    def test_standard_matches_store(self):
+        self.assertEqual(self.api.Nation("café land").get_shards(), self.store.get("café land"))
+
+    def test_census_scale(self):
+        response: dict = self.api.Nation("café land").get_shards("census", scale=46)
+        self.assertEqual(response["nation"]["census"], {"scale": {"id": 46, "score": 3}})
+
+    def test_renamed_shards(self):
+        # The API answers the wa shard with <UNSTATUS>, so do the store and the emulator.
+        expected: dict = {"nation": {"id": "café_land", "unstatus": "WA Member"}}
+        self.assertEqual(self.store.fetch_api_data(self.emulator.api_url + "?nation=café%20land&q=wa"), expected)
+        self.assertEqual(self.api.Nation("café land").get_shards("wa"), expected)
+
+    def test_unknown_nation(self):
+        self.assertFalse(self.api.Nation("nowhere").exists())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+from awesomeNations import AwesomeNations
+from awesomeNations.ratelimit import Ratelimiter, TokenBucketRatelimiter
+from awesomeNations.commands import TWO_STEP_COMMANDS
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qsl
+from typing import Optional
+import threading
+import secrets
+import unittest
+import time
+
+# Run with: python -m unittest discover testing
+
+class CommandRequestHandler(BaseHTTPRequestHandler):
+    """
+    Private commands like NationStates: a password logs in and gives a new X-Pin (an old X-Pin gets 409),
+    prepare answers a token that only the next execute of the same nation can use.
+    """
+    protocol_version = "HTTP/1.1"
+    server: "CommandServer"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        fields: dict[str, str] = dict(parse_qsl(urlsplit(self.path).query))
+        fields.update(parse_qsl(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()))
+        nation: str = fields["nation"].lower().replace(" ", "_")
+        with self.server.lock:
+            pin: Optional[str] = self.headers.get("X-Pin")
+            if pin is None or pin != self.server.pins.get(nation):
+                if pin is not None or not self.headers.get("X-Password"):
+                    self.send_body(409 if pin is not None else 403, b"<h1>Authentication Failed</h1>")
+                    return
+                pin = str(secrets.randbelow(10**10))
+                self.server.pins[nation] = pin
+            if fields.get("mode") == "prepare":
+                token: str = secrets.token_hex(8)
+                self.server.tokens[nation] = token
+                result: bytes = b"<SUCCESS>" + token.encode() + b"</SUCCESS>"
+            elif fields["c"] in TWO_STEP_COMMANDS and fields.get("token") != self.server.tokens.pop(nation, None):
+                result = b"<ERROR>Invalid token.</ERROR>"
+            else:
+                self.server.executed_commands.append((nation, fields["c"], time.monotonic()))
+                result = b"<SUCCESS>Done.</SUCCESS>"
+        self.send_body(200, b'<NATION id="' + nation.encode() + b'">' + result + b"</NATION>", {"X-Pin": pin})
+
+    def send_body(self, status: int, body: bytes, headers: Optional[dict] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "text/xml; charset=ISO-8859-1")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+class CommandServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), CommandRequestHandler)
+        self.pins: dict[str, str] = {}
+        self.tokens: dict[str, str] = {}
+        # (nation, command, time.monotonic()) of every command executed.
+        self.executed_commands: list[tuple[str, str, float]] = []
+        self.lock = threading.Lock()
+
+class CommandPipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.server = CommandServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        # 10 commands per second after the first one.
+        self.api = AwesomeNations("AwesomeNations tests", ratelimiter=Ratelimiter(), command_ratelimiter=TokenBucketRatelimiter(limit=11, period=1),
+                                  log_level=None, api_base_url=f"http://127.0.0.1:{self.server.server_address[1]}/cgi-bin/api.cgi")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_token_hand_off(self):
+        # Prepares of one nation must not interleave: a second prepare makes the first token useless.
+        commands: list = [self.api.Nation(name, password="hunter2").make_command("rmbpost", region="testregionia", text=f"Post {number}")
+                          for name in ("testlandia", "puppet") for number in range(3)]
+        results: list = list(self.api.run_commands(commands, max_workers=6))
+        self.assertEqual([result.error for result in results if not result.ok], [])
+        self.assertEqual(sorted(nation for nation, _, _ in self.server.executed_commands), ["puppet"] * 3 + ["testlandia"] * 3)
+
+    def test_execute_pacing(self):
+        nation = self.api.Nation("testlandia", password="hunter2")
+        commands: list = [nation.make_command("issue", issue=1, option=0) for _ in range(3)]
+        commands += [nation.make_command("rmbpost", region="testregionia", text="Hi") for _ in range(2)]
+        self.assertTrue(all(result.ok for result in self.api.run_commands(commands)))
+        times: list[float] = [executed_at for _, _, executed_at in self.server.executed_commands]
+        self.assertEqual(len(times), 5)
+        # Slots are 0.1 seconds apart, some network jitter aside.
+        self.assertGreaterEqual(times[-1] - times[0], 0.35)
+        for previous, current in zip(times, times[1:]):
+            self.assertGreaterEqual(current - previous, 0.05)
+
+    def test_expired_pin(self):
+        nation = self.api.Nation("testlandia", password="hunter2")
+        nation.command("issue", issue=1, option=0)
+        self.server.pins["testlandia"] = "0"
+        self.assertEqual(nation.post_rmb("testregionia", "Hi")["nation"]["success"], "Done.")
+        self.assertEqual(len(self.server.executed_commands), 2)
+
+if __name__ == "__main__":
+    unittest.main()
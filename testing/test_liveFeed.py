@@ -0,0 +1,84 @@
+from awesomeNations.liveFeed import LiveFeed, SSEParser, SSEEvent
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional
+import threading
+import unittest
+
+# Run with: python -m unittest discover testing
+
+class SSEParserTest(unittest.TestCase):
+    def test_multiline_data(self):
+        parser = SSEParser()
+        events: list[SSEEvent] = parser.feed(b"data: first line\ndata:second line\n\n")
+        self.assertEqual(events, [SSEEvent("first line\nsecond line")])
+
+    def test_json_data_and_fields(self):
+        parser = SSEParser()
+        events: list[SSEEvent] = parser.feed(b'event: happening\nid: 42\nretry: 1500\ndata: {"str": "@@testlandia@@ did something.", "time": 1}\n\n')
+        self.assertEqual(events, [SSEEvent({"str": "@@testlandia@@ did something.", "time": 1}, "happening", "42")])
+        self.assertEqual((parser.last_event_id, parser.retry), ("42", 1500))
+
+    def test_comments_and_invalid_fields(self):
+        parser = SSEParser()
+        self.assertEqual(parser.feed(b": keep-alive\n\nretry: soon\nid: a\0b\n\n"), [])
+        self.assertEqual((parser.last_event_id, parser.retry), (None, None))
+
+    def test_crlf_split_across_chunks(self):
+        parser = SSEParser()
+        self.assertEqual(parser.feed(b"data: one\r"), [])
+        self.assertEqual(parser.feed(b"\n\r"), [])
+        # A \r\n split in two is one line end, not an empty line too.
+        self.assertEqual(parser.feed(b"\ndata: two\r\r"), [SSEEvent("one")])
+        self.assertEqual(parser.feed(b"\n"), [SSEEvent("two")])
+
+class FeedRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "FeedServer"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        with self.server.lock:
+            self.server.connections.append(self.headers.get("Last-Event-ID"))
+            connection: int = len(self.server.connections)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        # Two events then the connection drops, the client must come back for the next ones.
+        events: bytes = b"retry: 10\n: keep-alive\n\n"
+        for number in (connection * 2 - 1, connection * 2):
+            events += f'id: {number}\ndata: {{"str": "event {number}"}}\n\n'.encode()
+        self.wfile.write(events)
+        self.close_connection = True
+
+class FeedServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FeedRequestHandler)
+        self.connections: list[Optional[str]] = []
+        self.lock = threading.Lock()
+
+class LiveFeedTest(unittest.TestCase):
+    def setUp(self):
+        self.server = FeedServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_reconnects_with_last_event_id(self):
+        with LiveFeed("region:the_pacific", base_url=f"http://127.0.0.1:{self.server.server_address[1]}/api", min_backoff=0.01) as feed:
+            events: list[SSEEvent] = []
+            for event in feed.events(timeout=5):
+                events.append(event)
+                if len(events) == 6:
+                    break
+        self.assertEqual([event.data["str"] for event in events], [f"event {number}" for number in range(1, 7)])
+        self.assertEqual(self.server.connections[:3], [None, "2", "4"])
+        self.assertGreaterEqual(feed.reconnections, 2)
+
+if __name__ == "__main__":
+    unittest.main()